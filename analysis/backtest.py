@@ -3,28 +3,28 @@ import os
 import joblib
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, roc_auc_score
 
+from analysis.feature_store import read_feature_table, list_feature_columns, feature_store_exists
+
 def run_backtest():
     """
     Loads the trained models and evaluates their performance on the 2024 hold-out set.
     """
     # --- Load Data ---
-    file_path = 'output/transcript_features_with_performance.csv'
-    if not os.path.exists(file_path):
-        print(f"Error: Data file not found at {file_path}")
+    if not feature_store_exists():
+        print("Error: Feature data not found. Please run the feature engineering pipeline first.")
         return
 
-    df = pd.read_csv(file_path)
-    df['date'] = pd.to_datetime(df['date'])
-    
+    # --- Feature Selection ---
+    feature_cols = list_feature_columns(suffix='_zscore')
+
     # --- Temporal Split: Get Test Set ---
-    test_df = df[df['date'].dt.year == 2024].copy()
+    # Only the z-score features and labels for 2024 are read from the store.
+    test_df = read_feature_table(columns=feature_cols + ['return_class', 'volatility_class'], year=2024)
     
     if test_df.empty:
         print("No data available for 2024 to run the backtest.")
         return
 
-    # --- Feature Selection ---
-    feature_cols = [col for col in df.columns if col.endswith('_zscore')]
     X_test = test_df[feature_cols].fillna(0)
 
     # --- Evaluate Return Model ---
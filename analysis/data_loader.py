@@ -1,44 +1,113 @@
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from datasets import load_dataset
 
-def download_and_process_transcripts():
+DATASET_NAME = "kurry/sp500_earnings_transcripts"
+
+# Define the tickers and date range
+TARGET_TICKERS = [
+    'MSFT', 'AAPL', 'NVDA', 'GOOGL', 'META',
+    'AMZN', 'NFLX', 'AMD', 'CRM', 'ADBE',
+    'INTU', 'NOW', 'AMAT', 'CSCO'
+]
+START_YEAR = 2010
+END_YEAR = 2024
+
+# Transcripts held in memory at once while streaming.
+DEFAULT_BATCH_SIZE = 256
+
+# The plan requires 'ticker', 'date', and 'text'
+# The dataset provides 'symbol', 'date', and 'content'
+SOURCE_COLUMNS = ['symbol', 'date', 'content']
+
+
+def _to_records(batch):
+    """Standardizes a columnar batch (dict of lists) into ticker/date/text records."""
+    return [
+        {'ticker': symbol, 'date': date, 'text': content}
+        for symbol, date, content in zip(batch['symbol'], batch['date'], batch['content'])
+    ]
+
+
+def _filter_mask(table, tickers, start_year, end_year):
+    """Evaluates the ticker/year filter on the Arrow columns without touching the transcript text."""
+    return pc.and_(
+        pc.is_in(table.column('symbol'), value_set=pa.array(tickers)),
+        pc.and_(
+            pc.greater_equal(table.column('year'), start_year),
+            pc.less_equal(table.column('year'), end_year),
+        ),
+    )
+
+
+def iter_transcript_batches(tickers=None, start_year=START_YEAR, end_year=END_YEAR,
+                            batch_size=DEFAULT_BATCH_SIZE, streaming=False, store_dir=None):
+    """
+    Yields lists of at most `batch_size` transcript records ({'ticker', 'date', 'text'}).
+
+    By default the dataset is opened as a memory-mapped Arrow table: the filter is
+    evaluated on the 'symbol' and 'year' columns only, and transcript text is read
+    batch by batch from the selected rows, so peak memory is bounded by the batch
+    size rather than the corpus. With streaming=True the dataset is read from the
+    Hub shard by shard without a local copy. With `store_dir`, transcripts are read
+    from a local snapshot (see analysis/transcript_store.py) with no network access.
+    """
+    tickers = list(tickers or TARGET_TICKERS)
+
+    if store_dir:
+        from analysis.transcript_store import iter_store_batches
+        yield from iter_store_batches(store_dir, tickers, start_year, end_year, batch_size=batch_size)
+        return
+
+    if streaming:
+        dataset = load_dataset(DATASET_NAME, split='train', streaming=True)
+        wanted = set(tickers)
+        dataset = dataset.filter(
+            lambda symbols, years: [s in wanted and start_year <= y <= end_year for s, y in zip(symbols, years)],
+            input_columns=['symbol', 'year'], batched=True,
+        )
+        batch = []
+        for row in dataset:
+            batch.append({'ticker': row['symbol'], 'date': row['date'], 'text': row['content']})
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return
+
+    selected = open_filtered_dataset(tickers, start_year, end_year)
+    if selected is None:
+        return
+    for batch in selected.select_columns(SOURCE_COLUMNS).iter(batch_size=batch_size):
+        yield _to_records(batch)
+
+
+def open_filtered_dataset(tickers=None, start_year=START_YEAR, end_year=END_YEAR):
+    """
+    Opens the memory-mapped dataset and returns a lazy view of the rows matching
+    the ticker/year filter, or None if nothing matches. No transcript text is read.
+    """
+    dataset = load_dataset(DATASET_NAME, split='train')
+    mask = _filter_mask(dataset.data, list(tickers or TARGET_TICKERS), start_year, end_year)
+    indices = pc.indices_nonzero(mask).to_pylist()
+    if not indices:
+        return None
+    return dataset.select(indices)
+
+
+def iter_transcripts(**kwargs):
+    """Yields transcript records one at a time; accepts the same arguments as iter_transcript_batches."""
+    for batch in iter_transcript_batches(**kwargs):
+        yield from batch
+
+
+def download_and_process_transcripts(tickers=None, start_year=START_YEAR, end_year=END_YEAR, store_dir=None):
     """
     Downloads, filters, and processes S&P 500 earnings call transcripts.
+    If `store_dir` is given, they are read from the local transcript store instead.
     """
-    # Load the dataset from Hugging Face
-    dataset = load_dataset("kurry/sp500_earnings_transcripts", split='train')
-    
-    # Convert to pandas DataFrame for easier manipulation
-    df = pd.DataFrame(dataset)
-    
-    # Define the tickers and date range
-    target_tickers = [
-        'MSFT', 'AAPL', 'NVDA', 'GOOGL', 'META', 
-        'AMZN', 'NFLX', 'AMD', 'CRM', 'ADBE', 
-        'INTU', 'NOW', 'AMAT', 'CSCO'
-    ]
-    start_year = 2010
-    end_year = 2024
-    
-    # Filter for the target tickers and years
-    filtered_df = df[
-        (df['symbol'].isin(target_tickers)) &
-        (df['year'] >= start_year) &
-        (df['year'] <= end_year)
-    ]
-    
-    # Standardize the column names and format
-    # The plan requires 'ticker', 'date', and 'text'
-    # The dataset provides 'symbol', 'date', and 'content'
-    processed_data = []
-    for _, row in filtered_df.iterrows():
-        processed_data.append({
-            'ticker': row['symbol'],
-            'date': row['date'],
-            'text': row['content']
-        })
-        
-    return processed_data
+    return list(iter_transcripts(tickers=tickers, start_year=start_year, end_year=end_year, store_dir=store_dir))
 
 if __name__ == '__main__':
     # Example of how to run the function and see the output
@@ -2,23 +2,25 @@ import pandas as pd
 import statsmodels.api as sm
 import os
 
+from analysis.feature_store import read_feature_table, list_feature_columns, feature_store_exists
+
 def evaluate_all_features():
     """
     Calculates the R-squared value for every feature against the next quarter return
     and prints a ranked list of the most predictive features.
     """
-    file_path = 'output/transcript_features_with_performance.csv'
-    if not os.path.exists(file_path):
-        print(f"Error: Data file not found at {file_path}")
+    if not feature_store_exists():
+        print("Error: Feature data not found.")
         print("Please run the main pipeline first.")
         return
 
-    df = pd.read_csv(file_path)
-
     # Identify all potential feature columns (linguistic metrics)
     # Exclude identifiers, target variables, and other non-feature columns
     excluded_cols = ['ticker', 'date', 'speaker', 'next_quarter_return', 'next_quarter_volatility']
-    feature_cols = [col for col in df.columns if col not in excluded_cols]
+    feature_cols = [col for col in list_feature_columns() if col not in excluded_cols]
+
+    # Identifiers are never used here, so they are not read.
+    df = read_feature_table(columns=feature_cols + ['next_quarter_return', 'next_quarter_volatility'])
 
     results_return = []
     results_volatility = []
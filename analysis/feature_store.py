@@ -0,0 +1,112 @@
+# analysis/feature_store.py
+"""
+Typed Parquet store for the engineered transcript features.
+
+Replaces output/transcript_features_with_performance.csv. The table has an
+explicit schema (categorical ticker, native timestamps, float32 features,
+int8 class labels), is zstd-compressed, and is sorted by date into small row
+groups, so readers can project just the columns they need and skip row groups
+outside a date range (e.g. only the `_zscore` columns for 2024).
+"""
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_FEATURES_PATH = 'output/transcript_features_with_performance.parquet'
+LEGACY_CSV_PATH = 'output/transcript_features_with_performance.csv'
+
+LABEL_COLUMNS = ['return_class', 'volatility_class']
+
+ROW_GROUP_SIZE = 1024
+
+
+def feature_schema(df):
+    """Builds the Arrow schema for a feature frame: ids, float32 features and int8 labels."""
+    fields = []
+    for col in df.columns:
+        if col == 'ticker':
+            fields.append(pa.field(col, pa.dictionary(pa.int32(), pa.string())))
+        elif col == 'date':
+            fields.append(pa.field(col, pa.timestamp('ns')))
+        elif col == 'speaker':
+            fields.append(pa.field(col, pa.string()))
+        elif col in LABEL_COLUMNS and df[col].notna().all():
+            fields.append(pa.field(col, pa.int8()))
+        else:
+            fields.append(pa.field(col, pa.float32()))
+    return pa.schema(fields)
+
+
+def write_feature_table(df, path=DEFAULT_FEATURES_PATH):
+    """Writes the feature frame to compressed Parquet using the explicit feature schema."""
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    if 'speaker' in df.columns:
+        df['speaker'] = df['speaker'].astype(object).where(df['speaker'].notna(), None)
+    df = df.sort_values(['date', 'ticker'], kind='stable').reset_index(drop=True)
+
+    table = pa.Table.from_pandas(df, schema=feature_schema(df), preserve_index=False)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, compression='zstd', row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp_path, path)
+    return path
+
+
+def feature_store_exists(path=DEFAULT_FEATURES_PATH):
+    return os.path.exists(path) or os.path.exists(LEGACY_CSV_PATH)
+
+
+def list_feature_columns(path=DEFAULT_FEATURES_PATH, suffix=None):
+    """Returns the stored column names (optionally only those ending in `suffix`) without reading data."""
+    if os.path.exists(path):
+        names = pq.read_schema(path).names
+    else:
+        names = list(pd.read_csv(LEGACY_CSV_PATH, nrows=0).columns)
+    if suffix:
+        names = [name for name in names if name.endswith(suffix)]
+    return names
+
+
+def _date_filters(year, start_date, end_date):
+    if year is not None:
+        start_date = pd.Timestamp(year=year, month=1, day=1)
+        end_date = pd.Timestamp(year=year + 1, month=1, day=1)
+    filters = []
+    if start_date is not None:
+        filters.append(('date', '>=', pd.Timestamp(start_date)))
+    if end_date is not None:
+        filters.append(('date', '<', pd.Timestamp(end_date)))
+    return filters
+
+
+def read_feature_table(path=DEFAULT_FEATURES_PATH, columns=None, year=None, start_date=None, end_date=None):
+    """
+    Reads the feature table into pandas.
+
+    Args:
+        columns (list): Columns to read; None reads all of them.
+        year (int): Only rows dated in this calendar year.
+        start_date, end_date: Only rows with start_date <= date < end_date.
+
+    Date predicates are pushed down to Parquet row-group statistics. If only the
+    legacy CSV exists it is read and filtered in memory instead.
+    """
+    filters = _date_filters(year, start_date, end_date)
+
+    if not os.path.exists(path):
+        usecols = None if columns is None else list(dict.fromkeys(list(columns) + ['date']))
+        df = pd.read_csv(LEGACY_CSV_PATH, usecols=usecols)
+        df['date'] = pd.to_datetime(df['date'])
+        for _, op, value in filters:
+            df = df[df['date'] >= value] if op == '>=' else df[df['date'] < value]
+        if columns is not None:
+            df = df[list(columns)]
+        return df.reset_index(drop=True)
+
+    table = pq.read_table(path, columns=columns, filters=filters or None)
+    return table.to_pandas()
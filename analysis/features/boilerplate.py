@@ -0,0 +1,272 @@
+# analysis/features/boilerplate.py
+"""
+Corpus-wide near-duplicate passage index (MinHash + LSH) for boilerplate removal.
+
+Every document is split into passages (paragraphs, with long ones cut at
+sentence boundaries), and each passage is summarized by a MinHash signature
+of its word shingles. Signatures are banded into LSH buckets, so finding the
+near-duplicates of a passage costs a few dictionary lookups rather than a
+scan of the corpus. A passage that recurs (Jaccard >= threshold) in at least
+`min_documents` other documents is treated as boilerplate: safe-harbor
+language, operator scripts, standard disclaimers.
+
+The index persists to a single .npz file and accepts new documents
+incrementally. Index the whole corpus first, then pass the index to
+extract_features(boilerplate=...) to drop boilerplate spans before any
+feature is computed; stripping while documents are still being added would
+make the result depend on the order they arrive in.
+
+Usage:
+    python -m analysis.features.boilerplate build [--index PATH] [--store DIR]
+    python -m analysis.features.boilerplate stats [--index PATH]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+DEFAULT_INDEX_PATH = os.path.join('cache', 'boilerplate_index.npz')
+
+PARAGRAPH_SPLIT = re.compile(r'\n+')
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+WORD_PATTERN = re.compile(r'\w+')
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def split_passages(text, max_chars=600, min_words=8):
+    """
+    Splits `text` into passages and returns their (start, end) character spans.
+    Paragraphs longer than `max_chars` are cut at sentence boundaries; passages
+    with fewer than `min_words` words are skipped.
+    """
+    spans = []
+    position = 0
+    for paragraph in PARAGRAPH_SPLIT.split(text):
+        start = text.index(paragraph, position) if paragraph else position
+        position = start + len(paragraph)
+        chunk_start = start
+        chunk_end = start
+        for sentence in SENTENCE_END.split(paragraph):
+            if not sentence:
+                continue
+            sentence_start = text.index(sentence, chunk_end)
+            sentence_end = sentence_start + len(sentence)
+            if sentence_end - chunk_start > max_chars and chunk_end > chunk_start:
+                spans.append((chunk_start, chunk_end))
+                chunk_start = sentence_start
+            chunk_end = sentence_end
+        if chunk_end > chunk_start:
+            spans.append((chunk_start, chunk_end))
+    return [(s, e) for s, e in spans if len(WORD_PATTERN.findall(text[s:e])) >= min_words]
+
+
+def strip_spans(text, spans):
+    """Returns `text` with the given (start, end) spans removed (spans may overlap)."""
+    if not spans:
+        return text
+    pieces = []
+    position = 0
+    for start, end in sorted(spans):
+        if start > position:
+            pieces.append(text[position:start])
+        position = max(position, end)
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+
+class BoilerplateIndex:
+    """
+    MinHash/LSH index of document passages.
+
+    Args:
+        num_perm (int): MinHash permutations per signature.
+        bands (int): LSH bands; num_perm / bands rows each. With 16 bands of 8 rows,
+            pairs above ~0.7 Jaccard are almost always candidates.
+        threshold (float): Estimated Jaccard similarity for two passages to count as duplicates.
+        shingle_size (int): Words per shingle.
+        min_documents (int): Other documents a passage must recur in to be boilerplate.
+    """
+
+    def __init__(self, num_perm=128, bands=16, threshold=0.8, shingle_size=5, min_documents=3, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.min_documents = min_documents
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 61 - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 61 - 1, size=num_perm, dtype=np.uint64)
+
+        self.doc_ids = []
+        self._doc_index = {}
+        self._signatures = []
+        self._passage_docs = []
+        self._buckets = [defaultdict(list) for _ in range(bands)]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_index
+
+    def _shingle_hashes(self, passage):
+        words = WORD_PATTERN.findall(passage.lower())
+        k = min(self.shingle_size, len(words))
+        shingles = {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+        return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signatures(self, text, spans=None):
+        """MinHash signatures (n_passages x num_perm, uint32) of `text`'s passages and their spans."""
+        spans = split_passages(text) if spans is None else spans
+        if not spans:
+            return np.empty((0, self.num_perm), dtype=np.uint32), spans
+        hashes = [self._shingle_hashes(text[start:end]) for start, end in spans]
+        offsets = np.cumsum([0] + [len(h) for h in hashes[:-1]])
+        permuted = (np.outer(np.concatenate(hashes), self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return np.minimum.reduceat(permuted, offsets, axis=0).astype(np.uint32), spans
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _insert(self, signature, doc_position):
+        passage_id = len(self._signatures)
+        self._signatures.append(signature)
+        self._passage_docs.append(doc_position)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band][key].append(passage_id)
+
+    def add_document(self, doc_id, text):
+        """Indexes the passages of a document. Documents already indexed are skipped; returns passages added."""
+        if doc_id in self._doc_index or not text:
+            return 0
+        signatures, _ = self.signatures(text)
+        doc_position = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self._doc_index[doc_id] = doc_position
+        for signature in signatures:
+            self._insert(signature, doc_position)
+        return len(signatures)
+
+    def query(self, signature):
+        """Returns the ids of indexed passages whose estimated Jaccard similarity is >= threshold."""
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        if not candidates:
+            return []
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        matrix = np.stack([self._signatures[i] for i in candidates])
+        similarity = (matrix == signature).mean(axis=1)
+        return candidates[similarity >= self.threshold].tolist()
+
+    def matching_documents(self, signature, exclude=None, limit=None):
+        """
+        Returns the positions of indexed documents (other than `exclude`) with a passage
+        whose estimated Jaccard similarity to `signature` is >= threshold. Candidates
+        are checked one at a time, skipping documents already found, and the search
+        stops as soon as `limit` documents are found.
+        """
+        required = self.threshold * self.num_perm
+        documents = set()
+        checked = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            for passage_id in self._buckets[band].get(key, ()):
+                document = self._passage_docs[passage_id]
+                if document == exclude or document in documents or passage_id in checked:
+                    continue
+                checked.add(passage_id)
+                if np.count_nonzero(self._signatures[passage_id] == signature) >= required:
+                    documents.add(document)
+                    if limit is not None and len(documents) >= limit:
+                        return documents
+        return documents
+
+    def boilerplate_spans(self, text, doc_id=None):
+        """
+        Returns the (start, end) spans of `text` whose passages recur in at least
+        `min_documents` indexed documents other than `doc_id`.
+        """
+        signatures, spans = self.signatures(text)
+        own = self._doc_index.get(doc_id)
+        return [span for signature, span in zip(signatures, spans)
+                if len(self.matching_documents(signature, own, self.min_documents)) >= self.min_documents]
+
+    def strip(self, text, doc_id=None):
+        """Returns `text` without its boilerplate passages."""
+        return strip_spans(text, self.boilerplate_spans(text, doc_id))
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        """Writes the index to a compressed .npz file; LSH buckets are rebuilt on load."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        params = dict(num_perm=self.num_perm, bands=self.bands, threshold=self.threshold,
+                      shingle_size=self.shingle_size, min_documents=self.min_documents, seed=self.seed)
+        signatures = np.stack(self._signatures) if self._signatures else np.empty((0, self.num_perm), np.uint32)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                params=np.array(json.dumps(params)),
+                doc_ids=np.array(json.dumps(self.doc_ids)),
+                signatures=signatures,
+                passage_docs=np.asarray(self._passage_docs, dtype=np.int32),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        with np.load(path) as data:
+            index = cls(**json.loads(str(data['params'])))
+            index.doc_ids = json.loads(str(data['doc_ids']))
+            signatures, passage_docs = data['signatures'], data['passage_docs']
+        index._doc_index = {doc_id: position for position, doc_id in enumerate(index.doc_ids)}
+        for signature, doc_position in zip(signatures, passage_docs.tolist()):
+            index._insert(signature, doc_position)
+        return index
+
+    @classmethod
+    def open(cls, path=DEFAULT_INDEX_PATH, **params):
+        """Loads the index at `path` if it exists, otherwise creates an empty one."""
+        return cls.load(path) if os.path.exists(path) else cls(**params)
+
+
+def transcript_doc_id(entry):
+    return f"{entry.get('ticker')}:{entry.get('date')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the boilerplate passage index.")
+    parser.add_argument('command', choices=['build', 'stats'])
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH)
+    parser.add_argument('--store', default=None, help="Read transcripts from this local transcript store.")
+    args = parser.parse_args()
+
+    index = BoilerplateIndex.open(args.index)
+    if args.command == 'build':
+        from analysis.data_loader import iter_transcripts
+        added = 0
+        for entry in iter_transcripts(store_dir=args.store):
+            added += index.add_document(transcript_doc_id(entry), entry['text'])
+        index.save(args.index)
+        print(f"Indexed {added} new passages.")
+    print(f"{args.index}: {len(index.doc_ids)} documents, {len(index)} passages")
+
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    main()
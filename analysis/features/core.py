@@ -1,5 +1,4 @@
 # analysis/features/core.py (No NLTK Tokenizer)
-import textstat
 import pandas as pd
 import nltk
 import os
@@ -18,54 +17,113 @@ except NameError:
 from analysis.helpers import configure_nltk_path
 configure_nltk_path() # Configure NLTK path BEFORE using its modules
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from nltk.tokenize import sent_tokenize
 import numpy as np
 
-def calculate_core_linguistic_features(data):
+from analysis.features.engine import register_feature_family, extract_features, DEFAULT_CHUNKSIZE
+from analysis.features.sentiment_cache import SentimentCache, DEFAULT_MAX_ENTRIES
+from analysis.features.readability import flesch_kincaid_grade
+from analysis.features.sentences import segment
+
+GENERALIZING_WORDS = ["generally", "typically", "fundamentals", "usually", "normally", "overall"]
+SELF_REFERENCE_WORDS = ["i", "we", "my", "our", "mine", "ours"]
+
+CORE_FEATURE_COLUMNS = ['complexity_score', 'sentiment_score', 'generalizing_score', 'self_reference_score']
+
+# Sentence sentiment cache settings live in the environment so that worker
+# processes (forked or spawned) pick up the same configuration.
+SENTIMENT_CACHE_PATH_ENV = 'LINGUISTIC_ALPHA_SENTIMENT_CACHE'
+SENTIMENT_CACHE_SIZE_ENV = 'LINGUISTIC_ALPHA_SENTIMENT_CACHE_SIZE'
+
+_sentiment_analyzer = None
+_sentiment_cache = None
+_sentiment_cache_pid = None
+
+def get_sentiment_analyzer():
+    """Returns a process-wide VADER analyzer, loading the lexicon on first use."""
+    global _sentiment_analyzer
+    if _sentiment_analyzer is None:
+        _sentiment_analyzer = SentimentIntensityAnalyzer()
+    return _sentiment_analyzer
+
+def configure_sentiment_cache(path=None, max_entries=DEFAULT_MAX_ENTRIES):
+    """
+    Sets up the sentence sentiment cache. With a `path`, scores are persisted
+    to that SQLite file and reused across runs and worker processes.
+    """
+    global _sentiment_cache
+    if path:
+        os.environ[SENTIMENT_CACHE_PATH_ENV] = path
+    else:
+        os.environ.pop(SENTIMENT_CACHE_PATH_ENV, None)
+    os.environ[SENTIMENT_CACHE_SIZE_ENV] = str(max_entries)
+    _sentiment_cache = None
+    return get_sentiment_cache()
+
+def get_sentiment_cache():
+    """Returns this process's SentimentCache, creating it on first use (and after a fork)."""
+    global _sentiment_cache, _sentiment_cache_pid
+    if _sentiment_cache is None or _sentiment_cache_pid != os.getpid():
+        _sentiment_cache = SentimentCache(
+            max_entries=int(os.environ.get(SENTIMENT_CACHE_SIZE_ENV, DEFAULT_MAX_ENTRIES)),
+            path=os.environ.get(SENTIMENT_CACHE_PATH_ENV),
+        )
+        _sentiment_cache_pid = os.getpid()
+    return _sentiment_cache
+
+def load_core_resources():
+    """Loads the VADER lexicon, the sentence segmenter and the sentiment cache ahead of the first document."""
+    get_sentiment_analyzer()
+    get_sentiment_cache()
+    segment("Warm up.")
+
+def flush_sentiment_cache():
+    get_sentiment_cache().flush()
+
+def sentiment_cache_counters():
+    """This process's sentiment cache counters since the last call (run in worker processes)."""
+    return get_sentiment_cache().take_counters()
+
+def merge_sentiment_cache_counters(counters):
+    """Adds a worker's sentiment cache counters to this process's cache statistics."""
+    get_sentiment_cache().add_counters(counters)
+
+@register_feature_family('core', CORE_FEATURE_COLUMNS, needs=('text', 'tokens', 'sentences'), id_columns=('speaker',),
+                         lexicons={'generalizing_score': GENERALIZING_WORDS, 'self_reference_score': SELF_REFERENCE_WORDS},
+                         setup=load_core_resources, flush=flush_sentiment_cache,
+                         stats=sentiment_cache_counters, merge_stats=merge_sentiment_cache_counters,
+                         modules=('analysis.features.sentiment_cache', 'analysis.features.readability'))
+def core_linguistic_family(doc):
+    """
+    Computes the per-document core features for one Document of the shared token stream.
+    The generalizing and self-reference densities are counted by the engine from the token ids.
+    """
+    # Features that DO NOT depend on the tokenizer change
+    # Same value as textstat.flesch_kincaid_grade, with syllables cached per distinct word. Sentences
+    # are counted with textstat's rule, not doc.sentence_spans: the models are trained on this value.
+    complexity_score = flesch_kincaid_grade(doc.text, doc.lower)
+
+    # --- MODIFIED SENTIMENT ANALYSIS ---
+    # VADER is not reliable on long documents. We analyze sentence-by-sentence.
+    # Repeated sentences (operator scripts, safe-harbor language) are scored once via the cache.
+    sentences = doc.sentences
+    if sentences:
+        sid = get_sentiment_analyzer()
+        cache = get_sentiment_cache()
+        sentence_sentiments = [cache.compound(sentence, sid) for sentence in sentences]
+        sentiment_score = np.mean(sentence_sentiments)
+    else:
+        sentiment_score = 0
+
+    # --- FEATURE REMOVED ---
+    # The Tense Analysis feature is removed as it requires nltk.pos_tag,
+    # which depends on the punkt tokenizer.
+
+    return {
+        'complexity_score': complexity_score,
+        'sentiment_score': sentiment_score
+        # 'future_tense_ratio' and 'past_tense_ratio' are removed
+    }
+
+def calculate_core_linguistic_features(data, n_jobs=1, chunksize=DEFAULT_CHUNKSIZE):
     """Calculates "Core" linguistic features from standard filings."""
-    if not isinstance(data, list) or not data:
-        return pd.DataFrame()
-
-    sid = SentimentIntensityAnalyzer()
-    features = []
-    
-    generalizing_words = ["generally", "typically", "fundamentals", "usually", "normally", "overall"]
-    self_reference_words = ["i", "we", "my", "our", "mine", "ours"]
-
-    for entry in data:
-        text = entry.get('text', '')
-        if not text: continue
-        
-        # --- REPLACEMENT FOR NLTK TOKENIZER ---
-        # This is robust and has no external dependencies.
-        tokens = re.findall(r'\b\w+\b', text.lower())
-        if not tokens: continue
-
-        # Features that DO NOT depend on the tokenizer change
-        complexity_score = textstat.flesch_kincaid_grade(text)
-        
-        # --- MODIFIED SENTIMENT ANALYSIS ---
-        # VADER is not reliable on long documents. We analyze sentence-by-sentence.
-        sentences = sent_tokenize(text)
-        if sentences:
-            sentence_sentiments = [sid.polarity_scores(sentence)['compound'] for sentence in sentences]
-            sentiment_score = np.mean(sentence_sentiments)
-        else:
-            sentiment_score = 0
-        
-        # Features that now use the new tokenizer
-        generalizing_score = sum(1 for word in tokens if word in generalizing_words) / len(tokens)
-        self_reference_score = sum(1 for word in tokens if word in self_reference_words) / len(tokens)
-        
-        # --- FEATURE REMOVED ---
-        # The Tense Analysis feature is removed as it requires nltk.pos_tag,
-        # which depends on the punkt tokenizer.
-        
-        features.append({
-            'ticker': entry.get('ticker'), 'date': entry.get('date'),
-            'speaker': entry.get('speaker'), 'complexity_score': complexity_score,
-            'sentiment_score': sentiment_score, 'generalizing_score': generalizing_score,
-            'self_reference_score': self_reference_score
-            # 'future_tense_ratio' and 'past_tense_ratio' are removed
-        })
-    return pd.DataFrame(features)
\ No newline at end of file
+    return extract_features(data, families=['core'], n_jobs=n_jobs, chunksize=chunksize)
@@ -0,0 +1,373 @@
+# analysis/features/engine.py
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, partial
+
+import numpy as np
+import pandas as pd
+
+from analysis.features.vocabulary import Vocabulary, lexicon_counts
+
+# The single tokenization rule shared by every feature family.
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+ID_COLUMNS = ['ticker', 'date']
+
+# Modules behind the shared Document views and lexicon counting, which every family reads.
+ENGINE_MODULES = ['analysis.features.engine', 'analysis.features.vocabulary', 'analysis.features.sentences',
+                  'analysis.features.sections']
+
+# A feature family is a function of a Document that returns a dict of feature values.
+# `needs` documents which shared views it reads (e.g. 'tokens', 'sentences', 'text').
+# `lexicons` maps density columns to word lists; those columns are not computed by
+# `func` but for all documents at once from the interned token ids.
+# `setup` is an optional callable that loads expensive state (lexicons, models) up front,
+# and `flush` an optional callable run after each batch of documents to persist state.
+# `section` names the filing section the family reads (see analysis.features.sections);
+# None means the whole document.
+# `stats` optionally returns the counters a worker process accumulated since it was last
+# asked (e.g. cache hits); the parent hands them to `merge_stats` after each chunk.
+# `modules` names the modules whose code the family's values depend on; their source is
+# part of the feature cache fingerprint (see analysis.features.feature_cache).
+FeatureFamily = namedtuple('FeatureFamily', ['name', 'func', 'columns', 'needs', 'id_columns', 'lexicons',
+                                             'setup', 'flush', 'section', 'stats', 'merge_stats', 'modules'])
+
+FEATURE_FAMILIES = {}
+
+# Families computed by default, in output column order.
+DEFAULT_FAMILIES = ['core', 'mda', 'risk_keywords']
+
+# Number of transcripts handed to a worker process at a time in parallel mode.
+DEFAULT_CHUNKSIZE = 16
+
+# Internal id column that carries the text hash through extraction when caching.
+CACHE_KEY_COLUMN = '_text_key'
+
+
+def add_feature_family(name, columns, func=None, needs=('tokens',), id_columns=(), lexicons=None, setup=None,
+                       flush=None, section=None, stats=None, merge_stats=None, modules=()):
+    """
+    Registers a feature family with the engine.
+
+    `id_columns` lists any extra entry fields (beyond ticker/date) that the
+    family's output rows carry, e.g. 'speaker' for the core features.
+    `lexicons` maps output columns to word lists whose per-token density is
+    computed by the engine; a family made only of lexicon densities needs no `func`.
+    `setup` is called once per worker process before any document is processed,
+    and `flush` after every batch (the whole input serially, each chunk in parallel).
+    With a `section`, `func` and the lexicon densities see only that section of
+    each document (the whole document if it has no such section).
+    In parallel mode, `stats` is called in the worker after every chunk and the
+    counters it returns are passed to `merge_stats` in the calling process, so
+    process-local statistics add up as they would in a serial run.
+    `modules` lists the helper modules `func` calls into, beyond its own module
+    and the engine's; editing any of them invalidates cached rows of the family.
+    """
+    modules = tuple(dict.fromkeys(([func.__module__] if func is not None else []) + list(modules)))
+    FEATURE_FAMILIES[name] = FeatureFamily(name, func, list(columns), tuple(needs), tuple(id_columns),
+                                           dict(lexicons or {}), setup, flush, section, stats, merge_stats,
+                                           modules)
+
+
+def register_feature_family(name, columns, needs=('tokens',), id_columns=(), lexicons=None, setup=None,
+                            flush=None, section=None, stats=None, merge_stats=None, modules=()):
+    """Decorator form of add_feature_family."""
+    def decorator(func):
+        add_feature_family(name, columns, func, needs, id_columns, lexicons, setup, flush, section, stats,
+                           merge_stats, modules)
+        return func
+    return decorator
+
+
+class Document:
+    """
+    Shared, lazily computed views of a single transcript.
+    Each view is built at most once, no matter how many families read it.
+    """
+
+    def __init__(self, text, vocabulary=None):
+        self.text = text
+        self.vocabulary = vocabulary
+
+    @cached_property
+    def lower(self):
+        return self.text.lower()
+
+    @cached_property
+    def tokens(self):
+        return TOKEN_PATTERN.findall(self.lower)
+
+    @cached_property
+    def token_ids(self):
+        """The tokens as an int32 array of ids in the shared Vocabulary."""
+        return self.vocabulary.encode(self.tokens)
+
+    @cached_property
+    def sentence_spans(self):
+        """Sentence boundaries as offset arrays, segmented once with the configured segmenter."""
+        from analysis.features.sentences import segment
+        return segment(self.text)
+
+    @property
+    def sentences(self):
+        """The sentences as strings, sliced from sentence_spans as they are iterated."""
+        return self.sentence_spans
+
+    def findall(self, pattern):
+        """All matches of a compiled regex in the text."""
+        return pattern.findall(self.text)
+
+    @cached_property
+    def section_index(self):
+        """Item sections of a 10-Q/10-K text, segmented once per document."""
+        from analysis.features.sections import find_sections
+        return find_sections(self.text)
+
+    def section(self, name):
+        """A view of the named section, or the document itself if it has none (e.g. a transcript)."""
+        views = self._section_views
+        if name not in views:
+            span = self.section_index.span(name)
+            views[name] = self if span is None else DocumentSection(self, *span)
+        return views[name]
+
+    @cached_property
+    def _section_views(self):
+        return {}
+
+
+class DocumentSection(Document):
+    """
+    A section of a Document, given by character offsets into its text.
+    Tokens and regex matches are found within the parent's text and lowercased
+    text (pos/endpos), so the section is not copied unless `text` is read.
+    """
+
+    def __init__(self, parent, start, end):
+        self.parent = parent
+        self.start = start
+        self.end = end
+        self.vocabulary = parent.vocabulary
+
+    @cached_property
+    def text(self):
+        return self.parent.text[self.start:self.end]
+
+    @cached_property
+    def _aligned(self):
+        # Lowercasing can change the length of a few characters (e.g. 'İ'); offsets then no longer line up.
+        return len(self.parent.lower) == len(self.parent.text)
+
+    @cached_property
+    def lower(self):
+        return self.parent.lower[self.start:self.end] if self._aligned else self.text.lower()
+
+    @cached_property
+    def tokens(self):
+        if self._aligned:
+            return TOKEN_PATTERN.findall(self.parent.lower, self.start, self.end)
+        return TOKEN_PATTERN.findall(self.lower)
+
+    def findall(self, pattern):
+        return pattern.findall(self.parent.text, self.start, self.end)
+
+    def section(self, name):
+        return self
+
+
+def _load_default_families():
+    # The feature modules register their families on import.
+    import analysis.features.core  # noqa: F401
+    import analysis.features.mda  # noqa: F401
+    import analysis.features.risk_factors  # noqa: F401
+
+
+def get_feature_families(names=None):
+    """Returns the registered FeatureFamily objects for `names` (defaults to DEFAULT_FAMILIES)."""
+    _load_default_families()
+    names = names or DEFAULT_FAMILIES
+    missing = [name for name in names if name not in FEATURE_FAMILIES]
+    if missing:
+        raise KeyError(f"Unknown feature families: {missing}")
+    return [FEATURE_FAMILIES[name] for name in names]
+
+
+def _output_id_columns(selected):
+    id_columns = list(ID_COLUMNS)
+    for family in selected:
+        id_columns.extend(col for col in family.id_columns if col not in id_columns)
+    return id_columns
+
+
+def _extract_rows(data, selected, id_columns=None):
+    """Runs the single-pass extraction for `data` in the current process."""
+    id_columns = id_columns or _output_id_columns(selected)
+    # Lexicon densities are counted per section, over the token ids of that section of each document.
+    lexicon_columns = {}
+    for family in selected:
+        for col, words in family.lexicons.items():
+            lexicon_columns.setdefault(family.section, []).append((col, words))
+    sections = list(dict.fromkeys(family.section for family in selected))
+
+    vocabulary = Vocabulary()
+    features = []
+    encoded_docs = {section: [] for section in lexicon_columns}
+    for entry in data:
+        text = entry.get('text', '')
+        if not text:
+            continue
+
+        doc = Document(text, vocabulary)
+        views = {section: doc if section is None else doc.section(section) for section in sections}
+        # A section view includes its heading, so it only lacks tokens when the whole document does.
+        if not all(view.tokens for view in views.values()):
+            continue
+
+        row = {col: entry.get(col) for col in id_columns}
+        for family in selected:
+            if family.func is not None:
+                row.update(family.func(views[family.section]))
+        features.append(row)
+        for section, encoded in encoded_docs.items():
+            encoded.append(views[section].token_ids)
+
+    for family in selected:
+        if family.flush is not None:
+            family.flush()
+
+    if not features:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(features)
+    for section, columns in lexicon_columns.items():
+        lengths = np.array([len(ids) for ids in encoded_docs[section]])
+        densities = lexicon_counts(encoded_docs[section], vocabulary, [words for _, words in columns]) / lengths[:, None]
+        for j, (col, _) in enumerate(columns):
+            df[col] = densities[:, j]
+
+    output_columns = id_columns + [col for family in selected for col in family.columns]
+    return df[output_columns]
+
+
+# --- Parallel execution ---
+# Each worker process resolves its families once in the initializer, so NLTK/VADER
+# state is loaded once per worker rather than once per chunk.
+_worker_families = None
+
+
+def _init_worker(family_names):
+    global _worker_families
+    from analysis.helpers import configure_nltk_path
+    configure_nltk_path()
+    _worker_families = get_feature_families(family_names)
+    for family in _worker_families:
+        if family.setup is not None:
+            family.setup()
+
+
+def _extract_chunk(chunk, id_columns=None):
+    """Extracts one chunk in a worker; returns its rows and each family's counters for the chunk."""
+    frame = _extract_rows(chunk, _worker_families, id_columns)
+    stats = {family.name: family.stats() for family in _worker_families if family.stats is not None}
+    return frame, stats
+
+
+def resolve_n_jobs(n_jobs):
+    """Maps n_jobs to a worker count: None or a value below 1 means one worker per CPU."""
+    if n_jobs is None or n_jobs < 1:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+def _run_extraction(data, family_names, selected, n_jobs, chunksize, id_columns=None):
+    n_jobs = resolve_n_jobs(n_jobs)
+    chunksize = max(1, chunksize)
+    if n_jobs == 1 or len(data) <= chunksize:
+        return _extract_rows(data, selected, id_columns)
+
+    chunks = [data[i:i + chunksize] for i in range(0, len(data), chunksize)]
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks)), initializer=_init_worker,
+                             initargs=(family_names,)) as executor:
+        results = list(executor.map(partial(_extract_chunk, id_columns=id_columns), chunks))
+
+    families = {family.name: family for family in selected}
+    for _, stats in results:
+        for name, counters in stats.items():
+            if families[name].merge_stats is not None:
+                families[name].merge_stats(counters)
+    frames = [frame for frame, _ in results if not frame.empty]
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def _extract_with_cache(data, family_names, selected, n_jobs, chunksize, cache):
+    """Serves unchanged transcripts from `cache` and only extracts the new or changed ones."""
+    from analysis.features.feature_cache import feature_fingerprint, text_key
+
+    fingerprint = feature_fingerprint(selected)
+    entries = [(entry, text_key(entry['text'])) for entry in data if entry.get('text')]
+    rows = cache.get_many([key for _, key in entries], fingerprint)
+
+    misses = {}
+    for entry, key in entries:
+        if key not in rows and key not in misses:
+            misses[key] = {'text': entry['text'], CACHE_KEY_COLUMN: key}
+    if misses:
+        computed = _run_extraction(list(misses.values()), family_names, selected, n_jobs, chunksize,
+                                   id_columns=[CACHE_KEY_COLUMN])
+        if not computed.empty:
+            new_rows = {record.pop(CACHE_KEY_COLUMN): record for record in computed.to_dict('records')}
+            cache.put_many(new_rows, fingerprint)
+            rows.update(new_rows)
+
+    id_columns = _output_id_columns(selected)
+    feature_columns = [col for family in selected for col in family.columns]
+    features = [
+        {**{col: entry.get(col) for col in id_columns}, **rows[key]}
+        for entry, key in entries if key in rows
+    ]
+    if not features:
+        return pd.DataFrame()
+    return pd.DataFrame(features, columns=id_columns + feature_columns)
+
+
+def extract_features(data, families=None, n_jobs=1, chunksize=DEFAULT_CHUNKSIZE, cache=None, boilerplate=None):
+    """
+    Computes every requested feature family in a single pass over `data`.
+
+    Each transcript is lowercased and tokenized exactly once; all families read
+    from the same Document, so the result is one row per transcript rather than
+    several frames that have to be merged back together on ticker/date.
+    Tokens are interned into one Vocabulary as they are seen, and every lexicon
+    density is then counted for the whole corpus with a few array operations.
+
+    With n_jobs > 1 the transcripts are split into chunks of `chunksize` and fanned
+    out over a process pool. Chunks are reassembled in input order, and every
+    feature depends only on its own transcript, so the output is identical to
+    the serial path.
+
+    If a FeatureCache is passed as `cache`, rows for transcripts whose text and
+    feature code are unchanged are read back from it instead of being recomputed.
+
+    If a BoilerplateIndex is passed as `boilerplate`, passages that recur across
+    the corpus are removed from each transcript before any feature is computed.
+    """
+    if not isinstance(data, list) or not data:
+        return pd.DataFrame()
+
+    if boilerplate is not None:
+        from analysis.features.boilerplate import transcript_doc_id
+        data = [
+            {**entry, 'text': boilerplate.strip(entry['text'], transcript_doc_id(entry))} if entry.get('text') else entry
+            for entry in data
+        ]
+
+    family_names = list(families or DEFAULT_FAMILIES)
+    selected = get_feature_families(family_names)
+    if cache is not None:
+        return _extract_with_cache(data, family_names, selected, n_jobs, chunksize, cache)
+    return _run_extraction(data, family_names, selected, n_jobs, chunksize)
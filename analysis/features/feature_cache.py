@@ -0,0 +1,167 @@
+# analysis/features/feature_cache.py
+"""
+Content-addressed cache of per-transcript feature rows.
+
+Rows are keyed by a hash of the transcript text plus a fingerprint of the
+feature code, lexicons and NLP library versions, so a rerun only computes
+transcripts that are new or changed, and any change to a feature definition
+automatically misses the old entries.
+
+Usage:
+    python -m analysis.features.feature_cache stats [--path PATH]
+    python -m analysis.features.feature_cache clear [--path PATH] [--stale-only]
+"""
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sqlite3
+import sys
+from importlib import metadata
+
+DEFAULT_CACHE_PATH = os.path.join('cache', 'features.sqlite')
+
+# Bump to invalidate every cached row regardless of the code fingerprint.
+FEATURE_CACHE_VERSION = 1
+
+# Library versions that change feature values (VADER, Punkt, textstat syllables).
+FINGERPRINT_PACKAGES = ['nltk', 'textstat', 'numpy']
+
+
+def text_key(text):
+    """Content hash of a transcript's text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return 'missing'
+
+
+def feature_fingerprint(families):
+    """
+    Version fingerprint of a list of FeatureFamily objects: their definitions,
+    lexicons, and the source of the engine modules and of every module each
+    family declares (imported here if need be, so the fingerprint does not
+    depend on what the process happened to import first).
+    """
+    from analysis.features.engine import ENGINE_MODULES
+
+    module_names = set(ENGINE_MODULES)
+    digest = hashlib.sha256()
+    digest.update(f"v{FEATURE_CACHE_VERSION}".encode())
+    for family in families:
+        definition = {
+            'name': family.name,
+            'columns': family.columns,
+            'needs': list(family.needs),
+            'id_columns': list(family.id_columns),
+            'lexicons': {col: sorted(words) for col, words in sorted(family.lexicons.items())},
+            'section': family.section,
+        }
+        digest.update(json.dumps(definition, sort_keys=True).encode())
+        module_names.update(family.modules)
+    for module_name in sorted(module_names):
+        digest.update(inspect.getsource(importlib.import_module(module_name)).encode())
+    from analysis.features.sentences import get_sentence_segmenter
+    digest.update(f"segmenter={get_sentence_segmenter()}".encode())
+    for package in FINGERPRINT_PACKAGES:
+        digest.update(f"{package}={_package_version(package)}".encode())
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """SQLite-backed store of feature rows keyed by (text hash, feature fingerprint)."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS features ("
+            " text_key TEXT NOT NULL, fingerprint TEXT NOT NULL, row TEXT NOT NULL,"
+            " PRIMARY KEY (text_key, fingerprint))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys, fingerprint):
+        """Returns {text_key: feature dict} for the keys that are cached under `fingerprint`."""
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        # Stay well below SQLite's bound-parameter limit.
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ','.join('?' * len(batch))
+            rows = self._conn.execute(
+                f"SELECT text_key, row FROM features WHERE fingerprint = ? AND text_key IN ({placeholders})",
+                [fingerprint, *batch],
+            )
+            found.update((key, json.loads(row)) for key, row in rows)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, rows, fingerprint):
+        """Stores {text_key: feature dict} under `fingerprint`."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO features VALUES (?, ?, ?)",
+                [(key, fingerprint, json.dumps(row)) for key, row in rows.items()],
+            )
+
+    def clear(self, keep_fingerprint=None):
+        """Deletes every entry, or only those not produced under `keep_fingerprint`. Returns the count."""
+        with self._conn:
+            if keep_fingerprint is None:
+                cursor = self._conn.execute("DELETE FROM features")
+            else:
+                cursor = self._conn.execute("DELETE FROM features WHERE fingerprint != ?", (keep_fingerprint,))
+        self._conn.execute("VACUUM")
+        return cursor.rowcount
+
+    def summary(self):
+        """Returns {fingerprint: number of cached rows}."""
+        return dict(self._conn.execute("SELECT fingerprint, COUNT(*) FROM features GROUP BY fingerprint"))
+
+    def close(self):
+        self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the incremental feature cache.")
+    parser.add_argument('command', choices=['stats', 'clear'])
+    parser.add_argument('--path', default=DEFAULT_CACHE_PATH)
+    parser.add_argument('--stale-only', action='store_true',
+                        help="Only drop rows computed by an older version of the default feature families.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"No feature cache at {args.path}")
+        return
+
+    from analysis.features.engine import get_feature_families
+    current = feature_fingerprint(get_feature_families())
+    cache = FeatureCache(args.path)
+    if args.command == 'stats':
+        for fingerprint, count in cache.summary().items():
+            marker = ' (current)' if fingerprint == current else ''
+            print(f"{fingerprint[:16]}  {count} rows{marker}")
+    else:
+        removed = cache.clear(keep_fingerprint=current if args.stale_only else None)
+        print(f"Removed {removed} cached feature rows from {args.path}")
+    cache.close()
+
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    main()
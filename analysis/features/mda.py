@@ -18,34 +18,27 @@ from analysis.helpers import configure_nltk_path
 configure_nltk_path()
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 
-def calculate_mda_features(data):
+from analysis.features.engine import register_feature_family, extract_features, DEFAULT_CHUNKSIZE
+
+FORWARD_LOOKING_WORDS = ["will", "expect", "believe", "future", "outlook", "guidance", "project", "anticipate"]
+POSITIVE_WORDS = ["achieved", "growth", "strong", "record", "exceeded", "successful"]
+
+MDA_FEATURE_COLUMNS = ['forward_looking_ratio', 'quantitative_ratio', 'positive_tone_density']
+
+QUANTITATIVE_PATTERN = re.compile(r'\d+')
+
+@register_feature_family('mda', MDA_FEATURE_COLUMNS, needs=('text', 'tokens'),
+                         lexicons={'forward_looking_ratio': FORWARD_LOOKING_WORDS, 'positive_tone_density': POSITIVE_WORDS},
+                         section='mda')
+def mda_family(doc):
+    """
+    Computes the per-document MD&A features for one Document of the shared token stream.
+    For filings, `doc` is the MD&A section (Item 2 of a 10-Q, Item 7 of a 10-K).
+    The forward-looking and positive tone densities are counted by the engine from the token ids.
+    """
+    quantitative_tokens = doc.findall(QUANTITATIVE_PATTERN)
+    return {'quantitative_ratio': len(quantitative_tokens) / len(doc.tokens)}
+
+def calculate_mda_features(data, n_jobs=1, chunksize=DEFAULT_CHUNKSIZE):
     """Calculates features UNIQUE to MD&A sections."""
-    if not isinstance(data, list) or not data:
-        return pd.DataFrame()
-        
-    features = []
-
-    forward_looking_words = ["will", "expect", "believe", "future", "outlook", "guidance", "project", "anticipate"]
-    positive_words = ["achieved", "growth", "strong", "record", "exceeded", "successful"]
-
-    for entry in data:
-        text = entry.get('text', '')
-        if not text: continue
-        
-        # --- REPLACEMENT FOR NLTK TOKENIZER ---
-        tokens = re.findall(r'\b\w+\b', text.lower())
-        if not tokens: continue
-
-        forward_looking_ratio = sum(1 for word in tokens if word in forward_looking_words) / len(tokens)
-        quantitative_tokens = re.findall(r'\d+', text)
-        quantitative_ratio = len(quantitative_tokens) / len(tokens)
-        positive_tone_density = sum(1 for word in tokens if word in positive_words) / len(tokens)
-        
-        features.append({
-            'ticker': entry.get('ticker'), 'date': entry.get('date'),
-            'forward_looking_ratio': forward_looking_ratio,
-            'quantitative_ratio': quantitative_ratio,
-            'positive_tone_density': positive_tone_density
-        })
-        
-    return pd.DataFrame(features)
\ No newline at end of file
+    return extract_features(data, families=['mda'], n_jobs=n_jobs, chunksize=chunksize)
@@ -0,0 +1,97 @@
+# analysis/features/readability.py
+"""
+Readability scores computed in one pass with per-word syllable caching.
+
+textstat recounts syllables for every word occurrence of every document (its
+own caches are keyed on the whole text). Here each distinct word is looked up
+once per document and its syllable count is memoized across documents, since
+the vocabulary of earnings calls is small compared with their length. Word,
+sentence and syllable counts follow textstat's definitions (and its syllable
+counter is called per word), so the scores match textstat.
+"""
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+import textstat
+
+from analysis.features.engine import add_feature_family
+
+# textstat's definitions: punctuation (incl. apostrophes and hyphens) is dropped before
+# splitting into words, sentences are runs of non-terminators, and sentences of
+# two words or fewer are not counted.
+PUNCTUATION = re.compile(r'[^\w\s]')
+SENTENCE_PATTERN = re.compile(r'\b[^.!?]+[.!?]*', re.UNICODE)
+DIFFICULT_WORD_PATTERN = re.compile(r"[\w\='‘’]+")
+
+# Words with at least this many syllables (and not on the easy word list) count as hard for Fog.
+FOG_SYLLABLE_THRESHOLD = 3
+
+READABILITY_FEATURE_COLUMNS = ['gunning_fog', 'flesch_reading_ease']
+
+SYLLABLE_CACHE_SIZE = 500_000
+
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def syllable_count(word):
+    """Syllables in one lowercase, punctuation-free word (textstat's counter, memoized)."""
+    return textstat.syllable_count(word)
+
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def is_difficult_word(word):
+    return textstat.is_difficult_word(word, FOG_SYLLABLE_THRESHOLD)
+
+
+def _round(number, points):
+    """textstat's rounding (half away from zero)."""
+    p = 10 ** points
+    return float(math.floor((number * p) + math.copysign(0.5, number))) / p
+
+
+def _sentence_count(text, sentence_spans=None):
+    sentences = SENTENCE_PATTERN.findall(text) if sentence_spans is None else sentence_spans
+    ignored = sum(1 for sentence in sentences if len(PUNCTUATION.sub('', sentence).split()) <= 2)
+    return max(1, len(sentences) - ignored)
+
+
+def readability_scores(text, lower=None, sentence_spans=None):
+    """
+    Flesch-Kincaid grade, Flesch reading ease and Gunning Fog for `text`.
+
+    `lower` may pass an already lowercased copy of the text (e.g. Document.lower)
+    to avoid lowercasing it again. If `sentence_spans` (a SentenceSpans) is given,
+    sentences are counted from those boundaries instead of textstat's own rule;
+    the scores then follow the shared segmenter rather than matching textstat exactly.
+    """
+    lower = text.lower() if lower is None else lower
+    word_counts = Counter(PUNCTUATION.sub('', lower).split())
+    n_words = sum(word_counts.values())
+    if not n_words:
+        return {'flesch_kincaid_grade': 0.0, 'flesch_reading_ease': 0.0, 'gunning_fog': 0.0}
+
+    n_sentences = _sentence_count(text, sentence_spans)
+    n_syllables = sum(syllable_count(word) * count for word, count in word_counts.items())
+    n_difficult = sum(1 for word in set(DIFFICULT_WORD_PATTERN.findall(lower)) if is_difficult_word(word))
+
+    # textstat rounds the averages before combining them.
+    sentence_length = _round(n_words / n_sentences, 1)
+    syllables_per_word = _round(n_syllables / n_words, 1)
+    return {
+        'flesch_kincaid_grade': _round(0.39 * sentence_length + 11.8 * syllables_per_word - 15.59, 1),
+        'flesch_reading_ease': _round(206.835 - 1.015 * sentence_length - 84.6 * syllables_per_word, 2),
+        'gunning_fog': _round(0.4 * (sentence_length + 100 * n_difficult / n_words), 2),
+    }
+
+
+def flesch_kincaid_grade(text, lower=None, sentence_spans=None):
+    return readability_scores(text, lower, sentence_spans)['flesch_kincaid_grade']
+
+
+def readability_family(doc):
+    scores = readability_scores(doc.text, doc.lower, doc.sentence_spans)
+    return {col: scores[col] for col in READABILITY_FEATURE_COLUMNS}
+
+
+add_feature_family('readability', READABILITY_FEATURE_COLUMNS, readability_family, needs=('text', 'sentences'))
@@ -1,7 +1,10 @@
 # analysis/features/risk_factors.py
 import pandas as pd
 import re
-from difflib import SequenceMatcher
+
+from analysis.features.engine import add_feature_family, extract_features, DEFAULT_CHUNKSIZE
+from analysis.features.sections import section_text
+from analysis.features.text_change import fingerprint_text, compare_fingerprints, CHANGE_COLUMNS
 
 # This dictionary can be expanded over time
 RISK_KEYWORDS = [
@@ -10,34 +13,17 @@ RISK_KEYWORDS = [
     'impairment', 'decline', 'challenging', 'significant'
 ]
 
-def calculate_risk_keyword_density(data):
-    """Calculates the density of specific risk-related keywords."""
-    if not isinstance(data, list) or not data:
-        return pd.DataFrame()
+# Risk keyword density is a pure lexicon feature, counted by the engine from the token ids
+# of the Risk Factors section (Item 1A) of a filing.
+add_feature_family('risk_keywords', ['risk_keyword_density'], lexicons={'risk_keyword_density': RISK_KEYWORDS},
+                   section='risk_factors')
 
-    features = []
-    for entry in data:
-        text = entry.get('text', '').lower()
-        if not text:
-            continue
-        
-        tokens = re.findall(r'\b\w+\b', text)
-        if not tokens:
-            continue
-            
-        risk_word_count = sum(1 for word in tokens if word in RISK_KEYWORDS)
-        density = risk_word_count / len(tokens)
-        
-        features.append({
-            'ticker': entry.get('ticker'),
-            'date': entry.get('date'),
-            'risk_keyword_density': density
-        })
-        
-    return pd.DataFrame(features)
+def calculate_risk_keyword_density(data, n_jobs=1, chunksize=DEFAULT_CHUNKSIZE):
+    """Calculates the density of specific risk-related keywords."""
+    return extract_features(data, families=['risk_keywords'], n_jobs=n_jobs, chunksize=chunksize)
 
 def calculate_risk_specificity(data):
-    """Calculates the density of numbers, a proxy for specificity."""
+    """Calculates the density of numbers, a proxy for specificity, in the Risk Factors section."""
     if not isinstance(data, list) or not data:
         return pd.DataFrame()
 
@@ -46,6 +32,7 @@ def calculate_risk_specificity(data):
         text = entry.get('text', '')
         if not text:
             continue
+        text = section_text(text, 'risk_factors')
             
         digits = sum(c.isdigit() for c in text)
         specificity = digits / len(text) if len(text) > 0 else 0
@@ -62,6 +49,12 @@ def calculate_risk_factor_change(data):
     """
     Calculates the change in risk factor text from the previous quarter.
     This is an advanced feature and requires data to be sorted by date.
+    Filings are compared on their Risk Factors sections (whole texts if they have none).
+
+    Each filing is fingerprinted once (hashed normalized paragraphs and sentences)
+    and compared with the previous filing of the same ticker in linear time.
+    Besides risk_text_change_score (1 - similarity), the fractions of the text
+    that were added, removed and left unchanged are reported.
     """
     if not isinstance(data, list) or len(data) < 2:
         return pd.DataFrame() # Cannot calculate change without historical data
@@ -69,20 +62,25 @@ def calculate_risk_factor_change(data):
     df = pd.DataFrame(data)
     df['date'] = pd.to_datetime(df['date'])
     df = df.sort_values(by=['ticker', 'date'])
-    
-    # Use SequenceMatcher for a simple text similarity score
-    def similarity(a, b):
-        return SequenceMatcher(None, a, b).ratio()
 
-    # Group by ticker and compare with the previous period's text
-    df['previous_text'] = df.groupby('ticker')['text'].shift(1)
-    
-    # Calculate similarity and then change (1 - similarity)
+    # Fingerprint the Risk Factors section of every filing once; each one is compared twice
+    # (as current and as previous).
+    fingerprints = df['text'].fillna('').map(lambda text: fingerprint_text(section_text(text, 'risk_factors')))
+    previous = fingerprints.groupby(df['ticker']).shift(1)
+
     # Fill NaN for the very first filing of a company
-    df['similarity_score'] = df.apply(
-        lambda row: similarity(row['text'], row['previous_text']) if pd.notna(row['previous_text']) else None,
-        axis=1
-    )
-    df['risk_text_change_score'] = 1 - df['similarity_score']
-    
-    return df[['ticker', 'date', 'risk_text_change_score']].dropna()
\ No newline at end of file
+    rows = []
+    for current_fp, previous_fp in zip(fingerprints, previous):
+        if not isinstance(previous_fp, tuple):
+            rows.append(dict.fromkeys(CHANGE_COLUMNS))
+            continue
+        rows.append(compare_fingerprints(current_fp, previous_fp))
+    change = pd.DataFrame(rows, index=df.index, dtype='float64')
+
+    df['risk_text_change_score'] = 1 - change['similarity']
+    df['risk_text_added_fraction'] = change['added_fraction']
+    df['risk_text_removed_fraction'] = change['removed_fraction']
+    df['risk_text_unchanged_fraction'] = change['unchanged_fraction']
+
+    return df[['ticker', 'date', 'risk_text_change_score', 'risk_text_added_fraction',
+               'risk_text_removed_fraction', 'risk_text_unchanged_fraction']].dropna()
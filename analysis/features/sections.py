@@ -0,0 +1,109 @@
+# analysis/features/sections.py
+"""
+Item segmentation of 10-Q / 10-K text, run once per filing and kept as offsets.
+
+scrape_edgar_htm starts every "Item N." heading on a new line. find_sections
+scans a filing once for those headings and returns a SectionIndex: the start
+and end character offsets of every item section (heading included, up to the
+next heading), with its item label, Part number and title. Feature families
+read only the section they are meant for, through
+Document.section(name) in the engine or section_text() here.
+
+Cross-references such as "see Item 1A." can also start a line. Headings
+therefore have to follow each other in item order; the numbering may restart
+at Item 1 once, where a 10-Q moves from Part I to Part II. Headings out of
+order are treated as part of the section they occur in.
+
+Named sections are matched on item label and title, so a 10-K's Item 2
+(Properties) is never taken for a 10-Q's Item 2 (MD&A):
+
+- 'mda': Management's Discussion and Analysis (10-Q Item 2, 10-K Item 7)
+- 'risk_factors': Risk Factors (Item 1A)
+
+A text without item headings (e.g. an earnings call transcript) has no
+sections; callers then fall back to the whole text.
+"""
+import re
+
+import numpy as np
+
+HEADING_PATTERN = re.compile(r'^[ \t]*Item\s+(\d{1,2}[A-Z]?)\.', re.IGNORECASE | re.MULTILINE)
+# Characters after a heading that hold its title.
+TITLE_CHARS = 120
+
+NAMED_SECTIONS = {
+    'mda': (('2', '7'), re.compile(r"\s*management\W{0,2}s?\s+discussion", re.IGNORECASE)),
+    'risk_factors': (('1A',), re.compile(r"\s*risk\s+factors", re.IGNORECASE)),
+}
+
+
+def _item_key(label):
+    """Sort key of an item label: '1A' -> (1, 'A'), '7' -> (7, '')."""
+    number, letter = (label[:-1], label[-1]) if label[-1].isalpha() else (label, '')
+    return int(number), letter
+
+
+class SectionIndex:
+    """Item sections of one text as start/end offset arrays with their labels, Part numbers and titles."""
+
+    __slots__ = ('text', 'starts', 'ends', 'items', 'parts', 'titles')
+
+    def __init__(self, text, starts, ends, items, parts, titles):
+        dtype = np.int32 if len(text) < 2 ** 31 else np.int64
+        self.text = text
+        self.starts = np.asarray(starts, dtype=dtype)
+        self.ends = np.asarray(ends, dtype=dtype)
+        self.items = list(items)
+        self.parts = list(parts)
+        self.titles = list(titles)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def find(self, name):
+        """Position of the named section (see NAMED_SECTIONS), or None if the text has none."""
+        items, title_pattern = NAMED_SECTIONS[name]
+        for i, (item, title) in enumerate(zip(self.items, self.titles)):
+            if item in items and title_pattern.match(title):
+                return i
+        return None
+
+    def span(self, name):
+        """(start, end) offsets of the named section, or None."""
+        i = self.find(name)
+        return None if i is None else (int(self.starts[i]), int(self.ends[i]))
+
+    def records(self):
+        """One dict per section: part, item, title, start and end."""
+        return [{'part': part, 'item': item, 'title': title, 'start': int(start), 'end': int(end)}
+                for part, item, title, start, end in zip(self.parts, self.items, self.titles,
+                                                         self.starts.tolist(), self.ends.tolist())]
+
+
+def find_sections(text):
+    """Finds the item headings of `text` in one scan and returns their sections as a SectionIndex."""
+    starts, items, parts, titles = [], [], [], []
+    last_key, part = None, 1
+    for match in HEADING_PATTERN.finditer(text):
+        label = match.group(1).upper()
+        key = _item_key(label)
+        if last_key is not None and key <= last_key:
+            if key != (1, '') or part > 1:
+                continue
+            part += 1
+        last_key = key
+        starts.append(match.start())
+        items.append(label)
+        parts.append(part)
+        titles.append(text[match.end():match.end() + TITLE_CHARS].split('\n', 1)[0].strip())
+    ends = starts[1:] + [len(text)]
+    return SectionIndex(text, starts, ends, items, parts, titles)
+
+
+def section_text(text, name, sections=None):
+    """The named section of `text`, or the whole text if it has no such section."""
+    span = (sections if sections is not None else find_sections(text)).span(name)
+    return text if span is None else text[span[0]:span[1]]
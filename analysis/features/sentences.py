@@ -0,0 +1,136 @@
+# analysis/features/sentences.py
+"""
+Sentence segmentation that runs once per document and keeps only offsets.
+
+A document's sentences are stored as two integer arrays of start/end character
+offsets into its text (SentenceSpans); a sentence string is sliced out only
+when a consumer iterates over it. Sentiment, readability and any other
+per-sentence feature read the same spans from Document.sentence_spans.
+
+Two segmenters are available:
+
+- 'punkt': NLTK's Punkt model via span_tokenize. Produces exactly the same
+  sentences as nltk.sent_tokenize, so it is the default.
+- 'regex': a rule-based splitter (terminal punctuation followed by a capital,
+  digit or opening quote, skipping common abbreviations and initials). Much
+  faster, at the cost of slightly different boundaries than Punkt.
+
+The segmenter is chosen with configure_sentence_segmenter or the
+LINGUISTIC_ALPHA_SENTENCE_SEGMENTER environment variable, so worker processes
+use the same one.
+"""
+import os
+import re
+
+import numpy as np
+
+SEGMENTER_ENV = 'LINGUISTIC_ALPHA_SENTENCE_SEGMENTER'
+DEFAULT_SEGMENTER = 'punkt'
+SEGMENTERS = ('punkt', 'regex')
+
+# Terminal punctuation (plus closing quotes/brackets) followed by whitespace and a sentence opener.
+BOUNDARY_PATTERN = re.compile(r'[.!?]+["\')\]’”]*(?=\s+["\'(\[‘“]?[A-Z0-9])')
+PRECEDING_WORD = re.compile(r'(\S+)$')
+NON_SPACE = re.compile(r'\S')
+
+ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'inc', 'corp', 'co', 'ltd', 'llc', 'plc',
+    'no', 'nos', 'vs', 'etc', 'approx', 'dept', 'est', 'fig', 'jan', 'feb', 'mar', 'apr', 'jun',
+    'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec', 'e.g', 'i.e', 'u.s', 'u.k', 'a.m', 'p.m',
+}
+
+
+class SentenceSpans:
+    """Sentence boundaries of one text as start/end offset arrays; sentences are sliced on access."""
+
+    __slots__ = ('text', 'starts', 'ends')
+
+    def __init__(self, text, starts, ends):
+        dtype = np.int32 if len(text) < 2 ** 31 else np.int64
+        self.text = text
+        self.starts = np.asarray(starts, dtype=dtype)
+        self.ends = np.asarray(ends, dtype=dtype)
+
+    @classmethod
+    def from_pairs(cls, text, pairs):
+        pairs = list(pairs)
+        return cls(text, [start for start, _ in pairs], [end for _, end in pairs])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def __iter__(self):
+        text = self.text
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            yield text[start:end]
+
+    def lengths(self):
+        return self.ends - self.starts
+
+
+_punkt_tokenizer = None
+
+
+def _get_punkt_tokenizer():
+    global _punkt_tokenizer
+    if _punkt_tokenizer is None:
+        try:
+            from nltk.tokenize import PunktTokenizer
+            _punkt_tokenizer = PunktTokenizer('english')
+        except ImportError:
+            # NLTK < 3.8.2 ships the pickled model instead of punkt_tab.
+            import nltk
+            _punkt_tokenizer = nltk.data.load('tokenizers/punkt/english.pickle')
+    return _punkt_tokenizer
+
+
+def punkt_spans(text):
+    """Punkt sentence offsets; slicing them gives exactly nltk.sent_tokenize(text)."""
+    return SentenceSpans.from_pairs(text, _get_punkt_tokenizer().span_tokenize(text))
+
+
+def regex_spans(text):
+    """Rule-based sentence offsets (see the module docstring)."""
+    starts, ends = [], []
+    position = 0
+    for match in BOUNDARY_PATTERN.finditer(text):
+        word = PRECEDING_WORD.search(text, max(position, match.start() - 40), match.start())
+        if word:
+            token = word.group(1).lower().lstrip('(["\'‘“')
+            # Abbreviations and single-letter initials ("J. Smith") do not end a sentence.
+            if token in ABBREVIATIONS or (len(token) == 1 and token.isalpha()):
+                continue
+        first = NON_SPACE.search(text, position, match.end())
+        if first:
+            starts.append(first.start())
+            ends.append(match.end())
+        position = match.end()
+    first = NON_SPACE.search(text, position)
+    if first:
+        starts.append(first.start())
+        ends.append(len(text.rstrip()))
+    return SentenceSpans(text, starts, ends)
+
+
+def configure_sentence_segmenter(name):
+    """Selects the segmenter ('punkt' or 'regex') for this process and any workers it starts."""
+    if name not in SEGMENTERS:
+        raise ValueError(f"Unknown sentence segmenter: {name}")
+    os.environ[SEGMENTER_ENV] = name
+
+
+def get_sentence_segmenter():
+    return os.environ.get(SEGMENTER_ENV, DEFAULT_SEGMENTER)
+
+
+def segment(text, method=None):
+    """Returns the SentenceSpans of `text` using `method` (defaults to the configured segmenter)."""
+    method = method or get_sentence_segmenter()
+    if method == 'regex':
+        return regex_spans(text)
+    if method == 'punkt':
+        return punkt_spans(text)
+    raise ValueError(f"Unknown sentence segmenter: {method}")
@@ -0,0 +1,165 @@
+# analysis/features/sentiment_cache.py
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+import nltk
+
+# Scores are only reusable for the VADER implementation that produced them.
+CACHE_VERSION = f"vader-nltk-{nltk.__version__}"
+
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+def sentence_key(sentence):
+    """Content hash used as the cache key for a sentence."""
+    return hashlib.blake2b(sentence.encode('utf-8'), digest_size=16).digest()
+
+
+class SentimentCache:
+    """
+    Bounded LRU cache of sentence -> VADER compound score, keyed by a content hash.
+
+    Earnings calls repeat a lot of boilerplate (operator intros, safe-harbor
+    statements, "thank you, next question"), so repeated sentences are scored
+    once. If `path` is given, scores are also persisted to a SQLite file, which
+    lets reruns and every worker process of a parallel run share them.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        self.scoring_seconds = 0.0
+        # Historical scoring cost from the persistent store, used to price hits when
+        # this run has not scored anything itself.
+        self._stored_misses = 0
+        self._stored_seconds = 0.0
+        self._flushed_misses = 0
+        self._flushed_seconds = 0.0
+        self._taken = {'hits': 0, 'misses': 0, 'scoring_seconds': 0.0}
+        if path:
+            self._open(path)
+
+    def _open(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS scores (key BLOB PRIMARY KEY, compound REAL)")
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != CACHE_VERSION:
+            # Scores from a different VADER version are stale.
+            self._conn.execute("DELETE FROM scores")
+            self._conn.execute("DELETE FROM meta")
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (CACHE_VERSION,))
+        self._conn.commit()
+        self._stored_misses, self._stored_seconds = self._read_scoring_totals()
+
+    def _read_scoring_totals(self):
+        rows = dict(self._conn.execute("SELECT key, value FROM meta WHERE key IN ('scored', 'scoring_seconds')"))
+        return int(rows.get('scored', 0)), float(rows.get('scoring_seconds', 0.0))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key, score):
+        self._entries[key] = score
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def compound(self, sentence, analyzer):
+        """Returns the compound score for `sentence`, scoring it with `analyzer` only on a miss."""
+        key = sentence_key(sentence)
+        score = self._entries.get(key)
+        if score is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return score
+
+        if self._conn is not None:
+            row = self._conn.execute("SELECT compound FROM scores WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._remember(key, row[0])
+                self.hits += 1
+                return row[0]
+
+        start = time.perf_counter()
+        score = analyzer.polarity_scores(sentence)['compound']
+        self.scoring_seconds += time.perf_counter() - start
+        self.misses += 1
+        self._remember(key, score)
+        if self._conn is not None:
+            self._pending[key] = score
+        return score
+
+    def flush(self):
+        """Writes scores computed since the last flush to the persistent store."""
+        if self._conn is None or not self._pending:
+            return
+        new_misses = self.misses - self._flushed_misses
+        new_seconds = self.scoring_seconds - self._flushed_seconds
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO scores VALUES (?, ?)", self._pending.items())
+            scored, seconds = self._read_scoring_totals()
+            self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                   [('scored', str(scored + new_misses)),
+                                    ('scoring_seconds', str(seconds + new_seconds))])
+        self._flushed_misses = self.misses
+        self._flushed_seconds = self.scoring_seconds
+        self._pending.clear()
+
+    def take_counters(self):
+        """Hits, misses and scoring time since the last call, for a worker to report to its parent."""
+        counters = {'hits': self.hits, 'misses': self.misses, 'scoring_seconds': self.scoring_seconds}
+        taken, self._taken = self._taken, counters
+        return {name: value - taken[name] for name, value in counters.items()}
+
+    def add_counters(self, counters):
+        """Adds counters reported by another process (see take_counters) to this cache's statistics."""
+        self.hits += counters['hits']
+        self.misses += counters['misses']
+        self.scoring_seconds += counters['scoring_seconds']
+        # The other process already recorded its own scoring in the persistent store.
+        self._flushed_misses += counters['misses']
+        self._flushed_seconds += counters['scoring_seconds']
+
+    def clear(self):
+        """Drops every cached score, in memory and on disk."""
+        self._entries.clear()
+        self._pending.clear()
+        if self._conn is not None:
+            with self._conn:
+                self._conn.execute("DELETE FROM scores")
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def seconds_saved(self):
+        """Estimated VADER time avoided: hits times the mean cost of scoring a sentence."""
+        misses = self.misses or self._stored_misses
+        seconds = self.scoring_seconds if self.misses else self._stored_seconds
+        if not misses:
+            return 0.0
+        return self.hits * seconds / misses
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'entries': len(self._entries),
+            'scoring_seconds': self.scoring_seconds,
+            'seconds_saved': self.seconds_saved,
+        }
@@ -0,0 +1,124 @@
+# analysis/features/text_change.py
+"""
+Linear-time text change scoring between two versions of a document.
+
+Each document is reduced once to a fingerprint: the hashes and lengths of its
+normalized paragraphs, and of the sentences inside them. Two fingerprints are
+compared by multiset matching of hashes, first paragraph by paragraph, then
+sentence by sentence for the paragraphs that did not match whole, and finally
+by word shingles for the sentences that were edited rather than replaced, so
+the cost is linear in document length instead of SequenceMatcher's roughly
+quadratic.
+
+Fractions are weighted by normalized character length, and the similarity is
+2 * matched / (len_a + len_b), the same form as SequenceMatcher.ratio().
+"""
+import hashlib
+import re
+from collections import Counter, namedtuple
+
+PARAGRAPH_SPLIT = re.compile(r'\n\s*\n')
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?;:])\s+')
+NON_WORD = re.compile(r'[\W_]+')
+
+SHINGLE_WORDS = 4
+
+Unit = namedtuple('Unit', ['digest', 'length', 'text'])
+Paragraph = namedtuple('Paragraph', ['digest', 'length', 'sentences'])
+TextFingerprint = namedtuple('TextFingerprint', ['paragraphs', 'length'])
+
+CHANGE_COLUMNS = ['similarity', 'added_fraction', 'removed_fraction', 'unchanged_fraction']
+
+
+def _digest(normalized):
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest()
+
+
+def normalize_unit(text):
+    """Lowercases and collapses punctuation and whitespace, so reflowed or re-punctuated text still matches."""
+    return NON_WORD.sub(' ', text.lower()).strip()
+
+
+def fingerprint_text(text):
+    """Hashes the normalized paragraphs and sentences of `text` (sentences keep their normalized text for shingling)."""
+    paragraphs = []
+    total = 0
+    for raw_paragraph in PARAGRAPH_SPLIT.split(text or ''):
+        sentences = []
+        for raw_sentence in SENTENCE_SPLIT.split(raw_paragraph):
+            normalized = normalize_unit(raw_sentence)
+            if normalized:
+                sentences.append(Unit(_digest(normalized), len(normalized), normalized))
+        if not sentences:
+            continue
+        length = sum(unit.length for unit in sentences)
+        paragraph_digest = _digest(b''.join(unit.digest for unit in sentences).hex())
+        paragraphs.append(Paragraph(paragraph_digest, length, sentences))
+        total += length
+    return TextFingerprint(paragraphs, total)
+
+
+def _shingles(sentences):
+    """Word shingles of edited sentences; each shingle is weighted by the characters of its first word."""
+    units = []
+    for sentence in sentences:
+        words = sentence.text.split(' ')
+        for i in range(len(words)):
+            shingle = ' '.join(words[i:i + SHINGLE_WORDS])
+            units.append(Unit(hash(shingle), len(words[i]) + 1, None))
+    return units
+
+
+def _match(units_a, units_b):
+    """Multiset-matches two lists of hashed units; returns (matched length, unmatched a, unmatched b)."""
+    available = Counter(unit.digest for unit in units_b)
+    matched = 0
+    unmatched_a = []
+    for unit in units_a:
+        if available[unit.digest] > 0:
+            available[unit.digest] -= 1
+            matched += unit.length
+        else:
+            unmatched_a.append(unit)
+    unmatched_b = []
+    for unit in units_b:
+        if available[unit.digest] > 0:
+            available[unit.digest] -= 1
+            unmatched_b.append(unit)
+    return matched, unmatched_a, unmatched_b
+
+
+def compare_fingerprints(current, previous):
+    """
+    Compares two fingerprints.
+
+    Returns:
+        dict: 'similarity' (2 * matched / total length), 'added_fraction' and
+            'unchanged_fraction' (of the current text) and 'removed_fraction'
+            (of the previous text).
+    """
+    if not current.length and not previous.length:
+        return dict(similarity=1.0, added_fraction=0.0, removed_fraction=0.0, unchanged_fraction=1.0)
+
+    matched, paragraphs_a, paragraphs_b = _match(current.paragraphs, previous.paragraphs)
+    sentences_a = [sentence for paragraph in paragraphs_a for sentence in paragraph.sentences]
+    sentences_b = [sentence for paragraph in paragraphs_b for sentence in paragraph.sentences]
+    sentence_matched, sentences_a, sentences_b = _match(sentences_a, sentences_b)
+    shingle_matched, _, _ = _match(_shingles(sentences_a), _shingles(sentences_b))
+    # Shingle weights include a separator per word, so cap at what is left to match.
+    matched += sentence_matched + min(shingle_matched, sum(u.length for u in sentences_a),
+                                      sum(u.length for u in sentences_b))
+
+    unchanged = matched / current.length if current.length else 0.0
+    removed = 1 - matched / previous.length if previous.length else 0.0
+    return dict(
+        similarity=2 * matched / (current.length + previous.length),
+        added_fraction=1 - unchanged if current.length else 0.0,
+        removed_fraction=removed,
+        unchanged_fraction=unchanged,
+    )
+
+
+def text_change(current, previous):
+    """Change statistics between two texts; see compare_fingerprints."""
+    return compare_fingerprints(fingerprint_text(current), fingerprint_text(previous))
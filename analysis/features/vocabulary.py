@@ -0,0 +1,58 @@
+# analysis/features/vocabulary.py
+import numpy as np
+
+
+class Vocabulary:
+    """
+    Interns tokens into dense integer ids so documents can be stored as
+    compact int32 arrays and lexicon lookups become array indexing.
+    """
+
+    def __init__(self):
+        # Ids are assigned in insertion order, so the dict alone is the vocabulary.
+        self.index = {}
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def terms(self):
+        return list(self.index)
+
+    def encode(self, tokens):
+        """Encodes a list of tokens as an int32 array of vocabulary ids, interning new terms."""
+        index = self.index
+        return np.fromiter((index.setdefault(token, len(index)) for token in tokens), dtype=np.int32, count=len(tokens))
+
+    def lexicon_matrix(self, lexicons):
+        """
+        Returns a (vocabulary size x number of lexicons) 0/1 matrix whose column j
+        marks the terms that belong to the j-th lexicon in `lexicons`.
+        """
+        membership = np.zeros((len(self.index), len(lexicons)), dtype=np.float64)
+        for j, words in enumerate(lexicons):
+            ids = [self.index[word] for word in set(words) if word in self.index]
+            membership[ids, j] = 1.0
+        return membership
+
+
+def lexicon_counts(encoded_docs, vocabulary, lexicons):
+    """
+    Counts lexicon hits for every document at once.
+
+    Returns an (n_docs x n_lexicons) array where entry [i, j] is the number of
+    tokens in document i that belong to lexicon j.
+    """
+    n_docs = len(encoded_docs)
+    counts = np.zeros((n_docs, len(lexicons)), dtype=np.float64)
+    if n_docs == 0 or not lexicons:
+        return counts
+
+    lengths = np.fromiter((len(ids) for ids in encoded_docs), dtype=np.int64, count=n_docs)
+    all_ids = np.concatenate(encoded_docs) if lengths.sum() else np.empty(0, dtype=np.int32)
+    doc_index = np.repeat(np.arange(n_docs), lengths)
+
+    membership = vocabulary.lexicon_matrix(lexicons)
+    for j in range(len(lexicons)):
+        counts[:, j] = np.bincount(doc_index, weights=membership[all_ids, j], minlength=n_docs)
+    return counts
@@ -0,0 +1,75 @@
+# analysis/labels.py
+import numpy as np
+import pandas as pd
+
+LABEL_COLUMNS = ['next_quarter_return', 'next_quarter_volatility']
+
+
+def forward_window_labels(events, prices, window_days=90):
+    """
+    Computes the forward return and volatility for every (ticker, date) event at once.
+
+    For each event the window is every trading day in [date, date + window_days]
+    with a price. The return is (last - first) / first and the volatility is the
+    sample standard deviation of the daily returns within the window, matching
+    slicing `prices.loc[start:end]` per event. Window bounds come from
+    np.searchsorted on each ticker's price index, and sums of returns and squared
+    returns from cumulative sums, so no per-event slicing is needed.
+
+    Args:
+        events (pd.DataFrame): Must contain 'ticker' and 'date' columns.
+        prices (pd.DataFrame): Adjusted close prices with a DatetimeIndex and one column per ticker.
+        window_days (int): Length of the forward window in calendar days.
+
+    Returns:
+        pd.DataFrame: next_quarter_return and next_quarter_volatility, aligned to `events.index`.
+            Events with fewer than two prices in their window get NaN.
+    """
+    result = pd.DataFrame(np.nan, index=events.index, columns=LABEL_COLUMNS)
+    if events.empty or prices is None or prices.empty:
+        return result
+
+    starts = pd.to_datetime(events['date']).to_numpy(dtype='datetime64[ns]')
+    ends = starts + np.timedelta64(window_days, 'D')
+    tickers = events['ticker'].to_numpy()
+    prices = prices.sort_index()
+
+    for ticker in pd.unique(tickers):
+        if ticker not in prices.columns:
+            continue
+        series = prices[ticker].dropna()
+        if len(series) < 2:
+            continue
+        dates = series.index.to_numpy(dtype='datetime64[ns]')
+        values = series.to_numpy(dtype=np.float64)
+
+        # Daily returns between consecutive valid prices, with prefix sums.
+        # cum[k] = sum of returns 1..k, so a window of prices [i0, i1) has returns (i0, i1).
+        daily = values[1:] / values[:-1] - 1
+        cum = np.concatenate(([0.0], np.cumsum(daily)))
+        cum_sq = np.concatenate(([0.0], np.cumsum(daily * daily)))
+
+        rows = np.flatnonzero(tickers == ticker)
+        i0 = np.searchsorted(dates, starts[rows], side='left')
+        i1 = np.searchsorted(dates, ends[rows], side='right')
+        n_prices = i1 - i0
+        valid = n_prices >= 2
+        if not valid.any():
+            continue
+        rows, i0, i1, n_prices = rows[valid], i0[valid], i1[valid], n_prices[valid]
+
+        start_price = values[i0]
+        end_price = values[i1 - 1]
+        window_return = (end_price - start_price) / start_price
+
+        n_returns = n_prices - 1
+        total = cum[i1 - 1] - cum[i0]
+        total_sq = cum_sq[i1 - 1] - cum_sq[i0]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = (total_sq - total * total / n_returns) / (n_returns - 1)
+        volatility = np.where(n_returns >= 2, np.sqrt(np.clip(variance, 0.0, None)), np.nan)
+
+        result.iloc[rows, 0] = window_return
+        result.iloc[rows, 1] = volatility
+
+    return result
@@ -5,24 +5,25 @@ from sklearn.linear_model import LogisticRegression
 from xgboost import XGBClassifier
 import joblib
 
+from analysis.feature_store import read_feature_table, list_feature_columns, feature_store_exists
+
 def train_all_models():
     """
     Trains and saves two separate stacking ensemble models: one for predicting
     return direction and one for predicting volatility regime.
     """
-    file_path = 'output/transcript_features_with_performance.csv'
-    if not os.path.exists(file_path):
-        print(f"Error: Data file not found at {file_path}")
+    if not feature_store_exists():
+        print("Error: Feature data not found. Please run the feature engineering pipeline first.")
         return
 
-    df = pd.read_csv(file_path)
-    df['date'] = pd.to_datetime(df['date'])
+    # --- Feature Selection ---
+    feature_cols = list_feature_columns(suffix='_zscore')
 
     # --- Temporal Split ---
-    train_df = df[df['date'].dt.year < 2024]
+    # Only the z-score features and labels for years before 2024 are read from the store.
+    train_df = read_feature_table(columns=feature_cols + ['return_class', 'volatility_class'],
+                                  end_date='2024-01-01')
     
-    # --- Feature Selection ---
-    feature_cols = [col for col in df.columns if col.endswith('_zscore')]
     
     # --- Train and Save Return Prediction Model ---
     print("Training return prediction model...")
@@ -1,12 +1,17 @@
+import os
 import pandas as pd
-import yfinance as yf
 from datetime import timedelta
 
 # Assuming the feature extractors and data loader are in the analysis directory
-from analysis.features.core import calculate_core_linguistic_features
-from analysis.features.mda import calculate_mda_features
-from analysis.features.risk_factors import calculate_risk_keyword_density
-from analysis.data_loader import download_and_process_transcripts
+from analysis.features.engine import extract_features, DEFAULT_CHUNKSIZE
+from analysis.features.core import configure_sentiment_cache, get_sentiment_cache
+from analysis.features.feature_cache import FeatureCache
+from analysis.features.boilerplate import BoilerplateIndex, transcript_doc_id
+from analysis.data_loader import iter_transcript_batches
+from analysis.feature_store import write_feature_table, read_feature_table, DEFAULT_FEATURES_PATH
+from analysis.labels import forward_window_labels
+from analysis.zscores import zscore_columns, expanding_zscores, update_expanding_zscores, ZScoreState
+from utils.price_cache import get_price_cache
 
 def get_next_quarter_performance(ticker, date):
     """
@@ -16,7 +21,7 @@ def get_next_quarter_performance(ticker, date):
     end_date = start_date + timedelta(days=90)
     
     try:
-        stock_data = yf.download(ticker, start=start_date, end=end_date, progress=False, auto_adjust=False)
+        stock_data = get_price_cache().get_prices(ticker, start_date, end_date, columns=['Adj Close']).dropna()
         if stock_data.empty:
             return None, None
             
@@ -26,50 +31,132 @@ def get_next_quarter_performance(ticker, date):
         next_quarter_return = (end_price - start_price) / start_price
         
         # Calculate next quarter's volatility (standard deviation of daily returns)
-        stock_data['daily_return'] = stock_data['Adj Close'].pct_change()
-        next_quarter_volatility = stock_data['daily_return'].std()
-        
-        # Ensure the return value is a scalar float, not a Series
-        if isinstance(next_quarter_return, pd.Series):
-            next_quarter_return = next_quarter_return.iloc[0]
+        next_quarter_volatility = stock_data['Adj Close'].pct_change().std()
             
         return next_quarter_return, next_quarter_volatility
     except Exception as e:
         print(f"Could not fetch stock data for {ticker}: {e}")
         return None, None
 
-def run_transcript_feature_engineering():
+# Expanding z-score states kept between runs, one file per set of normalized columns.
+ZSCORE_STATE_FILES = {'features': 'features.json', 'composite': 'composite_risk_score.json'}
+
+def load_zscore_states(state_dir):
+    """
+    Returns ({name: ZScoreState}, previous feature table) for incremental expanding z-scores.
+    The states are only usable together with the table they were saved with, so neither is
+    returned unless both exist.
+    """
+    paths = {name: os.path.join(state_dir, filename) for name, filename in ZSCORE_STATE_FILES.items()}
+    if not os.path.exists(DEFAULT_FEATURES_PATH) or not all(os.path.exists(path) for path in paths.values()):
+        return {}, None
+    return {name: ZScoreState.load(path) for name, path in paths.items()}, read_feature_table(DEFAULT_FEATURES_PATH)
+
+def save_zscore_states(state_dir, states):
+    for name, state in states.items():
+        state.save(os.path.join(state_dir, ZSCORE_STATE_FILES[name]))
+
+def clear_zscore_states(state_dir):
+    """Removes saved states, which no longer match a feature table written without expanding z-scores."""
+    for filename in ZSCORE_STATE_FILES.values():
+        path = os.path.join(state_dir, filename)
+        if os.path.exists(path):
+            os.remove(path)
+
+def run_transcript_feature_engineering(n_jobs=1, chunksize=DEFAULT_CHUNKSIZE, sentiment_cache_path=None,
+                                       feature_cache_path=None, transcript_store_dir=None, zscore_mode='full',
+                                       boilerplate_index_path=None, zscore_state_dir=None):
     """
     Main function to run the transcript feature engineering pipeline.
+
+    Args:
+        n_jobs (int): Worker processes for linguistic feature extraction.
+            1 runs serially; None or 0 uses every CPU core.
+        chunksize (int): Transcripts handed to a worker at a time.
+        sentiment_cache_path (str): Optional SQLite file that persists sentence
+            sentiment scores between runs.
+        feature_cache_path (str): Optional SQLite file of per-transcript feature
+            rows; reruns only compute transcripts that are new or changed.
+        transcript_store_dir (str): Optional local transcript snapshot to read
+            from instead of the Hugging Face dataset (no network access).
+        zscore_mode (str): 'full' scores each transcript against its ticker's whole
+            history; 'expanding' only against earlier transcripts (point-in-time).
+        boilerplate_index_path (str): Optional MinHash passage index; passages that
+            recur across the corpus are dropped before features are computed. New
+            transcripts are added to the index in a first pass over the corpus,
+            before any features are extracted.
+        zscore_state_dir (str): Optional directory of expanding z-score state; with
+            zscore_mode='expanding', only transcripts the previous run did not
+            score are scored and folded into the state.
     """
     # 1. Load Transcripts
-    transcripts = download_and_process_transcripts()
-    if not transcripts:
+    # Transcripts are streamed in fixed-size batches, so only one batch of raw text
+    # is held in memory at a time; each batch is reduced to feature rows right away.
+    configure_sentiment_cache(sentiment_cache_path)
+    feature_cache = FeatureCache(feature_cache_path) if feature_cache_path else None
+    boilerplate = None
+    if boilerplate_index_path:
+        # Every transcript is indexed before any is stripped, so what counts as boilerplate
+        # does not depend on the batch a transcript happens to be read in.
+        boilerplate = BoilerplateIndex.open(boilerplate_index_path)
+        for batch in iter_transcript_batches(store_dir=transcript_store_dir):
+            for entry in batch:
+                boilerplate.add_document(transcript_doc_id(entry), entry.get('text'))
+        boilerplate.save(boilerplate_index_path)
+
+    feature_frames = []
+    n_transcripts = 0
+    for batch in iter_transcript_batches(store_dir=transcript_store_dir):
+        n_transcripts += len(batch)
+
+        # 2. Calculate Linguistic Features
+        # We'll apply a selection of feature families that are relevant to earnings calls:
+        # core linguistic features, forward-looking statements and risk language.
+        # The engine tokenizes each transcript once and emits one merged row per transcript.
+        batch_features = extract_features(batch, families=['core', 'mda', 'risk_keywords'],
+                                          n_jobs=n_jobs, chunksize=chunksize, cache=feature_cache,
+                                          boilerplate=boilerplate)
+        if not batch_features.empty:
+            feature_frames.append(batch_features)
+
+    if feature_cache is not None:
+        print(f"Feature cache: reused {feature_cache.hits} transcripts, computed {feature_cache.misses}.")
+        feature_cache.close()
+
+    if not n_transcripts:
         print("No transcripts to process.")
         return
+    if not feature_frames:
+        print("No linguistic features could be calculated.")
+        return
+    merged_features = pd.concat(feature_frames, ignore_index=True)
+
+    # Counters include the sentences scored by worker processes in parallel mode.
+    cache_stats = get_sentiment_cache().stats()
+    if cache_stats['hits'] + cache_stats['misses']:
+        print(f"Sentence sentiment cache: {cache_stats['hit_rate']:.1%} hit rate, "
+              f"~{cache_stats['seconds_saved']:.1f}s of VADER scoring saved.")
     
-    # 2. Calculate Linguistic Features
-    # We'll apply a selection of features from existing modules that are relevant to earnings calls.
-    core_features = calculate_core_linguistic_features(transcripts)
-    mda_features = calculate_mda_features(transcripts) # Forward-looking statements are very relevant
-    risk_features = calculate_risk_keyword_density(transcripts) # Risk language is also key
-    
-    # 3. Merge Linguistic Features
-    # We'll merge these feature sets together on ticker and date.
-    merged_features = pd.merge(core_features, mda_features, on=['ticker', 'date'])
-    merged_features = pd.merge(merged_features, risk_features, on=['ticker', 'date'])
-    
-    # 4. Calculate Z-Scores for Normalization
+    # 3. Calculate Z-Scores for Normalization
     linguistic_cols = [col for col in merged_features.columns if col not in ['ticker', 'date', 'speaker']]
     
-    # Group by ticker and calculate z-score for each feature
-    for col in linguistic_cols:
-        # The transform function applies a function to each group and returns a series aligned with the original index
-        merged_features[f'{col}_zscore'] = merged_features.groupby('ticker')[col].transform(
-            lambda x: (x - x.mean()) / x.std() if x.std() > 0 else 0
-        )
+    # Per-ticker z-scores for every feature column in one grouped pass
+    zscore_states, scored = {}, None
+    if zscore_mode == 'expanding' and zscore_state_dir:
+        zscore_states, scored = load_zscore_states(zscore_state_dir)
+
+    def normalize(df, columns, state_name):
+        if zscore_mode != 'expanding':
+            return zscore_columns(df, columns)
+        if not zscore_state_dir:
+            return expanding_zscores(df, columns)
+        scores, zscore_states[state_name] = update_expanding_zscores(df, columns, zscore_states.get(state_name),
+                                                                     scored)
+        return scores
+
+    merged_features = pd.concat([merged_features, normalize(merged_features, linguistic_cols, 'features')], axis=1)
     
-    # 5. Create a Composite Risk Score
+    # 4. Create a Composite Risk Score
     # This score combines several risk-related z-scores into a single metric.
     # We use -sentiment_score so that lower-than-average sentiment increases the risk.
     risk_components = [
@@ -84,12 +171,13 @@ def run_transcript_feature_engineering():
     merged_features['composite_risk_score'] = merged_features[risk_components].mean(axis=1)
 
     # Also calculate the z-score of the composite score itself for trend analysis
-    merged_features['composite_risk_score_zscore'] = merged_features.groupby('ticker')['composite_risk_score'].transform(
-        lambda x: (x - x.mean()) / x.std() if x.std() > 0 else 0
-    )
+    merged_features['composite_risk_score_zscore'] = normalize(merged_features, ['composite_risk_score'],
+                                                               'composite')['composite_risk_score_zscore']
     
-    # 6. Integrate Stock Performance Data (Efficient Batch Method)
-    print("Downloading all required stock data in a single batch...")
+    # 5. Integrate Stock Performance Data (Efficient Batch Method)
+    # Prices come from the shared local price cache, which only downloads
+    # the date ranges it has not stored yet.
+    print("Loading all required stock data from the price cache...")
     
     # Determine the date range for all stock data needed
     merged_features['date'] = pd.to_datetime(merged_features['date'])
@@ -99,47 +187,21 @@ def run_transcript_feature_engineering():
     # Get unique tickers
     tickers = merged_features['ticker'].unique().tolist()
     
-    # Download all stock data in one go
     try:
-        all_stock_data = yf.download(tickers, start=min_date, end=max_date, auto_adjust=False, progress=False)
+        # The price range end is exclusive; include the last day of the final window.
+        adj_close = get_price_cache().get_panel(tickers, min_date, max_date + timedelta(days=1), field='Adj Close')
     except Exception as e:
         print(f"Failed to download bulk stock data: {e}")
         return
 
-    def calculate_performance(row):
-        ticker = row['ticker']
-        start_date = row['date']
-        end_date = start_date + timedelta(days=90)
-        
-        # Slice the relevant data from the downloaded batch
-        stock_slice = all_stock_data.loc[start_date:end_date]
-        
-        # Check if the slice is empty or the ticker data is missing
-        if stock_slice.empty or ('Adj Close', ticker) not in stock_slice.columns:
-            return pd.Series([None, None], index=['next_quarter_return', 'next_quarter_volatility'])
-            
-        adj_close = stock_slice['Adj Close'][ticker].dropna()
-
-        if len(adj_close) < 2:
-            return pd.Series([None, None], index=['next_quarter_return', 'next_quarter_volatility'])
-
-        # Calculate return and volatility
-        start_price = adj_close.iloc[0]
-        end_price = adj_close.iloc[-1]
-        next_quarter_return = (end_price - start_price) / start_price
-        
-        daily_return = adj_close.pct_change()
-        next_quarter_volatility = daily_return.std()
-        
-        return pd.Series([next_quarter_return, next_quarter_volatility], index=['next_quarter_return', 'next_quarter_volatility'])
-
+    # Forward 90-day return and volatility for every transcript in one vectorized pass.
     print("Calculating performance metrics for each transcript...")
-    performance_df = merged_features.apply(calculate_performance, axis=1)
+    performance_df = forward_window_labels(merged_features, adj_close, window_days=90)
 
-    # 7. Combine all data
+    # 6. Combine all data
     final_df = pd.concat([merged_features.reset_index(drop=True), performance_df.reset_index(drop=True)], axis=1)
 
-    # 8. Create Classification Targets
+    # 7. Create Classification Targets
     # Return Class: 1 if return is positive, 0 otherwise
     final_df['return_class'] = (final_df['next_quarter_return'] > 0).astype(int)
 
@@ -149,9 +211,13 @@ def run_transcript_feature_engineering():
         lambda x: (x > x.median()).astype(int) if x.notna().any() else x
     )
     
-    # Save to CSV
-    output_path = 'output/transcript_features_with_performance.csv'
-    final_df.to_csv(output_path, index=False)
+    # Save to the typed Parquet feature store
+    output_path = write_feature_table(final_df, DEFAULT_FEATURES_PATH)
+    if zscore_states:
+        # Saved after the table, so a state on disk never covers rows the table lacks.
+        save_zscore_states(zscore_state_dir, zscore_states)
+    elif zscore_state_dir:
+        clear_zscore_states(zscore_state_dir)
     print(f"Feature engineering complete. Data saved to {output_path}")
 
 if __name__ == '__main__':
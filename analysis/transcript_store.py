@@ -0,0 +1,172 @@
+# analysis/transcript_store.py
+"""
+Local columnar snapshot of the earnings call transcripts.
+
+Transcripts are stored as Parquet files partitioned by ticker and year
+(<store>/ticker=AAPL/year=2020/part-0.parquet), so feature jobs can read
+just the columns and partitions they need, memory-mapped, with no network.
+
+Usage:
+    python -m analysis.transcript_store snapshot [--store DIR] [--tickers AAPL MSFT] [--full]
+"""
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+DEFAULT_STORE_DIR = os.path.join('data', 'transcript_store')
+MANIFEST_NAME = '_manifest.json'
+
+
+def _partition_dir(store_dir, ticker, year):
+    return os.path.join(store_dir, f"ticker={ticker}", f"year={year}")
+
+
+def _load_manifest(store_dir):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_manifest(store_dir, manifest):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def snapshot_transcripts(store_dir=DEFAULT_STORE_DIR, tickers=None, start_year=None, end_year=None, full=False):
+    """
+    Snapshots transcripts from the Hugging Face dataset into the local store.
+
+    Refreshes are incremental: a ticker/year partition is only rewritten when the
+    set of transcript dates in the source differs from what the manifest recorded,
+    so a new quarter rewrites one small partition. Pass full=True to rewrite all.
+    Returns the number of partitions written.
+    """
+    from analysis.data_loader import open_filtered_dataset, START_YEAR, END_YEAR
+
+    start_year = START_YEAR if start_year is None else start_year
+    end_year = END_YEAR if end_year is None else end_year
+    selected = open_filtered_dataset(tickers, start_year, end_year)
+    if selected is None:
+        print("No transcripts found for the specified criteria.")
+        return 0
+
+    # Group row positions by partition using only the small key columns.
+    keys = selected.select_columns(['symbol', 'year', 'date'])
+    partitions = defaultdict(list)
+    partition_dates = defaultdict(list)
+    for position, (symbol, year, date) in enumerate(zip(keys['symbol'], keys['year'], keys['date'])):
+        partitions[(symbol, int(year))].append(position)
+        partition_dates[(symbol, int(year))].append(str(date))
+
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = {} if full else _load_manifest(store_dir)
+    written = 0
+    for (ticker, year), positions in sorted(partitions.items()):
+        key = f"{ticker}/{year}"
+        dates = sorted(partition_dates[(ticker, year)])
+        part_path = os.path.join(_partition_dir(store_dir, ticker, year), 'part-0.parquet')
+        if manifest.get(key, {}).get('dates') == dates and os.path.exists(part_path):
+            continue
+
+        rows = selected.select(positions).select_columns(['date', 'content'])
+        table = pa.table({'date': [str(d) for d in rows['date']], 'text': rows['content']})
+        table = table.sort_by('date')
+        os.makedirs(os.path.dirname(part_path), exist_ok=True)
+        # Dot-prefixed temp files are ignored by dataset discovery until renamed into place.
+        tmp_path = os.path.join(os.path.dirname(part_path), '.part-0.parquet.tmp')
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, part_path)
+
+        manifest[key] = {'rows': table.num_rows, 'dates': dates}
+        written += 1
+
+    _save_manifest(store_dir, manifest)
+    print(f"Transcript store at {store_dir}: {written} of {len(partitions)} partitions refreshed.")
+    return written
+
+
+def _open_store(store_dir):
+    if not os.path.isdir(store_dir):
+        raise FileNotFoundError(f"Transcript store not found at {store_dir}. Run a snapshot first.")
+    return ds.dataset(
+        store_dir,
+        format='parquet',
+        partitioning='hive',
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+        exclude_invalid_files=True,
+    )
+
+
+def _store_filter(tickers, start_year, end_year):
+    expression = None
+    conditions = []
+    if tickers:
+        conditions.append(ds.field('ticker').isin(list(tickers)))
+    if start_year is not None:
+        conditions.append(ds.field('year') >= start_year)
+    if end_year is not None:
+        conditions.append(ds.field('year') <= end_year)
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_transcripts(store_dir=DEFAULT_STORE_DIR, tickers=None, start_year=None, end_year=None,
+                     columns=('ticker', 'date', 'text')):
+    """
+    Reads the selected partitions of the store into a pyarrow Table.
+    Only the requested `columns` are read, and partitions outside the
+    ticker/year filter are skipped without being opened.
+    """
+    dataset = _open_store(store_dir)
+    return dataset.to_table(columns=list(columns), filter=_store_filter(tickers, start_year, end_year))
+
+
+def iter_store_batches(store_dir=DEFAULT_STORE_DIR, tickers=None, start_year=None, end_year=None,
+                       batch_size=256):
+    """Yields lists of transcript records ({'ticker', 'date', 'text'}) from the store, batch by batch."""
+    dataset = _open_store(store_dir)
+    scanner = dataset.scanner(columns=['ticker', 'date', 'text'],
+                              filter=_store_filter(tickers, start_year, end_year),
+                              batch_size=batch_size)
+    batch = []
+    for record_batch in scanner.to_batches():
+        for record in record_batch.to_pylist():
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local transcript store.")
+    parser.add_argument('command', choices=['snapshot'])
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR)
+    parser.add_argument('--tickers', nargs='*', default=None)
+    parser.add_argument('--start-year', type=int, default=None)
+    parser.add_argument('--end-year', type=int, default=None)
+    parser.add_argument('--full', action='store_true', help="Rewrite every partition.")
+    args = parser.parse_args()
+
+    snapshot_transcripts(args.store, args.tickers, args.start_year, args.end_year, full=args.full)
+
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    main()
@@ -0,0 +1,289 @@
+# analysis/zscores.py
+"""
+Per-ticker z-score normalization of the linguistic features.
+
+Two modes are supported:
+
+- full-history: every row is scored against its ticker's mean and standard
+  deviation over all rows (what the models are trained on);
+- expanding (point-in-time): every row is scored only against the rows of
+  its ticker dated strictly before it, so no future transcript leaks in.
+
+ZScoreState keeps the expanding statistics as running Welford accumulators,
+so scoring a new quarter is an O(features) update per ticker instead of a
+recompute over the full history. update_expanding_zscores uses a persisted
+state to score only the rows a previous run has not seen.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+ZSCORE_SUFFIX = '_zscore'
+
+
+def _zscore_frame(values, mean, std):
+    """(values - mean) / std, with 0 wherever std is 0 or undefined."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = (values - mean) / std
+    return scores.where(std > 0, 0.0)
+
+
+def zscore_columns(df, columns, group='ticker', suffix=ZSCORE_SUFFIX):
+    """
+    Full-history z-scores of `columns` within each `group`, in one grouped pass.
+
+    A group whose standard deviation is 0 or undefined (a single row) scores 0,
+    matching `groupby(group)[col].transform(lambda x: (x - x.mean()) / x.std() if x.std() > 0 else 0)`.
+
+    Returns:
+        pd.DataFrame: One `<col><suffix>` column per input column, aligned to `df.index`.
+    """
+    values = df[columns].astype('float64')
+    grouped = values.groupby(df[group], sort=False)
+    scores = _zscore_frame(values, grouped.transform('mean'), grouped.transform('std'))
+    return scores.add_suffix(suffix)
+
+
+def expanding_zscores(df, columns, group='ticker', date_col='date', suffix=ZSCORE_SUFFIX, min_periods=2):
+    """
+    Point-in-time z-scores: each row is scored against the earlier rows of its group only.
+
+    Rows are ordered by `date_col` within each group, and rows sharing a date
+    do not see each other; rows with fewer than `min_periods` earlier non-null
+    values get NaN. Running sums are computed with grouped cumulative sums, so
+    the whole frame is scored in one pass.
+
+    Returns:
+        pd.DataFrame: One `<col><suffix>` column per input column, aligned to `df.index`.
+    """
+    order = np.argsort(pd.to_datetime(df[date_col]).to_numpy(), kind='stable')
+    ordered = df.iloc[order]
+    values = ordered[columns].astype('float64')
+    present = values.notna()
+    filled = values.fillna(0.0)
+    keys = ordered[group].to_numpy()
+    dates = pd.to_datetime(ordered[date_col]).to_numpy()
+
+    def earlier(frame):
+        # Totals over strictly earlier dates: the exclusive cumulative sum at the first row of each date.
+        exclusive = frame.groupby(keys, sort=False).cumsum() - frame
+        return exclusive.groupby([keys, dates], sort=False, dropna=False).transform('first')
+
+    count = earlier(present.astype('float64'))
+    total = earlier(filled)
+    total_sq = earlier(filled * filled)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        variance = (total_sq - total * mean) / (count - 1)
+    std = np.sqrt(variance.clip(lower=0.0))
+    scores = _zscore_frame(values, mean, std).where(count >= min_periods)
+    scores = scores.where(present)
+    # Undo the date ordering by position, so duplicate index labels are fine.
+    scores = scores.iloc[np.argsort(order, kind='stable')]
+    scores.index = df.index
+    return scores.add_suffix(suffix)
+
+
+class ZScoreState:
+    """
+    Running per-group mean/variance of a fixed set of feature columns (Welford's algorithm).
+
+    `score` z-scores new rows against the history seen so far and `update` folds
+    them in; both cost O(features) per row. The state can be built from a frame
+    of history with `from_frame` and persisted with `save`/`load`.
+    """
+
+    def __init__(self, columns, min_periods=2):
+        self.columns = list(columns)
+        self.min_periods = min_periods
+        self._count = {}
+        self._mean = {}
+        self._m2 = {}
+
+    def _accumulators(self, key):
+        if key not in self._count:
+            width = len(self.columns)
+            self._count[key] = np.zeros(width)
+            self._mean[key] = np.zeros(width)
+            self._m2[key] = np.zeros(width)
+        return self._count[key], self._mean[key], self._m2[key]
+
+    def _vector(self, values):
+        if isinstance(values, dict):
+            values = [values.get(col, np.nan) for col in self.columns]
+        return np.asarray(values, dtype=np.float64)
+
+    def update(self, key, values):
+        """Folds one observation (a dict or a sequence ordered like `columns`) into `key`'s statistics."""
+        x = self._vector(values)
+        count, mean, m2 = self._accumulators(key)
+        present = ~np.isnan(x)
+        count[present] += 1
+        delta = np.where(present, x - mean, 0.0)
+        mean += np.divide(delta, count, out=np.zeros_like(delta), where=present)
+        m2 += delta * np.where(present, x - mean, 0.0)
+
+    def mean_std(self, key):
+        """Returns (mean, sample std) arrays for `key`; NaN where there are fewer than `min_periods` values."""
+        if key not in self._count:
+            nan = np.full(len(self.columns), np.nan)
+            return nan, nan
+        count, mean, m2 = self._count[key], self._mean[key], self._m2[key]
+        enough = count >= self.min_periods
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(m2 / (count - 1))
+        return np.where(enough, mean, np.nan), np.where(enough, std, np.nan)
+
+    def score(self, key, values):
+        """Z-scores one observation against `key`'s history without updating it."""
+        x = self._vector(values)
+        mean, std = self.mean_std(key)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.where(std > 0, (x - mean) / std, 0.0)
+        return np.where(np.isnan(mean) | np.isnan(x), np.nan, scores)
+
+    def score_and_update(self, key, values):
+        """Scores an observation as of its arrival, then adds it to the history."""
+        scores = self.score(key, values)
+        self.update(key, values)
+        return scores
+
+    def score_frame(self, df, group='ticker', date_col='date', suffix=ZSCORE_SUFFIX, update=True):
+        """
+        Point-in-time z-scores for the rows of `df` (processed in date order), optionally
+        folding the rows into the state afterwards. Rows sharing a date are all scored
+        before any of them is folded in. Returns a frame aligned to `df.index`.
+        """
+        dates = pd.to_datetime(df[date_col]).to_numpy()
+        order = np.argsort(dates, kind='stable')
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        keys = df[group].to_numpy()
+        scores = np.empty_like(values)
+        pending = []
+        for i in order:
+            if pending and dates[i] != dates[pending[-1]]:
+                for j in pending:
+                    self.update(keys[j], values[j])
+                pending = []
+            scores[i] = self.score(keys[i], values[i])
+            if update:
+                pending.append(i)
+        for j in pending:
+            self.update(keys[j], values[j])
+        return pd.DataFrame(scores, index=df.index, columns=[f"{col}{suffix}" for col in self.columns])
+
+    @classmethod
+    def from_frame(cls, df, columns, group='ticker', min_periods=2):
+        """Builds the state from a frame of history in one vectorized pass per group."""
+        state = cls(columns, min_periods=min_periods)
+        values = df[state.columns].astype('float64')
+        grouped = values.groupby(df[group], sort=False)
+        counts, means = grouped.count(), grouped.mean()
+        # var * (n - 1) is the Welford M2 accumulator.
+        m2 = grouped.var(ddof=1).mul(counts - 1).fillna(0.0)
+        for key in counts.index:
+            state._count[key] = np.array(counts.loc[key], dtype=np.float64)
+            state._mean[key] = np.array(means.loc[key].fillna(0.0), dtype=np.float64)
+            state._m2[key] = np.array(m2.loc[key], dtype=np.float64)
+        return state
+
+    def save(self, path):
+        """Writes the state to a JSON file."""
+        payload = {
+            'columns': self.columns,
+            'min_periods': self.min_periods,
+            'groups': {
+                str(key): {
+                    'count': self._count[key].tolist(),
+                    'mean': self._mean[key].tolist(),
+                    'm2': self._m2[key].tolist(),
+                }
+                for key in self._count
+            },
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        state = cls(payload['columns'], min_periods=payload['min_periods'])
+        for key, group in payload['groups'].items():
+            state._count[key] = np.asarray(group['count'], dtype=np.float64)
+            state._mean[key] = np.asarray(group['mean'], dtype=np.float64)
+            state._m2[key] = np.asarray(group['m2'], dtype=np.float64)
+        return state
+
+
+def _occurrence(keys):
+    """For each key, how many earlier entries share it (0 for its first appearance)."""
+    order = np.argsort(keys, kind='stable')
+    ordered = keys[order]
+    run_starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    occurrence = np.empty_like(keys)
+    occurrence[order] = np.arange(len(keys)) - np.repeat(run_starts, np.diff(np.r_[run_starts, len(keys)]))
+    return occurrence
+
+
+def update_expanding_zscores(df, columns, state=None, scored=None, group='ticker', date_col='date',
+                             suffix=ZSCORE_SUFFIX, min_periods=2):
+    """
+    Point-in-time z-scores of `df` that only score the rows a previous run has not seen.
+
+    `scored` is that run's output (with `group`, `date_col`, `columns` and their
+    z-scores) and `state` its ZScoreState after every row of `scored`. Rows found
+    in `scored` with unchanged values keep their z-scores; the others are scored
+    against `state` in date order and folded into it.
+
+    The whole frame is recomputed with expanding_zscores (and a fresh state built)
+    instead when there is no usable state, a stored row changed or disappeared,
+    or a new row is not dated after the last stored row of its group, since the
+    stored scores would then no longer be point-in-time.
+
+    Returns:
+        (pd.DataFrame, ZScoreState): The z-scores aligned to `df.index`, and the state after all rows.
+    """
+    columns = list(columns)
+    score_columns = [f"{col}{suffix}" for col in columns]
+    dates = pd.to_datetime(df[date_col]).to_numpy()
+
+    if (state is not None and scored is not None and state.columns == columns
+            and set([group, date_col] + columns + score_columns) <= set(scored.columns)):
+        scored_dates = pd.to_datetime(scored[date_col]).to_numpy()
+        # One int64 key per row: its group, date and which row of that group and date it is,
+        # so rows sharing both are matched in order of appearance.
+        group_codes, _ = pd.factorize(np.concatenate([scored[group].astype(object).to_numpy(),
+                                                      df[group].astype(object).to_numpy()]))
+        date_codes, date_values = pd.factorize(np.concatenate([scored_dates, dates]))
+        pairs = group_codes.astype(np.int64) * len(date_values) + date_codes
+        occurrence = np.r_[_occurrence(pairs[:len(scored)]), _occurrence(pairs[len(scored):])]
+        row_keys = pairs * (occurrence.max() + 1) + occurrence
+        # Position of each row in `scored`, or -1 for rows it does not have.
+        positions = pd.Index(row_keys[:len(scored)]).get_indexer(row_keys[len(scored):])
+        old = positions >= 0
+        # The stored table holds float32 features.
+        unchanged = np.allclose(df[columns].to_numpy(np.float64)[old],
+                                scored[columns].to_numpy(np.float64)[positions[old]],
+                                rtol=1e-6, atol=1e-6, equal_nan=True)
+        last_scored = pd.Series(scored_dates).groupby(scored[group].astype(object).to_numpy()).max()
+        new_groups = df[group].astype(object).to_numpy()[~old]
+        last_scored = last_scored.reindex(new_groups).to_numpy()
+        in_order = (pd.isna(last_scored) | (dates[~old] > last_scored)).all()
+        if unchanged and in_order and old.sum() == len(scored):
+            values = np.empty((len(df), len(columns)))
+            values[old] = scored[score_columns].to_numpy(np.float64)[positions[old]]
+            if not old.all():
+                values[~old] = state.score_frame(df[~old], group, date_col, suffix).to_numpy()
+            return pd.DataFrame(values, index=df.index, columns=score_columns), state
+
+    state = ZScoreState.from_frame(df, columns, group, min_periods)
+    return expanding_zscores(df, columns, group, date_col, suffix, min_periods), state
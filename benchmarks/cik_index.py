@@ -0,0 +1,81 @@
+# benchmarks/cik_index.py
+"""
+Resolves a batch of tickers against a synthetic company_tickers.json of SEC
+size: the old per-ticker linear scan of the JSON map versus CIKIndex
+(building it, saving/loading it, and bulk resolve). Checks that both agree.
+
+Usage:
+    python benchmarks/cik_index.py [n_companies] [n_lookups]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scraper.cik_index import CIKIndex
+
+
+def synthetic_company_tickers(n):
+    rng = random.Random(0)
+    data = {}
+    for i in range(n):
+        ticker = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(rng.randint(2, 5))) + str(i)
+        data[str(i)] = {'cik_str': 1000 + i // 2, 'ticker': ticker, 'title': f"Company {i}"}
+    return data
+
+
+def linear_lookup(data, ticker):
+    """The scrapers' previous get_cik_for_ticker body, minus the download."""
+    ticker = ticker.upper().strip()
+    for entry in data.values():
+        if entry["ticker"].upper() == ticker:
+            return str(entry["cik_str"]).zfill(10)
+    return None
+
+
+def main():
+    n_companies = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    data = synthetic_company_tickers(n_companies)
+    rng = random.Random(1)
+    tickers = [rng.choice(list(data.values()))['ticker'].lower() for _ in range(n_lookups)] + ['NOPE']
+
+    start = time.perf_counter()
+    expected = {ticker: linear_lookup(data, ticker) for ticker in tickers}
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = CIKIndex.from_company_tickers(data)
+    build_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cik_index.json')
+        index.save(path)
+        start = time.perf_counter()
+        loaded = CIKIndex.load(path)
+        load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resolved = loaded.resolve(tickers)
+    resolve_time = time.perf_counter() - start
+
+    assert resolved == expected
+    cik = expected[tickers[0]]
+    assert tickers[0].upper() in loaded.tickers(cik) and loaded.cik(loaded.ticker(cik)) == cik
+    assert not loaded.is_stale() and loaded.top(3) == [(str(1000).zfill(10), data['0']['ticker']),
+                                                      (str(1000).zfill(10), data['1']['ticker']),
+                                                      (str(1001).zfill(10), data['2']['ticker'])]
+
+    print(f"{n_lookups} lookups in a map of {n_companies} companies")
+    print(f"linear scan: {linear_time:.3f}s")
+    print(f"index:       build {build_time * 1000:.1f}ms, load {load_time * 1000:.1f}ms, "
+          f"resolve {resolve_time * 1000:.2f}ms ({linear_time / resolve_time:.0f}x faster lookups)")
+
+
+if __name__ == '__main__':
+    main()
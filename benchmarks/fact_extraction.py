@@ -0,0 +1,219 @@
+# benchmarks/fact_extraction.py
+"""
+Runs scraper/extracter2.py's parallel mode (run_parallel_extraction_pipeline)
+for hundreds of tickers against a local stand-in for www.sec.gov and
+data.sec.gov that serves a ticker list, submissions, filing index pages and
+iXBRL reports. Samples the process's resident memory while it runs, once
+for a tenth of the tickers and once for all of them: facts go to Parquet one
+filing at a time, so the peak should not grow with the number of tickers.
+Checks that every fact lands in the file, one row group per filing; that a
+ticker whose submissions return 404 is reported as failed while the other
+tickers' facts are still written; and that a writer left by an exception
+leaves no truncated file or .tmp behind.
+
+Usage:
+    python benchmarks/fact_extraction.py [n_tickers] [filings_per_ticker] [facts_per_filing] [report_kb]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import pyarrow.parquet as pq
+from aiohttp import web
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.cik_index import synthetic_company_tickers
+from benchmarks.sec_client import StandInServer
+from scraper import extracter2
+from scraper.sec_client import SEC_HOST_OVERRIDE_ENV
+
+BROKEN_TICKER = "BROKEN"
+BROKEN_CIK = 999999
+
+
+def synthetic_report(n_facts, size):
+    """An iXBRL 10-Q with `n_facts` numeric facts, padded with narrative text to about `size` bytes."""
+    facts = "".join(
+        f'<p>Line {i}: <ix:nonFraction name="us-gaap:Concept{i}" contextRef="c-1" unitRef="usd" '
+        f'decimals="-6" scale="6">{1000 + i}</ix:nonFraction></p>\n' for i in range(n_facts))
+    head = ('<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL" '
+            'xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:us-gaap="http://fasb.org/us-gaap/2024">'
+            '<head><title>10-Q</title></head><body><div style="display:none"><ix:header><ix:resources>'
+            '<xbrli:context id="c-1"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">'
+            '0000001000</xbrli:identifier></xbrli:entity><xbrli:period><xbrli:instant>2025-06-28'
+            '</xbrli:instant></xbrli:period></xbrli:context><xbrli:unit id="usd"><xbrli:measure>iso4217:USD'
+            '</xbrli:measure></xbrli:unit></ix:resources></ix:header></div>\n')
+    padding = "<p>Management's discussion of the quarter's results.</p>\n"
+    body = head + facts
+    body += padding * max(0, (size - len(body)) // len(padding))
+    return (body + "</body></html>\n").encode('utf-8')
+
+
+class FilingServer(StandInServer):
+    """
+    Serves every company `filings_per_ticker` recent 10-Qs whose reports all
+    share one body, so the server's own memory does not grow with the run.
+    Counts the report bytes sent.
+    """
+
+    def __init__(self, company_tickers, filings_per_ticker, report):
+        super().__init__(0)
+        self.company_tickers = company_tickers
+        self.filings_per_ticker = filings_per_ticker
+        self.report = report
+        self.report_bytes = 0
+
+    async def _tickers(self, request):
+        return web.json_response(self.company_tickers)
+
+    async def _submissions(self, request):
+        self.arrivals.append(time.monotonic())
+        cik = int(request.match_info['cik'])
+        if cik == BROKEN_CIK:
+            return web.Response(status=404)
+        today = date.today()
+        forms, dates, accessions = [], [], []
+        for j in range(self.filings_per_ticker):
+            forms += ['10-Q', '8-K']
+            dates += [(today - timedelta(days=91 * j + 30)).isoformat()] * 2
+            accessions += [f"{cik:010d}-25-{2 * j:06d}", f"{cik:010d}-25-{2 * j + 1:06d}"]
+        return web.json_response({'filings': {'recent': {'form': forms, 'filingDate': dates,
+                                                         'accessionNumber': accessions}}})
+
+    async def _index(self, request):
+        self.arrivals.append(time.monotonic())
+        folder = f"/Archives/edgar/data/{request.match_info['cik']}/{request.match_info['folder']}"
+        return web.Response(content_type='text/html', text=(
+            '<html><body><table class="tableFile"><tr><th>Seq</th><th>Description</th><th>Document</th>'
+            f'<th>Type</th></tr><tr><td>1</td><td>10-Q</td><td><a href="{folder}/report.htm">report.htm</a>'
+            '</td><td>10-Q</td></tr></table></body></html>'))
+
+    async def _report(self, request):
+        self.arrivals.append(time.monotonic())
+        self.report_bytes += len(self.report)
+        return web.Response(body=self.report, content_type='text/html')
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get('/files/company_tickers.json', self._tickers)
+        app.router.add_get('/submissions/CIK{cik}.json', self._submissions)
+        app.router.add_get('/Archives/edgar/data/{cik}/{folder}/{name}-index.html', self._index)
+        app.router.add_get('/Archives/edgar/data/{cik}/{folder}/report.htm', self._report)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+        self.base_url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+
+
+def resident_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+class PeakMemory:
+    """Samples this process's resident memory on a thread; `growth` is the peak above the starting value, in MB."""
+
+    def __enter__(self):
+        self.start = self.peak = resident_kb()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._done.wait(0.005):
+            self.peak = max(self.peak, resident_kb())
+
+    def __exit__(self, *exc_info):
+        self._done.set()
+        self._thread.join()
+        self.peak = max(self.peak, resident_kb())
+        self.growth = (self.peak - self.start) / 1024
+
+
+def extract(tickers, output_path, filings_per_ticker, log=None):
+    """Runs the parallel pipeline in a fresh working directory (for the CIK index and response cache)."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            with contextlib.redirect_stdout(log or io.StringIO()):
+                return extracter2.run_parallel_extraction_pipeline(tickers, output_path, max_filings=filings_per_ticker)
+        finally:
+            os.chdir(cwd)
+
+
+def main():
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    filings_per_ticker = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    facts_per_filing = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+    report_kb = int(sys.argv[4]) if len(sys.argv) > 4 else 400
+    company_tickers = synthetic_company_tickers(n_tickers)
+    company_tickers[str(n_tickers)] = {'cik_str': BROKEN_CIK, 'ticker': BROKEN_TICKER, 'title': "Broken Company"}
+    tickers = [entry['ticker'] for entry in company_tickers.values() if entry['ticker'] != BROKEN_TICKER]
+    report = synthetic_report(facts_per_filing, report_kb * 1000)
+    # The stand-in answers instantly, so the SEC rate limit would be all that is timed.
+    extracter2.REQUESTS_PER_SEC = 1000
+    extracter2.CONCURRENCY = 32
+
+    print(f"{n_tickers} tickers x {filings_per_ticker} 10-Qs, {facts_per_filing} facts per "
+          f"{len(report) / 1e3:.0f} KB report, {os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as out_dir, FilingServer(company_tickers, filings_per_ticker, report) as server:
+        os.environ[SEC_HOST_OVERRIDE_ENV] = server.base_url
+        output_path = os.path.join(out_dir, 'facts.parquet')
+        growths, sizes = [], []
+        for count in [max(1, n_tickers // 10), n_tickers]:
+            sent_before = server.report_bytes
+            start = time.perf_counter()
+            with PeakMemory() as memory:
+                rows = extract(tickers[:count], output_path, filings_per_ticker)
+            elapsed = time.perf_counter() - start
+            sent = (server.report_bytes - sent_before) / 1e6
+
+            metadata = pq.ParquetFile(output_path).metadata
+            assert rows == metadata.num_rows == count * filings_per_ticker * facts_per_filing, "facts went missing"
+            assert metadata.num_row_groups == count * filings_per_ticker
+            assert not os.path.exists(output_path + '.tmp')
+            growths.append(memory.growth)
+            sizes.append(sent)
+            print(f"{count:5d} tickers: {rows:8d} facts  {sent:8.1f} MB of reports  {elapsed:6.2f}s  "
+                  f"peak resident memory +{memory.growth:6.1f} MB")
+
+        # Holding the run's facts or reports in memory would grow with the data; streaming stays flat.
+        assert growths[1] - growths[0] < (sizes[1] - sizes[0]) / 5, "resident memory grew with the data extracted"
+
+        # A ticker whose submissions cannot be fetched is skipped and reported; the others are written.
+        log = io.StringIO()
+        partial_tickers = tickers[:count // 20] + [BROKEN_TICKER] + tickers[count // 20:count // 10]
+        rows = extract(partial_tickers, output_path, filings_per_ticker, log)
+        assert rows == pq.ParquetFile(output_path).metadata.num_rows
+        assert rows == (len(partial_tickers) - 1) * filings_per_ticker * facts_per_filing, "other tickers' facts were lost"
+        assert f"1 tickers failed: {BROKEN_TICKER}" in log.getvalue(), "the failed ticker was not reported"
+
+        # A writer left by an exception removes its partial file and keeps the existing output.
+        with open(output_path, 'rb') as f:
+            previous = f.read()
+        columns = extracter2.parse_ixbrl_fact_columns(report.decode('utf-8'), tickers[0], 'bench', 'report.htm')[0]
+        with contextlib.suppress(KeyboardInterrupt), extracter2.FactParquetWriter(output_path) as writer:
+            writer.write(columns)
+            raise KeyboardInterrupt
+        assert not os.path.exists(output_path + '.tmp'), "the aborted writer left its partial file behind"
+        with open(output_path, 'rb') as f:
+            assert f.read() == previous, "the aborted writer replaced the existing output"
+    print("failed tickers are skipped and reported, aborted writes leave no output behind: ok")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+# benchmarks/filename_tag.py
+"""
+Resolves the primary document of a batch of full-submission .txt files
+(synthetic: an SEC header, the main document and several MB of exhibits)
+from a local stand-in for www.sec.gov, two ways: downloading each whole
+file (the previous extract_filename_tag_value) and the partial fetch in
+scraper/something.py. The stand-in counts the body bytes it sends; it is
+run once honoring Range requests and once ignoring them, where the partial
+fetch relies on dropping the connection. Checks that every way finds the
+same filenames, including for a submission whose <FILENAME> tag straddles
+the end of the first HEADER_FETCH_BYTES.
+
+Usage:
+    python benchmarks/filename_tag.py [n_filings] [submission_mb] [latency_ms]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+from aiohttp import web
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.sec_client import StandInServer
+from scraper.sec_client import SEC_HOST_OVERRIDE_ENV, SECClient
+from scraper.something import FILENAME_PATTERN, HEADER_FETCH_BYTES, extract_filename_tag_value
+
+USER_AGENT = "LinguisticAlphaBenchmark bench@example.com"
+WRITE_SIZE = 16 * 1024
+
+
+def synthetic_submission(number, size):
+    rng = random.Random(number)
+    header = ("<SEC-DOCUMENT>0000320193-25-%06d.txt\n<SEC-HEADER>\nACCESSION NUMBER:\t\t0000320193-25-%06d\n"
+              "CONFORMED SUBMISSION TYPE:\t10-Q\n" % (number, number)
+              + "FILER:\n\tCOMPANY DATA:\n\t\tCOMPANY CONFORMED NAME:\t\t\tCOMPANY %d\n" % number * rng.randint(1, 40)
+              + "</SEC-HEADER>\n<DOCUMENT>\n<TYPE>10-Q\n<SEQUENCE>1\n"
+              f"<FILENAME>doc{number}-2025q2.htm\n<DESCRIPTION>10-Q\n<TEXT>\n").encode('ascii')
+    body = b"<html><body>" + b"<p>Quarterly report text.</p>" * (size // 29) + b"</body></html>\n"
+    return (header + body)[:size]
+
+
+def straddling_submission(number, size):
+    """A submission whose header is padded so its <FILENAME> value is cut by the first HEADER_FETCH_BYTES."""
+    submission = synthetic_submission(number, size)
+    start = submission.index(b"<FILENAME>")
+    padding = b"\t\tFORMER NAME:\t\t" + b"X" * (HEADER_FETCH_BYTES - start - 32) + b"\n"
+    submission = submission[:start] + padding + submission[start:]
+    assert submission.index(b"<FILENAME>") + len(b"<FILENAME>") < HEADER_FETCH_BYTES < submission.index(b".htm")
+    return submission[:size]
+
+
+class SubmissionServer(StandInServer):
+    """Serves synthetic submissions in WRITE_SIZE writes, optionally honoring Range, and counts the bytes sent."""
+
+    def __init__(self, latency, submissions, honor_range=True):
+        super().__init__(latency)
+        self.submissions = submissions
+        self.honor_range = honor_range
+        self.bytes_sent = 0
+
+    async def _submission(self, request):
+        self.arrivals.append(time.monotonic())
+        await asyncio.sleep(self.latency)
+        body = self.submissions[int(request.match_info['number'])]
+        status = 200
+        if self.honor_range and request.http_range.stop is not None:
+            body, status = body[request.http_range], 206
+        response = web.StreamResponse(status=status)
+        response.content_length = len(body)
+        response.content_type = 'text/plain'
+        await response.prepare(request)
+        try:
+            for i in range(0, len(body), WRITE_SIZE):
+                await response.write(body[i:i + WRITE_SIZE])
+                self.bytes_sent += len(body[i:i + WRITE_SIZE])
+        except (ConnectionError, RuntimeError):
+            pass  # The client dropped the connection.
+        return response
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get('/Archives/edgar/data/320193/{number}.txt', self._submission)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+        self.base_url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+
+
+async def full_download(urls):
+    async with SECClient(USER_AGENT, rate=100, cache=False) as client:
+        async def one(url):
+            match = FILENAME_PATTERN.search((await client.get(url)).content)
+            return match.group(1).decode('latin-1')
+        return await asyncio.gather(*(one(url) for url in urls))
+
+
+async def partial_fetch(urls):
+    async with SECClient(USER_AGENT, rate=100, cache=False) as client:
+        results = await asyncio.gather(*(extract_filename_tag_value(client, url) for url in urls))
+        return [result["Extracted_Value"] for result in results]
+
+
+def main():
+    n_filings = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    submission_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    latency = (int(sys.argv[3]) if len(sys.argv) > 3 else 50) / 1000
+    submissions = {n: synthetic_submission(n, int(submission_mb * 1_000_000)) for n in range(n_filings - 1)}
+    submissions[n_filings - 1] = straddling_submission(n_filings - 1, int(submission_mb * 1_000_000))
+    urls = [f"https://www.sec.gov/Archives/edgar/data/320193/{n}.txt" for n in range(n_filings)]
+    expected = [f"doc{n}-2025q2.htm" for n in range(n_filings)]
+
+    print(f"{n_filings} submissions of {submission_mb:g} MB, {latency * 1000:.0f} ms latency")
+    for label, fetch, honor_range in [('full download', full_download, True),
+                                      ('partial (Range honored)', partial_fetch, True),
+                                      ('partial (Range ignored)', partial_fetch, False)]:
+        with SubmissionServer(latency, submissions, honor_range) as server:
+            os.environ[SEC_HOST_OVERRIDE_ENV] = server.base_url
+            start = time.perf_counter()
+            filenames = asyncio.run(fetch(urls))
+            elapsed = time.perf_counter() - start
+        assert filenames == expected, f"{label}: wrong filenames"
+        print(f"{label:24s} {elapsed:6.2f}s  {server.bytes_sent / n_filings / 1e3:10.1f} KB sent per filing")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/filing_archive.py
+"""
+Archives the sample filings under scraper/downloads and the cleaned texts in
+output/ into a scraper.filing_archive archive, then compares it with the
+plain files: bytes on disk, and the time to read every document back (in
+random order, streamed in 64 KB chunks). Checks that every document reads
+back identical to its source file.
+
+Usage:
+    python benchmarks/filing_archive.py [copies]
+
+`copies` adds each filing that many more times under other accession
+numbers, as repeated exhibits and schema files would be across filings.
+"""
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scraper.filing_archive import READ_SIZE, FilingArchive
+
+DOWNLOADS_GLOB = os.path.join(project_root, 'scraper', 'downloads', '*', '*', '*')
+CLEAN_TEXT_GLOB = os.path.join(project_root, 'output', '*_clean.txt')
+CIK = '0000320193'
+
+
+def sample_documents(copies):
+    """(accession, filename, path) rows: one synthetic accession per filing folder, plus `copies` duplicates."""
+    folders = {}
+    for path in sorted(glob.glob(DOWNLOADS_GLOB)) + sorted(glob.glob(CLEAN_TEXT_GLOB)):
+        folders.setdefault(os.path.dirname(path), []).append(path)
+    rows = []
+    for copy in range(copies + 1):
+        for i, paths in enumerate(folders.values()):
+            accession = f"{CIK}-{copy:02d}-{i:06d}"
+            rows.extend((accession, os.path.basename(path), path) for path in paths)
+    return rows
+
+
+def drain(f):
+    total = 0
+    for chunk in iter(lambda: f.read(READ_SIZE), b''):
+        total += len(chunk)
+    return total
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    rows = sample_documents(copies)
+    raw_bytes = sum(os.path.getsize(path) for _, _, path in rows)
+
+    with tempfile.TemporaryDirectory() as archive_dir:
+        start = time.perf_counter()
+        with FilingArchive(archive_dir) as archive:
+            for accession, filename, path in rows:
+                archive.add_file(CIK, accession, filename, path)
+        write_time = time.perf_counter() - start
+        on_disk = sum(os.path.getsize(path) for path in glob.glob(os.path.join(archive_dir, '**', '*'), recursive=True)
+                      if os.path.isfile(path))
+
+        order = list(rows)
+        random.Random(0).shuffle(order)
+        start = time.perf_counter()
+        for _, _, path in order:
+            with open(path, 'rb') as f:
+                drain(f)
+        plain_time = time.perf_counter() - start
+
+        with FilingArchive(archive_dir) as archive:
+            start = time.perf_counter()
+            for accession, filename, _ in order:
+                with archive.open(CIK, accession, filename) as f:
+                    drain(f)
+            archive_time = time.perf_counter() - start
+            stats = archive.stats()
+            for accession, filename, path in rows:
+                with open(path, 'rb') as f:
+                    assert archive.read_bytes(CIK, accession, filename) == f.read(), f"{filename} differs"
+
+    print(f"{len(rows)} documents, {stats['blobs']} unique blobs ({archive.codec})")
+    print(f"plain files:  {raw_bytes / 1e6:8.2f} MB")
+    print(f"archive:      {on_disk / 1e6:8.2f} MB on disk ({raw_bytes / on_disk:.1f}x smaller), "
+          f"written in {write_time:.2f}s")
+    print(f"read all (plain):   {plain_time:6.3f}s")
+    print(f"read all (archive): {archive_time:6.3f}s  {raw_bytes / archive_time / 1e6:.0f} MB/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/forward_labels.py
+"""
+Compares the per-row DataFrame.apply labeler (slice prices for every event,
+then pct_change().std()) against the vectorized forward_window_labels.
+
+Usage:
+    python benchmarks/forward_labels.py [n_tickers] [events_per_ticker]
+"""
+import os
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from analysis.labels import forward_window_labels, LABEL_COLUMNS
+
+
+def build_market(n_tickers, events_per_ticker, seed=0):
+    """Random-walk prices shaped like yf.download output, plus quarterly events at 17:00."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2010-01-01', '2024-12-31')
+    tickers = [f'T{i:02d}' for i in range(n_tickers)]
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(len(dates), n_tickers)), axis=0))
+    closes[rng.random(closes.shape) < 0.01] = np.nan  # missing prints
+    columns = pd.MultiIndex.from_product([['Adj Close'], tickers])
+    all_stock_data = pd.DataFrame(closes, index=dates, columns=columns)
+
+    event_dates = pd.date_range('2010-01-15 17:00', periods=events_per_ticker, freq='91D')
+    events = pd.DataFrame({
+        'ticker': np.repeat(tickers, events_per_ticker),
+        'date': np.tile(event_dates, n_tickers),
+    })
+    return events, all_stock_data
+
+
+def apply_labels(events, all_stock_data):
+    def calculate_performance(row):
+        ticker = row['ticker']
+        start_date = row['date']
+        end_date = start_date + timedelta(days=90)
+        stock_slice = all_stock_data.loc[start_date:end_date]
+        if stock_slice.empty or ('Adj Close', ticker) not in stock_slice.columns:
+            return pd.Series([None, None], index=LABEL_COLUMNS)
+        adj_close = stock_slice['Adj Close'][ticker].dropna()
+        if len(adj_close) < 2:
+            return pd.Series([None, None], index=LABEL_COLUMNS)
+        start_price = adj_close.iloc[0]
+        end_price = adj_close.iloc[-1]
+        daily_return = adj_close.pct_change()
+        return pd.Series([(end_price - start_price) / start_price, daily_return.std()], index=LABEL_COLUMNS)
+
+    return events.apply(calculate_performance, axis=1)
+
+
+def main():
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 14
+    events_per_ticker = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    events, all_stock_data = build_market(n_tickers, events_per_ticker)
+    print(f"Labeling {len(events)} events over {len(all_stock_data)} trading days...")
+
+    start = time.perf_counter()
+    expected = apply_labels(events, all_stock_data).astype(float)
+    apply_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = forward_window_labels(events, all_stock_data['Adj Close'], window_days=90)
+    vectorized_time = time.perf_counter() - start
+
+    print(f"apply(axis=1):        {apply_time:.3f}s")
+    print(f"forward_window_labels: {vectorized_time:.3f}s")
+    print(f"Speedup: {apply_time / vectorized_time:.1f}x")
+
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12, equal_nan=True)
+    print("Labels match the apply path.")
+
+
+if __name__ == '__main__':
+    main()
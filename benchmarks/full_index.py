@@ -0,0 +1,148 @@
+# benchmarks/full_index.py
+"""
+Enumerates the 10-Qs of a universe of companies from a local stand-in for
+EDGAR serving synthetic data, two ways: one Submissions API request per
+company (getting10-q.py's previous approach) and one full-index master.idx
+per quarter parsed locally (scraper.full_index), cold and then with the
+quarters already stored. Checks that both find the same filings, and that
+the full-index .txt URLs equal the ones getting10-q.py builds from the
+Submissions API.
+
+Usage:
+    python benchmarks/full_index.py [n_companies] [rows_per_quarter] [latency_ms]
+"""
+import asyncio
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from aiohttp import web
+
+from benchmarks.sec_client import StandInServer
+from scraper.full_index import enumerate_filings, quarters
+from scraper.sec_client import SEC_HOST_OVERRIDE_ENV, SECClient
+
+USER_AGENT = "LinguisticAlphaBenchmark bench@example.com"
+FORMS = ['10-Q', '10-Q/A']
+OTHER_FORMS = ['8-K', '4', '10-K', 'S-1', 'DEF 14A', '424B2', 'SC 13G']
+START_YEAR = 2023
+
+
+def load_getting_10q():
+    """scraper/getting10-q.py, whose name is not importable."""
+    spec = importlib.util.spec_from_file_location('getting_10q', os.path.join(project_root, 'scraper', 'getting10-q.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_quarters(rows_per_quarter, n_ciks):
+    """{(year, quarter): [(cik, company, form, date, filename)]}; CIKs 1..n_ciks are the universe."""
+    rng = random.Random(0)
+    data = {}
+    for year, quarter in quarters(START_YEAR, today=date(2024, 12, 31)):
+        rows = []
+        for i in range(rows_per_quarter):
+            cik = rng.randint(1, n_ciks * 20)
+            form = rng.choice(FORMS) if rng.random() < 0.1 else rng.choice(OTHER_FORMS)
+            day = date(year, 3 * quarter - 2 + rng.randint(0, 2), rng.randint(1, 28)).isoformat()
+            accession = f"{rng.randint(0, 10**10 - 1):010d}-{year % 100:02d}-{i:06d}"
+            rows.append((str(cik), f"COMPANY {cik}", form, day, f"edgar/data/{cik}/{accession}.txt"))
+        data[(year, quarter)] = rows
+    return data
+
+
+class EdgarStandIn(StandInServer):
+    def __init__(self, latency, data):
+        super().__init__(latency)
+        self.data = data
+        self.master = {key: self._master_idx(rows) for key, rows in data.items()}
+
+    @staticmethod
+    def _master_idx(rows):
+        header = ("Description:           Master Index of EDGAR Dissemination Feed\n\n"
+                  "CIK|Company Name|Form Type|Date Filed|Filename\n" + '-' * 80 + '\n')
+        return header + ''.join('|'.join(row) + '\n' for row in rows)
+
+    async def _master(self, request):
+        self.arrivals.append(time.monotonic())
+        await asyncio.sleep(self.latency)
+        key = (int(request.match_info['year']), int(request.match_info['quarter']))
+        return web.Response(text=self.master[key])
+
+    async def _submissions(self, request):
+        self.arrivals.append(time.monotonic())
+        await asyncio.sleep(self.latency)
+        cik = str(int(request.match_info['cik']))
+        rows = [row for key in self.data for row in self.data[key] if row[0] == cik]
+        return web.json_response({'filings': {'recent': {
+            'accessionNumber': [row[4].rsplit('/', 1)[1][:-4] for row in rows],
+            'form': [row[2] for row in rows],
+            'filingDate': [row[3] for row in rows],
+        }}})
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get('/Archives/edgar/full-index/{year}/QTR{quarter}/master.idx', self._master)
+        app.router.add_get('/submissions/CIK{cik}.json', self._submissions)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+        self.base_url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+
+
+async def per_company(ciks):
+    """getting10-q.py's Submissions API path: (cik, accession, .txt URL) of every 10-Q."""
+    getting_10q = load_getting_10q()
+    async with SECClient(USER_AGENT, rate=10, cache=False) as client:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = await asyncio.gather(*(
+                getting_10q.get_10q_urls_from_submissions(client, cik, cik) for cik in ciks))
+        return {(filing['cik'], filing['accession_number'], filing['url'])
+                for filings in results for filing in filings}, client.requests
+
+
+async def full_index(ciks, index_dir):
+    async with SECClient(USER_AGENT, rate=10, cache=False) as client:
+        filings = await enumerate_filings(client, START_YEAR, 2024, forms=FORMS, ciks=ciks, index_dir=index_dir)
+        return {(filing.cik, filing.accession, filing.txt_url) for filing in filings}, client.requests
+
+
+def timed(coroutine):
+    start = time.perf_counter()
+    result = asyncio.run(coroutine)
+    return result, time.perf_counter() - start
+
+
+def main():
+    n_companies = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rows_per_quarter = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    latency = (int(sys.argv[3]) if len(sys.argv) > 3 else 100) / 1000
+    data = synthetic_quarters(rows_per_quarter, n_companies)
+    ciks = [f"{cik:010d}" for cik in range(1, n_companies + 1)]
+
+    with EdgarStandIn(latency, data) as server, tempfile.TemporaryDirectory() as index_dir:
+        os.environ[SEC_HOST_OVERRIDE_ENV] = server.base_url
+        (expected, api_requests), api_time = timed(per_company(ciks))
+        (cold, cold_requests), cold_time = timed(full_index(ciks, index_dir))
+        (warm, warm_requests), warm_time = timed(full_index(ciks, index_dir))
+
+    assert cold == expected and warm == expected, "full-index enumeration found different filings or URLs"
+    print(f"{n_companies} companies, {len(data)} quarters of {rows_per_quarter} rows, {len(expected)} 10-Qs")
+    print(f"submissions API:   {api_time:6.2f}s  {api_requests} requests")
+    print(f"full index (cold): {cold_time:6.2f}s  {cold_requests} requests")
+    print(f"full index (warm): {warm_time:6.2f}s  {warm_requests} requests")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/html_text.py
+"""
+Compares the previous BeautifulSoup extraction in scrape_edgar_htm (full tree,
+decompose tables/scripts/styles/ix: tags, get_text) with the streaming
+extractor in scraper/html_text.py: throughput and peak memory, on the sample
+filings under scraper/downloads, on a synthetic 10-Q-sized Inline XBRL
+document and on windows-1252 encoded filings (declared in a <meta> tag and
+undeclared, as in older EDGAR HTML). Checks that both produce identical text.
+
+Usage:
+    python benchmarks/html_text.py [synthetic_mb]
+"""
+import glob
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from bs4 import BeautifulSoup
+
+from scraper.html_text import DEFAULT_CHUNK_SIZE, iter_html_text
+
+SAMPLE_GLOB = os.path.join(project_root, 'scraper', 'downloads', '*', '*', '*.htm')
+PROSE_PATH = os.path.join(project_root, 'output', 'aapl-20250628_clean.txt')
+
+
+def bs4_text(content):
+    """The body of scrape_edgar_htm before the streaming extractor."""
+    soup = BeautifulSoup(content, "html.parser")
+    body = soup.find('body')
+    for tag in body.find_all(['table', 'script', 'style']):
+        tag.decompose()
+    for tag in body.find_all(lambda t: t.name and t.name.startswith('ix:')):
+        tag.decompose()
+    text = body.get_text(separator=' ', strip=True)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return re.sub(r'(?i)(Item\s+\d+\w*\.)', r'\n\n\1', text)
+
+
+def streaming_text(content):
+    chunks = (content[i:i + DEFAULT_CHUNK_SIZE] for i in range(0, len(content), DEFAULT_CHUNK_SIZE))
+    return ''.join(iter_html_text(chunks))
+
+
+def synthetic_10q(target_mb):
+    """Inline XBRL-style document: prose paragraphs with tagged facts, interleaved with financial tables."""
+    with open(PROSE_PATH, 'r', encoding='utf-8') as f:
+        paragraphs = [p for p in f.read().split('\n') if p.strip()]
+    parts = ['<?xml version="1.0" encoding="utf-8"?><html xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"><head>'
+             '<style>p{margin:0}</style></head><body><div style="display:none"><ix:header><ix:hidden>'
+             '<ix:nonNumeric name="dei:DocumentType">10-Q</ix:nonNumeric></ix:hidden></ix:header></div>']
+    size, i = 0, 0
+    while size < target_mb * 1_000_000:
+        words = paragraphs[i % len(paragraphs)].split(' ')
+        middle = len(words) // 2
+        paragraph = (f'<div><span style="font-family:Helvetica">{" ".join(words[:middle])} '
+                     f'<ix:nonFraction name="us-gaap:Revenues" unitRef="usd" decimals="-6">{i},000</ix:nonFraction> '
+                     f'{" ".join(words[middle:])}</span></div>')
+        table = ('<table><tr><td><span>Net sales</span></td><td>$</td><td><ix:nonFraction name="us-gaap:Revenues">'
+                 f'{i}</ix:nonFraction></td></tr>' + '<tr><td>&#160;</td><td>&#8212;</td></tr>' * 20 + '</table>')
+        parts.append(paragraph + (table if i % 3 == 0 else ''))
+        size += len(parts[-1])
+        i += 1
+    parts.append('</body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def windows_1252_filing(n_paragraphs, declared):
+    """Older EDGAR-style HTML in windows-1252 (curly quotes, dashes, accents), with or without a <meta> charset."""
+    head = '<head><meta http-equiv="Content-Type" content="text/html; charset=windows-1252"></head>' if declared else ''
+    paragraph = ("<p>Caf\u00e9 \u201cquoted\u201d \u2014 the Company\u2019s r\u00e9sum\u00e9 of "
+                 "\u00a3{i} million in na\u00efve estimates.</p>")
+    body = ''.join(paragraph.format(i=i) + ('<p>Item 2. Management\u2019s Discussion</p>' if i % 50 == 0 else '')
+                   for i in range(n_paragraphs))
+    return f'<html>{head}<body>{body}</body></html>'.encode('cp1252')
+
+
+def measure(function, content):
+    tracemalloc.start()
+    start = time.perf_counter()
+    text = function(content)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return text, elapsed, peak
+
+
+def compare(label, documents):
+    total = sum(len(d) for d in documents)
+    results = {}
+    for name, function in [('BeautifulSoup', bs4_text), ('streaming', streaming_text)]:
+        texts, elapsed, peak = [], 0.0, 0
+        for document in documents:
+            text, seconds, memory = measure(function, document)
+            texts.append(text)
+            elapsed += seconds
+            peak = max(peak, memory)
+        results[name] = texts
+        print(f"{label:28s} {name:14s} {elapsed:7.2f}s  {total / elapsed / 1e6:6.2f} MB/s  peak {peak / 1e6:7.1f} MB")
+    assert results['BeautifulSoup'] == results['streaming'], f"{label}: outputs differ"
+
+
+def main():
+    synthetic_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    samples = [open(path, 'rb').read() for path in sorted(glob.glob(SAMPLE_GLOB))]
+    if samples:
+        compare(f"{len(samples)} sample filings", samples)
+    compare(f"synthetic {synthetic_mb:g} MB 10-Q", [synthetic_10q(synthetic_mb)])
+    legacy = [windows_1252_filing(5_000, declared) for declared in (True, False)]
+    compare("windows-1252 filings", legacy)
+    assert all('Caf\u00e9 \u201cquoted\u201d' in streaming_text(document) for document in legacy)
+
+
+if __name__ == '__main__':
+    main()
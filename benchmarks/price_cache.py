@@ -0,0 +1,140 @@
+# benchmarks/price_cache.py
+"""
+Serves overlapping price lookups (as the pipeline, P&L calculator and
+dashboard make them) for a set of tickers two ways: asking the provider for
+every lookup, and through utils.price_cache.PriceCache, which only fetches
+the dates it does not hold yet. The provider is a StaticPriceProvider over
+random-walk prices that counts its calls. Checks that both ways return the
+same prices, that a range whose fetch failed (PriceFetchError) is fetched
+again next time rather than marked as covered, and that a closed range with
+no trading days (a weekend, or before the listing) is not.
+
+Usage:
+    python benchmarks/price_cache.py [n_tickers] [lookups_per_ticker]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from utils.price_cache import PRICE_COLUMNS, PriceCache, PriceFetchError, StaticPriceProvider
+
+
+class CountingProvider(StaticPriceProvider):
+    """A StaticPriceProvider that counts fetches and fails the first `failures` of them."""
+
+    def __init__(self, frames, failures=0):
+        super().__init__(frames)
+        self.calls = 0
+        self.failures = failures
+
+    def fetch(self, ticker, start, end):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise PriceFetchError(f"{ticker}: rate limited")
+        return super().fetch(ticker, start, end)
+
+
+def build_prices(n_tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2015-01-01', '2024-12-31', name='Date')
+    frames = {}
+    for i in range(n_tickers):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+        frames[f'T{i:02d}'] = pd.DataFrame({col: close for col in PRICE_COLUMNS}, index=dates)
+    return frames
+
+
+def build_lookups(tickers, lookups_per_ticker, seed=0):
+    """Event windows around random dates: a month before to three months after."""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range('2016-01-01', '2024-06-30')
+    lookups = []
+    for ticker in tickers:
+        for day in rng.choice(days, lookups_per_ticker):
+            day = pd.Timestamp(day)
+            lookups.append((ticker, day - pd.Timedelta(days=30), day + pd.Timedelta(days=90)))
+    return lookups
+
+
+def check_failed_fetch(frames):
+    """A failed fetch must leave coverage alone so the range is fetched again."""
+    ticker = next(iter(frames))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        provider = CountingProvider(frames, failures=1)
+        cache = PriceCache(cache_dir, provider=provider)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert cache.get_prices(ticker, '2020-01-01', '2020-07-01').empty
+        assert ticker not in cache.stats(), "a failed fetch was marked as covered"
+        assert len(cache.get_prices(ticker, '2020-01-01', '2020-07-01')) > 0, "the failed range was not refetched"
+        assert cache.stats()[ticker]['start'] == '2020-01-01'
+
+        # A failed extension of existing coverage leaves the covered span as it was.
+        provider.failures = provider.calls + 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            cache.get_prices(ticker, '2019-01-01', '2020-07-01')
+        assert cache.stats()[ticker]['start'] == '2020-01-01', "a failed extension was marked as covered"
+        assert provider.calls == 3
+        assert len(cache.get_prices(ticker, '2019-01-01', '2020-07-01')) > 0
+        assert cache.stats()[ticker]['start'] == '2019-01-01'
+
+
+def check_closed_gaps(frames):
+    """Gaps without trading days are answered with no rows; they are covered and not fetched again."""
+    ticker = next(iter(frames))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        provider = CountingProvider(frames)
+        cache = PriceCache(cache_dir, provider=provider)
+        # Monday to Friday, then the weekend after it.
+        cache.ensure(ticker, '2020-01-06', '2020-01-11')
+        assert cache.ensure(ticker, '2020-01-06', '2020-01-13') == 1
+        calls = provider.calls
+        assert cache.ensure(ticker, '2020-01-06', '2020-01-13') == 0
+        assert provider.calls == calls, "a weekend-only gap was fetched again"
+        # The prices start in 2015: the year before the listing is empty, and final.
+        assert cache.get_prices(ticker, '2014-01-01', '2020-01-13').index.min() == pd.Timestamp('2015-01-01')
+        calls = provider.calls
+        assert cache.ensure(ticker, '2014-01-01', '2020-01-13') == 0
+        assert provider.calls == calls, "a range before the listing was fetched again"
+
+
+def main():
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    lookups_per_ticker = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    frames = build_prices(n_tickers)
+    lookups = build_lookups(list(frames), lookups_per_ticker)
+
+    direct_provider = CountingProvider(frames)
+    start = time.perf_counter()
+    direct = [direct_provider.fetch(ticker, lookup_start, lookup_end) for ticker, lookup_start, lookup_end in lookups]
+    direct_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cached_provider = CountingProvider(frames)
+        cache = PriceCache(cache_dir, provider=cached_provider)
+        start = time.perf_counter()
+        cached = [cache.get_prices(ticker, lookup_start, lookup_end) for ticker, lookup_start, lookup_end in lookups]
+        cached_time = time.perf_counter() - start
+
+    for expected, actual in zip(direct, cached):
+        pd.testing.assert_frame_equal(actual, expected, check_freq=False)
+    check_failed_fetch(frames)
+    check_closed_gaps(frames)
+
+    print(f"{n_tickers} tickers, {len(lookups)} lookups")
+    print(f"provider per lookup: {direct_provider.calls:6d} fetches  {direct_time:6.2f}s")
+    print(f"price cache:         {cached_provider.calls:6d} fetches  {cached_time:6.2f}s")
+    print("failed fetches are retried, closed gaps without trading days are not: ok")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/readability.py
+"""
+Compares textstat's Flesch-Kincaid grade, Flesch reading ease and Gunning Fog
+with analysis/features/readability.py on 10-Q sized documents, and checks
+the scores agree within tolerance.
+
+Usage:
+    python benchmarks/readability.py [n_docs]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import textstat
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from analysis.features.readability import readability_scores, syllable_count, is_difficult_word
+
+SAMPLE_PATH = os.path.join(project_root, 'output', 'aapl-20250628_clean.txt')
+TARGET_DOC_CHARS = 75_000
+
+# textstat rounds to 0.1 (grade) / 0.01 (ease, fog); allow one rounding step.
+TOLERANCE = {'flesch_kincaid_grade': 0.1, 'flesch_reading_ease': 0.01, 'gunning_fog': 0.01}
+
+
+def build_corpus(n_docs):
+    """Documents cut at different offsets of the sample 10-Q, so each has its own sentence mix."""
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        sample = f.read()
+    repeats = TARGET_DOC_CHARS // len(sample) + 2
+    corpus = []
+    for i in range(n_docs):
+        offset = (i * 997) % len(sample)
+        length = TARGET_DOC_CHARS - (i * 1531) % 20_000
+        corpus.append(((sample[offset:] + '\n' + sample[:offset] + '\n') * repeats)[:length])
+    return corpus
+
+
+def main():
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    corpus = build_corpus(n_docs)
+    print(f"Scoring {n_docs} documents of ~{TARGET_DOC_CHARS // 1000} KB...")
+
+    start = time.perf_counter()
+    expected = [
+        {
+            'flesch_kincaid_grade': textstat.flesch_kincaid_grade(text),
+            'flesch_reading_ease': textstat.flesch_reading_ease(text),
+            'gunning_fog': textstat.gunning_fog(text),
+        }
+        for text in corpus
+    ]
+    textstat_time = time.perf_counter() - start
+
+    syllable_count.cache_clear()
+    is_difficult_word.cache_clear()
+    start = time.perf_counter()
+    actual = [readability_scores(text) for text in corpus]
+    cached_time = time.perf_counter() - start
+
+    print(f"textstat:           {textstat_time:.3f}s")
+    print(f"readability_scores: {cached_time:.3f}s ({textstat_time / cached_time:.1f}x)")
+    print(f"Syllable cache: {syllable_count.cache_info()}")
+
+    for score, tolerance in TOLERANCE.items():
+        diff = np.abs(np.array([row[score] for row in actual]) - np.array([row[score] for row in expected]))
+        print(f"{score}: max abs difference {diff.max():.4f}")
+        assert diff.max() <= tolerance + 1e-9, f"{score} differs from textstat by more than {tolerance}"
+    print("Scores match textstat.")
+
+
+if __name__ == '__main__':
+    main()
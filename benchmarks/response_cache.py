@@ -0,0 +1,107 @@
+# benchmarks/response_cache.py
+"""
+Runs the same scrape three times against a local stand-in for the SEC (with
+simulated latency): cold (empty cache), warm (entries fresh, served from
+disk) and expired (every entry past its TTL, revalidated with conditional
+GETs answered by 304). Checks that every run returns identical bodies and
+reports requests sent, time and the cache statistics of each run.
+
+Usage:
+    python benchmarks/response_cache.py [n_filings] [latency_ms]
+"""
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from aiohttp import web
+
+import scraper.response_cache as response_cache
+from benchmarks.sec_client import StandInServer
+from scraper.response_cache import ResponseCache
+from scraper.sec_client import SEC_HOST_OVERRIDE_ENV, SECClient
+
+USER_AGENT = "LinguisticAlphaBenchmark bench@example.com"
+
+
+class ConditionalServer(StandInServer):
+    """Serves tickers, submissions, index pages and documents with ETags, answering 304 when they match."""
+
+    def _body(self, path):
+        if path.endswith('company_tickers.json'):
+            return '{"0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."}}' + ' ' * 500_000
+        if '/submissions/' in path:
+            return '{"filings": {"recent": {}}}' + ' ' * 50_000
+        return f"<html>{path}</html>" + 'x' * 200_000
+
+    async def _handle(self, request):
+        self.arrivals.append(time.monotonic())
+        await asyncio.sleep(self.latency)
+        body = self._body(request.path)
+        etag = '"' + hashlib.md5(body.encode()).hexdigest() + '"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(text=body, headers={'ETag': etag})
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        self.base_url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+
+
+def scrape_urls(n_filings):
+    urls = ["https://www.sec.gov/files/company_tickers.json",
+            "https://data.sec.gov/submissions/CIK0000320193.json"]
+    for i in range(n_filings):
+        accession = f"{320193:010d}{25:02d}{i:06d}"
+        base = f"https://www.sec.gov/Archives/edgar/data/320193/{accession}"
+        urls += [f"{base}/{accession}-index.html", f"{base}/aapl-2025q{i}.htm"]
+    return urls
+
+
+async def scrape(urls, cache):
+    async with SECClient(USER_AGENT, rate=10, cache=cache) as client:
+        responses = await client.get_many(urls, return_exceptions=False)
+        return [r.content for r in responses], client.requests
+
+
+def run(label, urls, cache_dir):
+    cache = ResponseCache(cache_dir)
+    start = time.perf_counter()
+    bodies, sent = asyncio.run(scrape(urls, cache))
+    elapsed = time.perf_counter() - start
+    print(f"{label:8s} {elapsed:6.2f}s  {sent:3d} requests sent")
+    return bodies, cache
+
+
+def main():
+    n_filings = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 150) / 1000
+    urls = scrape_urls(n_filings)
+
+    with ConditionalServer(latency) as server, tempfile.TemporaryDirectory() as cache_dir:
+        os.environ[SEC_HOST_OVERRIDE_ENV] = server.base_url
+        cold, cache = run('cold', urls, cache_dir)
+        assert cache.misses == len(urls)
+
+        warm, cache = run('warm', urls, cache_dir)
+        assert warm == cold and cache.hits == len(urls)
+
+        # Expire everything, including the immutable filing documents.
+        response_cache.RESOURCE_TTLS = [(name, pattern, 0) for name, pattern, _ in response_cache.RESOURCE_TTLS]
+        expired, cache = run('expired', urls, cache_dir)
+        assert expired == cold and cache.revalidated == len(urls)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/sec_client.py
+"""
+Fetches filings from a local stand-in for www.sec.gov (with simulated network
+latency and a few transient 503s) two ways: the scrapers' old serial loop
+(blocking requests plus a fixed sleep per request) and SECClient. Checks that
+both return the same bodies, that SECClient never exceeds its rate in any
+one-second window, and that the 503s were retried.
+
+Usage:
+    python benchmarks/sec_client.py [n_requests] [latency_ms]
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import requests
+from aiohttp import web
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from scraper.sec_client import SEC_HOST_OVERRIDE_ENV, SEC_MAX_REQUESTS_PER_SEC, SECClient
+
+USER_AGENT = "LinguisticAlphaBenchmark bench@example.com"
+OLD_SLEEP = 0.5
+FLAKY_EVERY = 7
+
+
+class StandInServer:
+    """aiohttp server on its own thread that logs arrival times and fails every FLAKY_EVERY-th path once."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.arrivals = []
+        self._failed = set()
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+        self.base_url = None
+
+    async def _handle(self, request):
+        self.arrivals.append(time.monotonic())
+        await asyncio.sleep(self.latency)
+        number = int(request.match_info['number'])
+        if number % FLAKY_EVERY == 0 and number not in self._failed:
+            self._failed.add(number)
+            return web.Response(status=503, headers={'Retry-After': '0'})
+        return web.Response(text=f"<FILENAME>doc-{number}.htm\n" + "x" * 2000)
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get('/Archives/edgar/data/{number}.txt', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    def __enter__(self):
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def max_per_second(arrivals):
+    arrivals = sorted(arrivals)
+    most, left = 0, 0
+    for right, t in enumerate(arrivals):
+        while t - arrivals[left] >= 1.0:
+            left += 1
+        most = max(most, right - left + 1)
+    return most
+
+
+def serial_fetch(server, urls):
+    bodies = []
+    with requests.Session() as session:
+        for url in urls:
+            time.sleep(OLD_SLEEP)
+            local = server.base_url + url.split('sec.gov', 1)[1]
+            r = session.get(local, headers={"User-Agent": USER_AGENT}, timeout=30)
+            if r.status_code == 503:
+                time.sleep(OLD_SLEEP)
+                r = session.get(local, headers={"User-Agent": USER_AGENT}, timeout=30)
+            bodies.append(r.text)
+    return bodies
+
+
+async def client_fetch(urls, rate):
+    async with SECClient(USER_AGENT, rate=rate, backoff=0.05, cache=False) as client:
+        responses = await client.get_many(urls, return_exceptions=False)
+        return [r.text for r in responses], client.requests, client.retries
+
+
+def main():
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 150) / 1000
+    urls = [f"https://www.sec.gov/Archives/edgar/data/{i}.txt" for i in range(n_requests)]
+
+    with StandInServer(latency) as server:
+        start = time.perf_counter()
+        expected = serial_fetch(server, urls)
+        serial_time = time.perf_counter() - start
+
+        server.arrivals.clear()
+        server._failed.clear()
+        os.environ[SEC_HOST_OVERRIDE_ENV] = server.base_url
+        start = time.perf_counter()
+        bodies, sent, retries = asyncio.run(client_fetch(urls, rate=SEC_MAX_REQUESTS_PER_SEC - 2))
+        client_time = time.perf_counter() - start
+        peak = max_per_second(server.arrivals)
+
+    assert bodies == expected, "SECClient returned different bodies"
+    assert peak <= SEC_MAX_REQUESTS_PER_SEC - 2, f"rate exceeded: {peak} requests in one second"
+    assert retries == len(range(0, n_requests, FLAKY_EVERY)), "503s were not retried"
+
+    print(f"{n_requests} requests, {latency * 1000:.0f} ms latency")
+    print(f"serial + {OLD_SLEEP}s sleep: {serial_time:.2f}s ({n_requests / serial_time:.1f} req/s)")
+    print(f"SECClient:               {client_time:.2f}s ({n_requests / client_time:.1f} req/s), "
+          f"{sent} sent, {retries} retried, peak {peak} req in any 1s window")
+    print(f"speedup: {serial_time / client_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
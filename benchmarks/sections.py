@@ -0,0 +1,84 @@
+# benchmarks/sections.py
+"""
+Times the MD&A and risk keyword families over a corpus of 10-Q texts built
+from the sample filing, reading the whole document (as before the section
+index) and only their sections (Item 2 and Item 1A, found once per filing by
+analysis.features.sections). Checks that the section results equal the
+whole-document families run on the sliced section texts.
+
+Usage:
+    python benchmarks/sections.py [n_docs]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from analysis.helpers import configure_nltk_path
+configure_nltk_path()
+from analysis.features.engine import FEATURE_FAMILIES, add_feature_family, extract_features, get_feature_families
+from analysis.features.sections import find_sections
+
+SAMPLE_PATH = os.path.join(project_root, 'output', 'aapl-20250628_clean.txt')
+SECTION_FAMILIES = ['mda', 'risk_keywords']
+
+
+def build_corpus(n_docs):
+    """10-Q texts from the sample filing, each with its own quarter figures so no two are identical."""
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        sample = f.read()
+    return [{'ticker': 'AAPL', 'date': str(i), 'text': sample.replace('2025', str(2025 + i))} for i in range(n_docs)]
+
+
+def whole_document_families():
+    """Copies of the section families that read the whole document; returns their names."""
+    names = []
+    for family in get_feature_families(SECTION_FAMILIES):
+        name = f"{family.name}_whole"
+        add_feature_family(name, family.columns, family.func, family.needs, family.id_columns, family.lexicons,
+                           family.setup, family.flush, section=None, stats=family.stats,
+                           merge_stats=family.merge_stats, modules=family.modules)
+        names.append(name)
+    return names
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    corpus = build_corpus(n_docs)
+    whole_names = whole_document_families()
+
+    whole, whole_time = timed(lambda: extract_features(corpus, families=whole_names))
+    sections, section_time = timed(lambda: extract_features(corpus, families=SECTION_FAMILIES))
+
+    expected = []
+    for family_name in SECTION_FAMILIES:
+        family = FEATURE_FAMILIES[family_name]
+        sliced = []
+        for entry in corpus:
+            start, end = find_sections(entry['text']).span(family.section)
+            sliced.append({**entry, 'text': entry['text'][start:end]})
+        expected.append(extract_features(sliced, families=[f"{family_name}_whole"]).set_index(['ticker', 'date']))
+    expected = pd.concat(expected, axis=1).reset_index()
+    pd.testing.assert_frame_equal(sections, expected[sections.columns])
+
+    chars = sum(len(entry['text']) for entry in corpus)
+    print(f"{n_docs} filings, {chars / 1e6:.1f} M characters")
+    print(f"whole documents: {whole_time:6.2f}s")
+    print(f"sections:        {section_time:6.2f}s  ({whole_time / section_time:.1f}x faster)")
+    print("mean absolute change from reading sections instead of whole documents:")
+    print((sections[whole.columns[2:]] - whole[whole.columns[2:]]).abs().mean().to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/sentences.py
+"""
+Compares sentence segmentation throughput on 10-Q sized documents: Punkt
+returning lists of strings (sent_tokenize), Punkt offsets (punkt_spans) and
+the rule-based regex segmenter (regex_spans), plus how often the regex
+boundaries agree with Punkt's and the memory held per document.
+
+Usage:
+    python benchmarks/sentences.py [n_docs]
+"""
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from analysis.helpers import configure_nltk_path
+configure_nltk_path()
+import analysis.features.sentences as sentences
+from analysis.features.sentences import punkt_spans, regex_spans
+
+SAMPLE_PATH = os.path.join(project_root, 'output', 'aapl-20250628_clean.txt')
+TARGET_DOC_CHARS = 75_000
+
+
+def build_corpus(n_docs):
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        sample = f.read()
+    repeats = TARGET_DOC_CHARS // len(sample) + 1
+    return [((sample[(i * 997) % len(sample):] + ' ' + sample) * repeats)[:TARGET_DOC_CHARS] for i in range(n_docs)]
+
+
+def load_punkt():
+    try:
+        return sentences._get_punkt_tokenizer()
+    except LookupError:
+        from nltk.tokenize.punkt import PunktSentenceTokenizer
+        print("Punkt English model not found; using untrained Punkt parameters.")
+        sentences._punkt_tokenizer = PunktSentenceTokenizer()
+        return sentences._punkt_tokenizer
+
+
+def time_it(func, corpus):
+    start = time.perf_counter()
+    results = [func(text) for text in corpus]
+    return time.perf_counter() - start, results
+
+
+def main():
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    corpus = build_corpus(n_docs)
+    megabytes = sum(len(text) for text in corpus) / 1e6
+    tokenizer = load_punkt()
+
+    string_time, string_results = time_it(tokenizer.tokenize, corpus)
+    punkt_time, punkt_results = time_it(punkt_spans, corpus)
+    regex_time, regex_results = time_it(regex_spans, corpus)
+
+    assert all(list(spans) == strings for spans, strings in zip(punkt_results, string_results))
+    for name, elapsed in [('sent_tokenize (strings)', string_time), ('punkt_spans', punkt_time),
+                          ('regex_spans', regex_time)]:
+        print(f"{name:24s} {elapsed:.3f}s  {megabytes / elapsed:6.1f} MB/s")
+
+    string_bytes = sum(sys.getsizeof(s) for s in string_results[0]) + sys.getsizeof(string_results[0])
+    span_bytes = punkt_results[0].starts.nbytes + punkt_results[0].ends.nbytes
+    print(f"Memory per document: {string_bytes / 1024:.1f} KB of strings vs {span_bytes / 1024:.1f} KB of offsets")
+
+    punkt_ends = sum(len(spans) for spans in punkt_results)
+    agreed = sum(len(set(p.ends.tolist()) & set(r.ends.tolist())) for p, r in zip(punkt_results, regex_results))
+    regex_ends = sum(len(spans) for spans in regex_results)
+    print(f"Regex boundaries: precision {agreed / regex_ends:.3f}, recall {agreed / punkt_ends:.3f} against Punkt")
+
+
+if __name__ == '__main__':
+    main()
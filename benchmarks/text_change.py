@@ -0,0 +1,98 @@
+# benchmarks/text_change.py
+"""
+Compares SequenceMatcher.ratio() with the paragraph/sentence hashing change
+engine on 10-Q sized documents: timing at increasing sizes, and how closely
+the hashed similarity tracks the old ratio across edit rates.
+
+Usage:
+    python benchmarks/text_change.py [max_kb]
+"""
+import os
+import random
+import re
+import sys
+import time
+from difflib import SequenceMatcher
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from analysis.features.text_change import text_change
+
+SAMPLE_PATH = os.path.join(project_root, 'output', 'aapl-20250628_clean.txt')
+
+
+def build_document(size_kb, seed=0):
+    """Builds a risk-section-like document of about `size_kb` KB from shuffled 10-Q sentences."""
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        sentences = [s for s in re.split(r'(?<=[.!?])\s+', f.read()) if len(s) > 40]
+    rng = random.Random(seed)
+    paragraphs, size = [], 0
+    while size < size_kb * 1024:
+        picks = [rng.choice(sentences) for _ in range(rng.randint(3, 8))]
+        # A reference number keeps repeated sample sentences distinct.
+        paragraph = ' '.join(f"{s[:-1]} (ref {rng.randrange(10**6)}){s[-1]}" for s in picks)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return paragraphs
+
+
+def edit_document(paragraphs, rate, seed=1):
+    """Next quarter's version: drops, rewrites and inserts roughly `rate` of the sentences."""
+    rng = random.Random(seed)
+    edited = []
+    for paragraph in paragraphs:
+        sentences = re.split(r'(?<=[.!?])\s+', paragraph)
+        kept = []
+        for sentence in sentences:
+            roll = rng.random()
+            if roll < rate / 3:
+                continue
+            if roll < 2 * rate / 3:
+                sentence = sentence.replace('the', 'our', 1) + f' Updated {rng.randrange(10**6)}.'
+            kept.append(sentence)
+            if rng.random() < rate / 3:
+                kept.append(f'New risk disclosure {rng.randrange(10**6)} could materially affect results.')
+        if kept:
+            edited.append(' '.join(kept))
+    return edited
+
+
+def main():
+    max_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    print("Timing (10% edits):")
+    for size_kb in [10, 25, 50, 100, max_kb]:
+        previous = build_document(size_kb)
+        a, b = '\n\n'.join(edit_document(previous, 0.1)), '\n\n'.join(previous)
+
+        start = time.perf_counter()
+        text_change(a, b)
+        hash_time = time.perf_counter() - start
+
+        if size_kb <= 100:
+            start = time.perf_counter()
+            SequenceMatcher(None, a, b).ratio()
+            sequence_time = f"{time.perf_counter() - start:.3f}s"
+        else:
+            sequence_time = 'skipped'
+        print(f"  {size_kb:4d} KB  SequenceMatcher {sequence_time:>9s}  hashing {hash_time:.4f}s")
+
+    print("Tracking the old ratio (25 KB documents):")
+    previous = build_document(25, seed=2)
+    b = '\n\n'.join(previous)
+    old, new = [], []
+    for rate in [0.0, 0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9]:
+        a = '\n\n'.join(edit_document(previous, rate, seed=3))
+        old.append(SequenceMatcher(None, a, b).ratio())
+        new.append(text_change(a, b)['similarity'])
+        print(f"  edit rate {rate:.2f}: SequenceMatcher {old[-1]:.3f}  hashing {new[-1]:.3f}")
+    correlation = np.corrcoef(old, new)[0, 1]
+    print(f"Correlation: {correlation:.3f}")
+    assert correlation > 0.9, "hashed similarity no longer tracks SequenceMatcher.ratio()"
+
+
+if __name__ == '__main__':
+    main()
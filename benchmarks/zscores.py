@@ -0,0 +1,91 @@
+# benchmarks/zscores.py
+"""
+Compares the per-column groupby().transform(lambda) z-scores against the
+single grouped pass in analysis/zscores.py, and times incremental
+point-in-time scoring of one new quarter (update_expanding_zscores with the
+ZScoreState saved by the previous run) against recomputing the expanding
+z-scores over the full history.
+
+Usage:
+    python benchmarks/zscores.py [n_rows] [n_features]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from analysis.data_loader import TARGET_TICKERS
+from analysis.zscores import zscore_columns, expanding_zscores, update_expanding_zscores
+
+
+def build_features(n_rows, n_features, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'ticker': rng.choice(TARGET_TICKERS, n_rows),
+        'date': pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 5400, n_rows), unit='D'),
+    })
+    columns = [f'feature_{i}' for i in range(n_features)]
+    for col in columns:
+        df[col] = rng.normal(size=n_rows)
+    return df, columns
+
+
+def lambda_zscores(df, columns):
+    return pd.DataFrame({
+        f'{col}_zscore': df.groupby('ticker')[col].transform(
+            lambda x: (x - x.mean()) / x.std() if x.std() > 0 else 0
+        )
+        for col in columns
+    })
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    n_features = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    df, columns = build_features(n_rows, n_features)
+    print(f"Normalizing {n_rows} rows x {n_features} features over {df['ticker'].nunique()} tickers...")
+
+    start = time.perf_counter()
+    expected = lambda_zscores(df, columns)
+    lambda_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = zscore_columns(df, columns)
+    vectorized_time = time.perf_counter() - start
+
+    print(f"transform(lambda) per column: {lambda_time:.3f}s")
+    print(f"zscore_columns:               {vectorized_time:.3f}s ({lambda_time / vectorized_time:.1f}x)")
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(dtype=float), rtol=1e-9, atol=1e-12)
+
+    # Point-in-time: score one new quarter per ticker given the history.
+    new_quarter = df.groupby('ticker').tail(1).copy()
+    new_quarter['date'] = df['date'].max() + pd.Timedelta(days=90)
+    history = df
+
+    updated = pd.concat([history, new_quarter], ignore_index=True)
+    start = time.perf_counter()
+    recomputed = expanding_zscores(updated, columns).iloc[len(history):]
+    recompute_time = time.perf_counter() - start
+
+    # What the previous run left behind: its scored table and state.
+    history_scores, state = update_expanding_zscores(history, columns)
+    scored = pd.concat([history, history_scores], axis=1)
+    start = time.perf_counter()
+    incremental, _ = update_expanding_zscores(updated, columns, state, scored)
+    incremental = incremental.iloc[len(history):]
+    incremental_time = time.perf_counter() - start
+
+    print(f"expanding recompute for a new quarter: {recompute_time * 1000:.2f}ms")
+    print(f"incremental update for a new quarter:   {incremental_time * 1000:.2f}ms")
+    np.testing.assert_allclose(incremental.to_numpy(), recomputed.to_numpy(), rtol=1e-7, atol=1e-9)
+    print("Z-scores match.")
+
+
+if __name__ == '__main__':
+    main()
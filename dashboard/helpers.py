@@ -2,7 +2,6 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
-import yfinance as yf
 from prophet import Prophet
 from prophet.plot import plot_plotly
 
@@ -34,12 +33,12 @@ def load_data(root_path):
 # --- Prediction Model ---
 def predict_stock_price(ticker):
     """Fetches historical stock data and returns a 6-month forecast plot."""
-    # Fetch data
-    data = yf.download(ticker, start="2020-01-01", end=pd.to_datetime('today').strftime('%Y-%m-%d'))
-    
-    # yfinance can return a multi-level column index. We flatten it here.
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.droplevel(1)
+    setup_path()
+    from utils.price_cache import get_price_cache
+
+    # Fetch data (adjusted closes) through the shared price cache
+    data = get_price_cache().get_prices(ticker, "2020-01-01", pd.to_datetime('today').strftime('%Y-%m-%d'))
+    data = data[['Adj Close']].rename(columns={'Adj Close': 'Close'}).dropna()
 
     data.reset_index(inplace=True)
     
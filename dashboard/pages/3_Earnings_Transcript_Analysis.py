@@ -2,8 +2,15 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os
+import sys
 import statsmodels.api as sm
 
+# --- Robust Path Setup ---
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from analysis.feature_store import read_feature_table, feature_store_exists
+
 st.set_page_config(layout="wide", page_title="Feature Analysis")
 
 st.title("🗣️ Feature Analysis & Correlations")
@@ -15,9 +22,8 @@ Use the filters in the sidebar to select a company and choose between raw featur
 @st.cache_data
 def load_data():
     """Loads the processed transcript features and performance data."""
-    file_path = 'output/transcript_features_with_performance.csv'
-    if os.path.exists(file_path):
-        return pd.read_csv(file_path)
+    if feature_store_exists():
+        return read_feature_table()
     else:
         st.error("Data file not found. Please run the feature engineering pipeline first.")
         return None
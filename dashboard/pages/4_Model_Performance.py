@@ -6,6 +6,13 @@ from sklearn.metrics import classification_report, confusion_matrix, accuracy_sc
 import plotly.figure_factory as ff
 import plotly.graph_objects as go
 import numpy as np
+import sys
+
+# --- Robust Path Setup ---
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+from analysis.feature_store import read_feature_table, list_feature_columns, feature_store_exists
 
 st.set_page_config(layout="wide", page_title="Model Performance")
 
@@ -15,21 +22,18 @@ st.markdown("This page presents the results from backtesting the models on hold-
 @st.cache_data
 def load_data_and_predictions():
     # Load the main data file
-    data_path = 'output/transcript_features_with_performance.csv'
-    if not os.path.exists(data_path):
+    if not feature_store_exists():
         st.error("Data file not found. Please run the main pipeline first.")
         return None
     
-    df = pd.read_csv(data_path)
-    df['date'] = pd.to_datetime(df['date'])
-    
-    # Get the 2024 test data
-    test_df = df[df['date'].dt.year == 2024].copy()
+    # Get the 2024 test data: identifiers, labels and z-score features only
+    feature_cols = list_feature_columns(suffix='_zscore')
+    test_df = read_feature_table(columns=['ticker', 'date', 'return_class', 'volatility_class'] + feature_cols,
+                                 year=2024)
     if test_df.empty:
         st.warning("No 2024 data available for backtesting.")
         return None
         
-    feature_cols = [col for col in df.columns if col.endswith('_zscore')]
     X_test = test_df[feature_cols].fillna(0)
 
     # Load models and make predictions
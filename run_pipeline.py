@@ -1,4 +1,5 @@
 import pandas as pd
+import argparse
 import os
 import sys
 
@@ -16,15 +17,55 @@ configure_nltk_path() # Configure NLTK path before it's used
 from analysis.transcript_feature_engineering import run_transcript_feature_engineering
 from analysis.model_training import train_all_models
 from analysis.backtest import run_backtest
+from analysis.features.engine import DEFAULT_CHUNKSIZE
+from analysis.features.sentences import configure_sentence_segmenter, DEFAULT_SEGMENTER, SEGMENTERS
+from utils.price_cache import configure_price_cache, DEFAULT_PRICE_CACHE_DIR
 
-def main():
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the earnings transcript analysis pipeline.")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Worker processes for feature extraction (0 = one per CPU core).")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Transcripts handed to each worker at a time.")
+    parser.add_argument('--sentiment-cache', default=os.path.join('cache', 'sentence_sentiment.sqlite'),
+                        help="SQLite file that persists sentence sentiment scores between runs ('' to disable).")
+    parser.add_argument('--feature-cache', default=os.path.join('cache', 'features.sqlite'),
+                        help="SQLite file of cached per-transcript features ('' to recompute everything).")
+    parser.add_argument('--transcript-store', default=None,
+                        help="Read transcripts from this local snapshot instead of Hugging Face "
+                             "(create it with 'python -m analysis.transcript_store snapshot').")
+    parser.add_argument('--price-cache', default=DEFAULT_PRICE_CACHE_DIR,
+                        help="Directory of cached daily prices; only missing date ranges are downloaded.")
+    parser.add_argument('--offline-prices', action='store_true',
+                        help="Serve prices only from the local price cache, without network access.")
+    parser.add_argument('--zscore-mode', choices=['full', 'expanding'], default='full',
+                        help="Normalize features against each ticker's full history or only earlier transcripts.")
+    parser.add_argument('--zscore-state', default=os.path.join('cache', 'zscore_state'),
+                        help="Directory of expanding z-score state, so --zscore-mode expanding only scores "
+                             "transcripts the last run did not ('' to recompute every run).")
+    parser.add_argument('--boilerplate-index', default=None,
+                        help="MinHash passage index used to drop recycled boilerplate before feature extraction "
+                             "(build it with 'python -m analysis.features.boilerplate build').")
+    parser.add_argument('--sentence-segmenter', choices=SEGMENTERS, default=DEFAULT_SEGMENTER,
+                        help="Sentence splitter shared by sentiment and readability ('regex' is faster than Punkt).")
+    return parser.parse_args()
+
+def main(args):
     """
     Orchestrates the end-to-end earnings transcript analysis pipeline.
     This pipeline fetches real-world data, engineers features, trains
     predictive models, and evaluates their performance.
     """
     print("--- Starting Earnings Transcript Analysis Pipeline ---")
-    run_transcript_feature_engineering()
+    configure_price_cache(args.price_cache, offline=args.offline_prices or None)
+    configure_sentence_segmenter(args.sentence_segmenter)
+    run_transcript_feature_engineering(n_jobs=args.jobs, chunksize=args.chunksize,
+                                       sentiment_cache_path=args.sentiment_cache or None,
+                                       feature_cache_path=args.feature_cache or None,
+                                       transcript_store_dir=args.transcript_store,
+                                       zscore_mode=args.zscore_mode,
+                                       boilerplate_index_path=args.boilerplate_index,
+                                       zscore_state_dir=args.zscore_state or None)
     print("--- Feature Engineering Complete ---")
 
     print("\n--- Training Predictive Models ---")
@@ -39,4 +80,4 @@ def main():
     print("You can now view the results in the Streamlit dashboard.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(parse_args())
\ No newline at end of file
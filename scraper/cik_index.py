@@ -0,0 +1,176 @@
+# scraper/cik_index.py
+"""
+Local ticker <-> CIK <-> company name index built from SEC's company_tickers.json.
+
+The SEC map is a JSON object of ~10k rows ordered by market value. It is
+downloaded once, normalized into hash maps in both directions and saved to
+cache/cik_index.json together with a format version and its build time, so
+each scraper run loads it from disk and every lookup is a dictionary access.
+An index older than `max_age` (one day by default) is rebuilt from the SEC
+on the next load; if that refresh fails the stale copy is used.
+
+Tickers are matched case-insensitively and with '.' and '-' treated alike
+(SEC lists Berkshire's class B shares as BRK-B). CIKs are returned as the
+10-digit zero-padded strings the submissions API expects.
+
+Usage:
+    python -m scraper.cik_index build [--index PATH]
+    python -m scraper.cik_index lookup AAPL 320193 ... [--index PATH]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+COMPANY_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+DEFAULT_CIK_INDEX_PATH = os.path.join('cache', 'cik_index.json')
+INDEX_FORMAT_VERSION = 1
+DEFAULT_MAX_AGE = 24 * 3600
+
+
+def normalize_ticker(ticker):
+    return ticker.strip().upper().replace('.', '-')
+
+
+def normalize_cik(cik):
+    """Accepts an int or a (padded or unpadded) string; returns the 10-digit padded CIK."""
+    return str(int(cik)).zfill(10)
+
+
+class CIKIndex:
+    """
+    Two-way ticker/CIK index. `entries` are (ticker, cik, name) rows in SEC's
+    order, so the first rows are the largest companies.
+    """
+
+    def __init__(self, entries, built_at=None):
+        self.entries = [(normalize_ticker(ticker), normalize_cik(cik), name) for ticker, cik, name in entries]
+        self.built_at = time.time() if built_at is None else built_at
+        self._by_ticker = {}
+        self._by_cik = {}
+        for ticker, cik, name in self.entries:
+            self._by_ticker.setdefault(ticker, (cik, name))
+            self._by_cik.setdefault(cik, []).append(ticker)
+
+    @classmethod
+    def from_company_tickers(cls, data):
+        """Builds the index from the parsed company_tickers.json object."""
+        rows = sorted(data.items(), key=lambda item: int(item[0]))
+        return cls([(row['ticker'], row['cik_str'], row.get('title', '')) for _, row in rows])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, ticker):
+        return normalize_ticker(ticker) in self._by_ticker
+
+    def cik(self, ticker):
+        """Padded CIK for `ticker`, or None."""
+        match = self._by_ticker.get(normalize_ticker(ticker))
+        return match[0] if match else None
+
+    def name(self, ticker):
+        match = self._by_ticker.get(normalize_ticker(ticker))
+        return match[1] if match else None
+
+    def tickers(self, cik):
+        """All tickers listed under `cik` (primary first)."""
+        return list(self._by_cik.get(normalize_cik(cik), ()))
+
+    def ticker(self, cik):
+        """Primary ticker for `cik`, or None."""
+        tickers = self._by_cik.get(normalize_cik(cik))
+        return tickers[0] if tickers else None
+
+    def resolve(self, tickers):
+        """Resolves many tickers at once; returns {ticker as given: padded CIK or None}."""
+        by_ticker = self._by_ticker
+        resolved = {}
+        for ticker in tickers:
+            match = by_ticker.get(normalize_ticker(ticker))
+            resolved[ticker] = match[0] if match else None
+        return resolved
+
+    def top(self, n):
+        """The first `n` (padded CIK, ticker) rows in SEC's order."""
+        return [(cik, ticker) for ticker, cik, _ in self.entries[:n]]
+
+    def is_stale(self, max_age=DEFAULT_MAX_AGE):
+        return time.time() - self.built_at >= max_age
+
+    def save(self, path=DEFAULT_CIK_INDEX_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        payload = {'version': INDEX_FORMAT_VERSION, 'built_at': self.built_at,
+                   'entries': [list(entry) for entry in self.entries]}
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_CIK_INDEX_PATH):
+        """Loads a saved index; returns None if it is missing, unreadable or of another format version."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if payload.get('version') != INDEX_FORMAT_VERSION:
+            return None
+        return cls(payload['entries'], built_at=payload['built_at'])
+
+
+_LOADED = {}
+
+
+async def load_cik_index(client, path=DEFAULT_CIK_INDEX_PATH, max_age=DEFAULT_MAX_AGE, refresh=False):
+    """
+    Returns the CIK index at `path`, rebuilding it from the SEC with `client`
+    when it is missing, stale or `refresh` is set. Loaded indexes are shared
+    within the process, so concurrent lookups read the file once.
+    """
+    index = None if refresh else _LOADED.get(path) or CIKIndex.load(path)
+    if index is None or index.is_stale(max_age):
+        try:
+            index = CIKIndex.from_company_tickers(await client.get_json(COMPANY_TICKERS_URL))
+            index.save(path)
+        except (RuntimeError, ValueError) as e:
+            if index is None:
+                raise
+            print(f"Could not refresh the CIK index ({e}); using the copy built "
+                  f"{(time.time() - index.built_at) / 3600:.0f}h ago.")
+    _LOADED[path] = index
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the local ticker/CIK index.")
+    parser.add_argument('command', choices=['build', 'lookup'])
+    parser.add_argument('keys', nargs='*', help="Tickers or CIKs to look up.")
+    parser.add_argument('--index', default=DEFAULT_CIK_INDEX_PATH)
+    args = parser.parse_args()
+
+    from scraper.sec_client import SECClient
+
+    async def run():
+        async with SECClient("LinguisticAlphaCIKIndex your.email@example.com") as client:
+            return await load_cik_index(client, args.index, refresh=args.command == 'build')
+
+    index = asyncio.run(run())
+    print(f"{args.index}: {len(index)} tickers, built {time.strftime('%Y-%m-%d %H:%M', time.localtime(index.built_at))}")
+    for key in args.keys:
+        if key.isdigit():
+            print(f"{key}: {', '.join(index.tickers(key)) or 'not found'}")
+        else:
+            print(f"{key}: {index.cik(key) or 'not found'} {index.name(key) or ''}")
+
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    main()
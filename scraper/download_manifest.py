@@ -0,0 +1,245 @@
+# scraper/download_manifest.py
+"""
+Resumable download manifest for filing documents.
+
+Every document written by the scrapers is recorded in a SQLite file with its
+URL, local path, size, SHA-256 checksum and status, and every filing whose
+documents were all saved is marked complete. Files are written to a temporary
+name and renamed into place, so an interrupted run never leaves a truncated
+document behind.
+
+On a rerun, complete filings are skipped without fetching their index page,
+and within a partly downloaded filing only the missing documents are fetched.
+A document only counts as complete if its file still exists with the recorded
+size; `verify` re-hashes the files to catch anything modified on disk.
+Filings and documents are keyed by URL, not by where they were saved: one
+saved under another folder (by an older folder layout, or for another ticker
+of the same company) is linked to the path now asked for instead of being
+downloaded again.
+
+Usage:
+    python -m scraper.download_manifest stats [--manifest PATH]
+    python -m scraper.download_manifest verify [--manifest PATH]
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+DEFAULT_MANIFEST_PATH = os.path.join('downloads', '_manifest.sqlite')
+
+COMPLETE = 'complete'
+FAILED = 'failed'
+CORRUPT = 'corrupt'
+
+
+def write_atomic(path, content):
+    """Writes `content` to `path` through a temporary file and rename; returns (size, sha256 hex)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.part'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(content), hashlib.sha256(content).hexdigest()
+
+
+def link_atomic(source, path):
+    """Puts a hard link to `source` (a copy if the filesystem cannot link) at `path`, replacing any file there."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.part'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DownloadManifest:
+    """SQLite record of downloaded documents and completed filings."""
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (url TEXT PRIMARY KEY, filing_url TEXT, path TEXT, "
+            "size INTEGER, sha256 TEXT, status TEXT, error TEXT, updated_at REAL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_filing ON documents (filing_url)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS filings (url TEXT PRIMARY KEY, out_dir TEXT, documents INTEGER, "
+            "status TEXT, updated_at REAL)")
+        self._conn.commit()
+        self.skipped = 0
+        self.downloaded = 0
+        self.failed = 0
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def document(self, url):
+        """Returns the manifest row of `url` as a dict, or None."""
+        columns = ['url', 'filing_url', 'path', 'size', 'sha256', 'status', 'error', 'updated_at']
+        row = self._conn.execute(f"SELECT {', '.join(columns)} FROM documents WHERE url = ?", (url,)).fetchone()
+        return None if row is None else dict(zip(columns, row))
+
+    def is_complete(self, url, path=None):
+        """True if `url` was saved (to `path`, if given) and the file is still there with the recorded size."""
+        row = self.document(url)
+        if row is None or row['status'] != COMPLETE or (path is not None and row['path'] != path):
+            return False
+        try:
+            return os.path.getsize(row['path']) == row['size']
+        except OSError:
+            return False
+
+    def relocate(self, url, path):
+        """
+        Makes the complete document saved for `url` available at `path` (a hard
+        link, or a copy where links are not supported) and records it there; the
+        old file is left in place. Returns False if `url` has no intact file.
+        """
+        if not self.is_complete(url):
+            return False
+        row = self.document(url)
+        if row['path'] != path:
+            # Under the old per-position folders a later filing could overwrite the file.
+            if file_sha256(row['path']) != row['sha256']:
+                return False
+            link_atomic(row['path'], path)
+            with self._conn:
+                self._conn.execute("UPDATE documents SET path = ?, updated_at = ? WHERE url = ?",
+                                   (path, time.time(), url))
+        return True
+
+    def save(self, url, path, content, filing_url=None):
+        """Writes a downloaded document atomically and records it as complete."""
+        size, sha256 = write_atomic(path, content)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, NULL, ?)",
+                               (url, filing_url, path, size, sha256, COMPLETE, time.time()))
+        self.downloaded += 1
+
+    def record_failure(self, url, path, error, filing_url=None):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, NULL, NULL, ?, ?, ?)",
+                               (url, filing_url, path, FAILED, str(error), time.time()))
+        self.failed += 1
+
+    def record_skip(self):
+        self.skipped += 1
+
+    def filing_documents(self, filing_url, out_dir):
+        """
+        Saved paths of a completed filing whose documents are all still intact,
+        else None (the filing has to be revisited). A filing completed into
+        another folder is linked into `out_dir` first.
+        """
+        row = self._conn.execute("SELECT documents, out_dir FROM filings WHERE url = ? AND status = ?",
+                                 (filing_url, COMPLETE)).fetchone()
+        if row is None:
+            return None
+        rows = self._conn.execute("SELECT url, path FROM documents WHERE filing_url = ? AND status = ? ORDER BY path",
+                                  (filing_url, COMPLETE)).fetchall()
+        if len(rows) != row[0] or not all(self.is_complete(url, path) for url, path in rows):
+            return None
+        if row[1] == out_dir:
+            return [path for _, path in rows]
+        paths = []
+        for url, path in rows:
+            paths.append(os.path.join(out_dir, os.path.basename(path)))
+            if not self.relocate(url, paths[-1]):
+                return None
+        with self._conn:
+            self._conn.execute("UPDATE filings SET out_dir = ?, updated_at = ? WHERE url = ?",
+                               (out_dir, time.time(), filing_url))
+        return sorted(paths)
+
+    def complete_documents(self):
+        """(url, path) of every document recorded as complete."""
+        return self._conn.execute("SELECT url, path FROM documents WHERE status = ? ORDER BY path",
+                                  (COMPLETE,)).fetchall()
+
+    def complete_filing(self, filing_url, out_dir, n_documents):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?, ?)",
+                               (filing_url, out_dir, n_documents, COMPLETE, time.time()))
+
+    def verify(self):
+        """Re-hashes every complete document; mismatched or missing files are marked corrupt. Returns their URLs."""
+        corrupt = []
+        for url, path, sha256 in self._conn.execute(
+                "SELECT url, path, sha256 FROM documents WHERE status = ?", (COMPLETE,)).fetchall():
+            if not os.path.exists(path) or file_sha256(path) != sha256:
+                corrupt.append(url)
+        with self._conn:
+            self._conn.executemany("UPDATE documents SET status = ? WHERE url = ?", [(CORRUPT, url) for url in corrupt])
+            # A filing with a corrupt document has to be revisited.
+            self._conn.execute(
+                "UPDATE filings SET status = ? WHERE url IN (SELECT filing_url FROM documents WHERE status = ?)",
+                (CORRUPT, CORRUPT))
+        return corrupt
+
+    def report(self):
+        return (f"Download manifest: {self.downloaded} downloaded, {self.skipped} already complete, "
+                f"{self.failed} failed")
+
+    def stats(self):
+        """Returns {'documents': {status: (count, bytes)}, 'filings': {status: count}}."""
+        documents = {status: (count, size or 0) for status, count, size in self._conn.execute(
+            "SELECT status, COUNT(*), SUM(size) FROM documents GROUP BY status")}
+        filings = dict(self._conn.execute("SELECT status, COUNT(*) FROM filings GROUP BY status").fetchall())
+        return {'documents': documents, 'filings': filings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or verify the filing download manifest.")
+    parser.add_argument('command', choices=['stats', 'verify'])
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST_PATH)
+    args = parser.parse_args()
+
+    with DownloadManifest(args.manifest) as manifest:
+        if args.command == 'verify':
+            corrupt = manifest.verify()
+            print(f"{len(corrupt)} documents failed verification and will be downloaded again.")
+            for url in corrupt:
+                print("  ", url)
+        stats = manifest.stats()
+        for status, (count, size) in sorted(stats['documents'].items()):
+            print(f"documents {status:9s} {count:7d}  {size / 1e6:9.1f} MB")
+        for status, count in sorted(stats['filings'].items()):
+            print(f"filings   {status:9s} {count:7d}")
+
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    main()
@@ -1,12 +1,20 @@
 import requests
-from bs4 import BeautifulSoup
 import os
-import re
+import sys
+
+# --- Robust Path Setup ---
+# The project root goes first so that 'scraper' resolves to this package, not to this script.
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if sys.path[0] != project_root:
+    sys.path.insert(0, project_root)
+
+from scraper.html_text import DEFAULT_CHUNK_SIZE, StreamingTextExtractor, charset_from_content_type, iter_html_text
 
 def scrape_edgar_htm(url, output_dir="output"):
     """
     Scrapes the prose from a given SEC Edgar HTM link and saves it to a file.
     This version is designed to handle Inline XBRL by stripping out financial data tags.
+    The document is parsed as it downloads, so memory does not grow with its size.
 
     Args:
         url (str): The URL of the SEC Edgar filing.
@@ -17,32 +25,31 @@ def scrape_edgar_htm(url, output_dir="output"):
         headers = {
             "User-Agent": "LinguisticAlpha/1.0 (contact@example.com)"
         }
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, stream=True)
         response.raise_for_status()  
 
-        soup = BeautifulSoup(response.content, "html.parser")
-        body = soup.find('body')
-        if not body:
-            print("No <body> tag found in the document.")
-            return
-        for tag in body.find_all(['table', 'script', 'style']):
-            tag.decompose()
-        for tag in body.find_all(lambda t: t.name and t.name.startswith('ix:')):
-            tag.decompose()
-        text = body.get_text(separator=' ', strip=True)
-
-        text = re.sub(r'\s+', ' ', text).strip()
-        # 2. Add newlines before "Item" headings to restore some document structure for readability.
-        text = re.sub(r'(?i)(Item\s+\d+\w*\.)', r'\n\n\1', text)
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
         # Save the extracted text to a new file to show the improvement
         filename_base = url.split('/')[-1].replace('.htm', '')
         output_path = os.path.join(output_dir, f"{filename_base}_clean.txt")
-        
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(text)
+
+        # Tables, scripts, styles and ix: tags are dropped while streaming; whitespace is collapsed
+        # and newlines are added before "Item" headings to restore some document structure.
+        # The charset comes from the Content-Type header if it names one (response.encoding would
+        # default to ISO-8859-1 otherwise), else from the document itself.
+        extractor = StreamingTextExtractor()
+        encoding = charset_from_content_type(response.headers.get("Content-Type"))
+        tmp_path = output_path + ".tmp"
+        with response, open(tmp_path, "w", encoding="utf-8") as f:
+            for segment in iter_html_text(response.iter_content(DEFAULT_CHUNK_SIZE), encoding, extractor):
+                f.write(segment)
+        if not extractor.found_body:
+            os.remove(tmp_path)
+            print("No <body> tag found in the document.")
+            return
+        os.replace(tmp_path, output_path)
 
         print(f"Successfully scraped and saved cleaned text to {output_path}")
 
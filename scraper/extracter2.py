@@ -3,12 +3,15 @@
 SEC Quarterly 10-Q Direct Data Extractor (Full Pipeline)
 *** CRITICAL FIX: Removed overly strict content size check in extraction function ***
 """
+import argparse
+import asyncio
 import os
 import sys
-import time
 import re
-import requests
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from datetime import datetime, timedelta
@@ -16,69 +19,50 @@ from ixbrlparse import IXBRL
 from io import StringIO
 from typing import Dict, List, Any
 
+# --- Robust Path Setup ---
+# The project root goes first so that 'scraper' resolves to this package, not to this script.
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if sys.path[0] != project_root:
+    sys.path.insert(0, project_root)
+
+from scraper.cik_index import load_cik_index
+from scraper.sec_client import SECClient
+
 # --------------------------------------------------------------------
 # USER SETTINGS (UPDATE THESE!)
 # --------------------------------------------------------------------
 # !!! CRITICAL: REPLACE 'your.email@example.com' with your actual email address
 USER_AGENT = "MyPersonalScraper/1.1 (sasti.saravanan@gmail.com)" # <-- CHANGE THIS
-REQUESTS_PER_SEC = 1.5 # Conservative rate limit
+REQUESTS_PER_SEC = 8 # SEC allows up to 10 requests/second
+CONCURRENCY = 8
 YEARS_BACK = 4
 FILING_TYPE = "10-Q"
 
-# Initialize Session with REQUIRED User-Agent
-session = requests.Session()
-session.headers.update({
-    "User-Agent": USER_AGENT,
-    "Accept-Encoding": "gzip, deflate",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-})
+# Parallel mode: facts are written to Parquet, one row group per filing.
+# ixbrlparse field -> output column (same renames as the CSV output), plus metadata columns.
+FACT_FIELDS = {
+    'schema': 'schema', 'name': 'ConceptName', 'value': 'value', 'unit': 'unit', 'instant': 'instant',
+    'startdate': 'StartDate', 'enddate': 'EndDate', 'segments': 'segments',
+}
+FACT_SCHEMA = pa.schema(
+    [('Ticker', pa.string()), ('SourceFiling', pa.string()), ('SourceURL', pa.string())]
+    + [(column, pa.string()) for column in FACT_FIELDS.values()]
+    + [('numeric_value', pa.float64())]
+)
 
 # --------------------------------------------------------------------
 # Utilities
 # --------------------------------------------------------------------
 
-def _safe_get(url, params=None, max_retries=3, backoff=2.0):
-    """Handles rate limiting and retries for SEC requests."""
-    # Enforce time delay before request
-    time.sleep(1.0 / REQUESTS_PER_SEC) 
-    
-    for attempt in range(max_retries):
-        try:
-            r = session.get(url, params=params, timeout=30)
-            r.raise_for_status()
-            return r
-        except requests.exceptions.HTTPError as e:
-            if r.status_code == 403:
-                print(f"Error 403 Forbidden: Request denied by SEC. CHECK YOUR USER-AGENT and wait a few minutes.")
-                raise RuntimeError(f"Failed to fetch {url} due to 403.") 
-            
-            wait = backoff * (2 ** attempt)
-            print(f"Error {e} on {url} (Status: {r.status_code}). Retrying in {wait:.1f}s...")
-            time.sleep(wait)
-        except Exception as e:
-            wait = backoff * (2 ** attempt)
-            print(f"General Error {e} on {url}. Retrying in {wait:.1f}s...")
-            time.sleep(wait)
-            
-    raise RuntimeError(f"Failed to fetch {url} after {max_retries} attempts.")
-
-
-def get_cik_for_ticker(ticker):
-    """Uses SEC's official ticker → CIK mapping."""
-    ticker = ticker.upper().strip()
-    url = "https://www.sec.gov/files/company_tickers.json"
-    r = _safe_get(url)
-    data = r.json()
-    for entry in data.values():
-        if entry["ticker"].upper() == ticker:
-            return str(entry["cik_str"]).zfill(10)
-    return None
+async def get_cik_for_ticker(client, ticker):
+    """Uses the local index of SEC's official ticker → CIK mapping."""
+    index = await load_cik_index(client)
+    return index.cik(ticker)
 
-def list_recent_filings(cik, years_back=4):
+async def list_recent_filings(client, cik, years_back=4):
     """Lists recent filings of the specified type from the SEC API."""
     base_url = "https://data.sec.gov/submissions/CIK" + cik + ".json"
-    r = _safe_get(base_url)
-    data = r.json()
+    data = await client.get_json(base_url)
 
     cutoff_date = datetime.now() - timedelta(days=years_back * 365)
     filings = []
@@ -97,9 +81,9 @@ def list_recent_filings(cik, years_back=4):
                     filings.append({"filing_date": date, "accession": accession_nodash, "link": link})
     return filings
 
-def find_ixbrl_report_url(index_url: str) -> str | None:
+async def find_ixbrl_report_url(client, index_url: str) -> str | None:
     """Scrapes the index page to find the direct link to the primary iXBRL report."""
-    r = _safe_get(index_url)
+    r = await client.get(index_url)
     soup = BeautifulSoup(r.text, "lxml")
     
     table = soup.find("table", class_="tableFile") or soup.find("table", class_="tableFile2")
@@ -118,32 +102,57 @@ def find_ixbrl_report_url(index_url: str) -> str | None:
     
     return None
 
-def extract_remote_ixbrl_facts(ixbrl_url: str, filing_name: str) -> List[Dict[str, Any]]:
+def parse_ixbrl_facts(content: str, filing_name: str, ixbrl_url: str) -> List[Dict[str, Any]]:
+    """Parses an iXBRL document into fact dicts tagged with their source filing."""
+    file_content = StringIO(content)
+    ixbrl_doc = IXBRL(file_content)
+    facts_list = ixbrl_doc.to_table(fields='all') 
+
+    for fact in facts_list:
+        fact['SourceFiling'] = filing_name
+        fact['SourceURL'] = ixbrl_url
+        
+    return facts_list
+
+def parse_ixbrl_fact_columns(content: str, ticker: str, filing_name: str, ixbrl_url: str):
+    """
+    Worker-process version of parse_ixbrl_facts: returns the facts as FACT_SCHEMA
+    columns (lists), which pickle far smaller than one dict per fact, or an error message.
+    """
+    try:
+        facts = parse_ixbrl_facts(content, filing_name, ixbrl_url)
+    except Exception as e:
+        return None, str(e)
+    columns = {field.name: [] for field in FACT_SCHEMA}
+    for fact in facts:
+        columns['Ticker'].append(ticker)
+        columns['SourceFiling'].append(filing_name)
+        columns['SourceURL'].append(ixbrl_url)
+        for key, column in FACT_FIELDS.items():
+            value = fact.get(key)
+            columns[column].append(None if value is None else str(value))
+        value = fact.get('value')
+        is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+        columns['numeric_value'].append(float(value) if is_number else None)
+    return columns, None
+
+async def extract_remote_ixbrl_facts(client, ixbrl_url: str, filing_name: str) -> List[Dict[str, Any]]:
     """
     Downloads iXBRL content from a URL, extracts all facts, 
     using the successful download-and-parse method without the strict size check.
     """
     print(f"   Downloading iXBRL report from: {ixbrl_url}")
     try:
-        # Step 1: Download the file content using the session and _safe_get
-        response = _safe_get(ixbrl_url)
+        # Step 1: Download the file content through the shared rate-limited client
+        response = await client.get(ixbrl_url)
         content = response.text
         
         # --- FIX APPLIED HERE: REMOVED the content size check (content_size_bytes < 10240) ---
         
         print(f"   Successfully downloaded {len(content.encode('utf-8'))} bytes. Proceeding to parse.")
         
-        # Step 2: Parse the iXBRL content using StringIO
-        file_content = StringIO(content)
-        ixbrl_doc = IXBRL(file_content)
-        facts_list = ixbrl_doc.to_table(fields='all') 
-
-        # Step 3: Add source metadata
-        for fact in facts_list:
-            fact['SourceFiling'] = filing_name
-            fact['SourceURL'] = ixbrl_url
-            
-        return facts_list
+        # Step 2 and 3: Parse the iXBRL content and add source metadata
+        return parse_ixbrl_facts(content, filing_name, ixbrl_url)
 
     except RuntimeError as e:
         print(f"   ❌ Network error during download: {e}")
@@ -156,54 +165,54 @@ def extract_remote_ixbrl_facts(ixbrl_url: str, filing_name: str) -> List[Dict[st
 # Main Execution
 # --------------------------------------------------------------------
 
-def run_direct_extraction_pipeline(ticker, max_filings=12):
-    """Executes the full direct extraction pipeline."""
-    # Check for placeholder email before starting
-    if "your.real.email@provider.com" in USER_AGENT:
-        sys.exit("!!! CRITICAL: Please update the USER_AGENT with your actual email address before running. !!!")
+async def process_filing(client, ticker, i, total, f) -> List[Dict[str, Any]]:
+    """Finds the iXBRL report of one filing and extracts its facts."""
+    filing_name = f"{ticker}_{f['filing_date']}_{f['accession']}"
+    print(f"\n--- Processing Filing [{i}/{total}]: {filing_name} ---")
+
+    # 3. Find Direct iXBRL Link
+    try:
+        ixbrl_url = await find_ixbrl_report_url(client, f['link'])
+    except RuntimeError:
+        print(f"   Skipping filing due to prior network error on index page: {f['link']}")
+        return [] # Move to the next filing
+
+    if not ixbrl_url:
+        print(f"   ❌ Could not find the primary iXBRL report link on index page: {f['link']}")
+        return []
+
+    print(f"   Found primary iXBRL link. Proceeding to extract data...")
+
+    # 4. Extract Data Directly
+    facts = await extract_remote_ixbrl_facts(client, ixbrl_url, filing_name)
+    if facts:
+        print(f"   ✅ SUCCESS: Extracted {len(facts)} facts.")
+    else:
+        print("   ⚠️ No facts extracted from this filing.")
+    return facts
 
+async def _run_direct_extraction_pipeline(client, ticker, max_filings=12):
     print(f"--- Starting SEC Direct Extraction for {ticker} (Type: {FILING_TYPE}) ---")
     
     # 1. Get CIK
-    cik = get_cik_for_ticker(ticker)
+    cik = await get_cik_for_ticker(client, ticker)
     if not cik:
         print(f"❌ Could not find CIK for ticker {ticker}.")
         return pd.DataFrame()
     print(f"✅ Found CIK: {cik}")
 
     # 2. List Filings
-    filings = list_recent_filings(cik, years_back=YEARS_BACK)
+    filings = await list_recent_filings(client, cik, years_back=YEARS_BACK)
     filings = filings[:max_filings]
     if not filings:
         print(f"No recent {FILING_TYPE} filings found in the last {YEARS_BACK} years.")
         return pd.DataFrame()
 
-    all_extracted_facts = []
-    
-    for i, f in enumerate(filings, 1):
-        filing_name = f"{ticker}_{f['filing_date']}_{f['accession']}"
-        print(f"\n--- Processing Filing [{i}/{len(filings)}]: {filing_name} ---")
-        
-        # 3. Find Direct iXBRL Link
-        try:
-            ixbrl_url = find_ixbrl_report_url(f['link'])
-        except RuntimeError:
-            print(f"   Skipping filing due to prior network error on index page: {f['link']}")
-            continue # Move to the next filing
-        
-        if ixbrl_url:
-            print(f"   Found primary iXBRL link. Proceeding to extract data...")
-            
-            # 4. Extract Data Directly
-            facts = extract_remote_ixbrl_facts(ixbrl_url, filing_name)
-            
-            if facts:
-                all_extracted_facts.extend(facts)
-                print(f"   ✅ SUCCESS: Extracted {len(facts)} facts.")
-            else:
-                print("   ⚠️ No facts extracted from this filing.")
-        else:
-            print(f"   ❌ Could not find the primary iXBRL report link on index page: {f['link']}")
+    # Filings are fetched concurrently (within the client's rate limit); facts keep filing order.
+    results = await asyncio.gather(*(
+        process_filing(client, ticker, i, len(filings), f) for i, f in enumerate(filings, 1)
+    ))
+    all_extracted_facts = [fact for facts in results for fact in facts]
 
     if not all_extracted_facts:
         print("\n❌ Final result: No facts were extracted from any filing.")
@@ -220,12 +229,157 @@ def run_direct_extraction_pipeline(ticker, max_filings=12):
     
     return df_combined
 
+def run_direct_extraction_pipeline(ticker, max_filings=12):
+    """Executes the full direct extraction pipeline."""
+    # Check for placeholder email before starting
+    if "your.real.email@provider.com" in USER_AGENT:
+        sys.exit("!!! CRITICAL: Please update the USER_AGENT with your actual email address before running. !!!")
+
+    async def run():
+        async with SECClient(USER_AGENT, rate=REQUESTS_PER_SEC, concurrency=CONCURRENCY) as client:
+            return await _run_direct_extraction_pipeline(client, ticker, max_filings)
+    return asyncio.run(run())
+
+# --------------------------------------------------------------------
+# Parallel Mode: many tickers, parsing in a process pool, streamed to Parquet
+# --------------------------------------------------------------------
+
+class FactParquetWriter:
+    """
+    Appends one row group per filing to a Parquet file. The file appears atomically
+    on close(); abort() (or leaving a `with` block with an exception) discards it.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._tmp_path = path + ".tmp"
+        self._writer = pq.ParquetWriter(self._tmp_path, FACT_SCHEMA)
+        self.rows = 0
+        self.row_groups = 0
+
+    def write(self, columns):
+        table = pa.Table.from_pydict(columns, schema=FACT_SCHEMA)
+        self._writer.write_table(table, row_group_size=max(1, table.num_rows))
+        self.rows += table.num_rows
+        self.row_groups += 1
+
+    def close(self):
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discards the partial file, leaving any existing file at `path` untouched."""
+        self._writer.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+async def extract_filing_to_parquet(client, executor, writer, in_flight, ticker, f):
+    """Downloads one filing's iXBRL report, parses it in the pool and appends its facts to `writer`."""
+    filing_name = f"{ticker}_{f['filing_date']}_{f['accession']}"
+    # Bounds the filings held in memory (downloaded or being parsed) at any time.
+    async with in_flight:
+        try:
+            ixbrl_url = await find_ixbrl_report_url(client, f['link'])
+            if not ixbrl_url:
+                print(f"   ❌ {filing_name}: could not find the primary iXBRL report link on {f['link']}")
+                return 0
+            content = (await client.get(ixbrl_url)).text
+        except RuntimeError as e:
+            print(f"   ❌ {filing_name}: network error: {e}")
+            return 0
+
+        loop = asyncio.get_running_loop()
+        columns, error = await loop.run_in_executor(
+            executor, parse_ixbrl_fact_columns, content, ticker, filing_name, ixbrl_url)
+        del content
+        if error is not None:
+            print(f"   ❌ {filing_name}: parsing error: {error}")
+            return 0
+        if columns['ConceptName']:
+            writer.write(columns)
+        print(f"   ✅ {filing_name}: {len(columns['ConceptName'])} facts")
+        return len(columns['ConceptName'])
+
+async def _extract_ticker_to_parquet(client, executor, writer, in_flight, ticker, max_filings):
+    """Extracts one ticker's filings; returns its fact count, or None if its filings could not be listed."""
+    try:
+        cik = await get_cik_for_ticker(client, ticker)
+        if not cik:
+            print(f"❌ Could not find CIK for ticker {ticker}.")
+            return None
+        filings = (await list_recent_filings(client, cik, years_back=YEARS_BACK))[:max_filings]
+    except (RuntimeError, ValueError) as e:
+        # One ticker's failure must not discard the facts of the others.
+        print(f"❌ {ticker}: could not list filings: {e}")
+        return None
+    counts = await asyncio.gather(*(
+        extract_filing_to_parquet(client, executor, writer, in_flight, ticker, f) for f in filings
+    ))
+    return sum(counts)
+
+def run_parallel_extraction_pipeline(tickers, output_path, max_filings=12, n_jobs=None, max_in_flight=None):
+    """
+    Extracts the iXBRL facts of many tickers' filings into one Parquet file.
+
+    Downloads run concurrently through the rate-limited client, parsing runs in
+    a pool of `n_jobs` processes (default: one per CPU), and each filing's facts
+    are written as their own row group as soon as it is parsed, so at most
+    `max_in_flight` filings (default: 2 * n_jobs) are held in memory.
+    """
+    if "your.real.email@provider.com" in USER_AGENT:
+        sys.exit("!!! CRITICAL: Please update the USER_AGENT with your actual email address before running. !!!")
+    n_jobs = n_jobs or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * n_jobs
+    tickers = [ticker.strip().upper() for ticker in tickers if ticker.strip()]
+    print(f"--- Extracting {FILING_TYPE} facts for {len(tickers)} tickers with {n_jobs} parser processes ---")
+
+    async def run(executor, writer):
+        in_flight = asyncio.Semaphore(max_in_flight)
+        async with SECClient(USER_AGENT, rate=REQUESTS_PER_SEC, concurrency=CONCURRENCY) as client:
+            return await asyncio.gather(*(
+                _extract_ticker_to_parquet(client, executor, writer, in_flight, ticker, max_filings)
+                for ticker in tickers
+            ))
+
+    # Tickers and filings that fail are logged and skipped; a run that crashes part-way
+    # leaves no (truncated) output file behind.
+    with FactParquetWriter(output_path) as writer, ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        counts = asyncio.run(run(executor, writer))
+    print(f"\n--- ✅ Wrote {writer.rows} facts from {writer.row_groups} filings to {output_path} ---")
+    failed = [ticker for ticker, count in zip(tickers, counts) if count is None]
+    if failed:
+        print(f"--- ❌ {len(failed)} tickers failed: {', '.join(failed)} ---")
+    return writer.rows
+
 if __name__ == "__main__":
-    
+    parser = argparse.ArgumentParser(description=f"Extract iXBRL facts from recent {FILING_TYPE} filings.")
+    parser.add_argument('tickers', nargs='*', help="Tickers to process in parallel mode (prompts for one if omitted).")
+    parser.add_argument('--parquet', default=f"xbrl_facts_{FILING_TYPE.replace('-', '')}.parquet",
+                        help="Output file for parallel mode.")
+    parser.add_argument('--jobs', type=int, default=None, help="Parser processes (default: one per CPU).")
+    parser.add_argument('--max-filings', type=int, default=12)
+    args = parser.parse_args()
+
     # Check for placeholder email before starting
     if "your.real.email@provider.com" in USER_AGENT:
         sys.exit("!!! CRITICAL: Please update the USER_AGENT with your actual email address before running. !!!")
 
+    if args.tickers:
+        run_parallel_extraction_pipeline(args.tickers, args.parquet, args.max_filings, n_jobs=args.jobs)
+        sys.exit(0)
+
     ticker_input = input(f"Enter ticker symbol (e.g., AAPL) for {FILING_TYPE} filings: ").strip().upper()
     
     # Execute the pipeline
@@ -0,0 +1,349 @@
+# scraper/filing_archive.py
+"""
+Compressed, content-addressed local archive of filing documents.
+
+Each unique document body (keyed by its SHA-256) is compressed once and
+appended to a pack file under <archive>/packs/. A SQLite index maps
+(CIK, accession, filename) to the blob and each blob to its pack, offset and
+compressed length. An exhibit or schema file repeated across filings is
+therefore stored once, and every document can be read on its own: open()
+seeks to the blob and decompresses it incrementally, so parsers and feature
+jobs can stream a document without unpacking anything else.
+
+Blobs are zstd-compressed when the optional `zstandard` package is installed
+and gzip-compressed otherwise; the codec is recorded per blob, so archives
+written either way stay readable. A blob is appended and fsynced before it
+is indexed, so an interrupted write leaves at most unreferenced bytes at the
+end of a pack.
+
+Usage:
+    python -m scraper.filing_archive import-downloads [--manifest PATH] [--archive DIR]
+    python -m scraper.filing_archive add CIK ACCESSION FILE ... [--archive DIR]
+    python -m scraper.filing_archive ls [--cik CIK] [--accession ACCESSION] [--archive DIR]
+    python -m scraper.filing_archive cat CIK ACCESSION FILENAME [--archive DIR]
+    python -m scraper.filing_archive stats|verify [--archive DIR]
+"""
+import argparse
+import hashlib
+import io
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Optional: blobs are gzip-compressed without it.
+    zstandard = None
+
+from scraper.cik_index import normalize_cik
+
+DEFAULT_ARCHIVE_DIR = os.path.join('data', 'filing_archive')
+INDEX_NAME = 'index.sqlite'
+# A new pack file is started once the current one reaches this size.
+PACK_SIZE = 256 * 1024 * 1024
+READ_SIZE = 64 * 1024
+
+GZIP = 'gzip'
+ZSTD = 'zstd'
+DEFAULT_CODEC = ZSTD if zstandard is not None else GZIP
+DEFAULT_LEVELS = {GZIP: 6, ZSTD: 10}
+# zlib's gzip container (header + trailer), so a blob is also a valid .gz stream.
+GZIP_WBITS = 31
+
+ARCHIVES_URL_PATTERN = re.compile(r'/Archives/edgar/data/(\d+)/(\d{18})/([^/?#]+)$')
+
+
+def normalize_accession(accession):
+    """Accepts an accession number with or without dashes; returns the dashed form (0000320193-25-000073)."""
+    digits = accession.replace('-', '')
+    if len(digits) != 18 or not digits.isdigit():
+        raise ValueError(f"Not an accession number: {accession!r}")
+    return f"{digits[:10]}-{digits[10:12]}-{digits[12:]}"
+
+
+def parse_archive_url(url):
+    """(cik, accession, filename) of a document URL under /Archives/edgar/data/, or None."""
+    match = ARCHIVES_URL_PATTERN.search(url)
+    if match is None:
+        return None
+    cik, accession, filename = match.groups()
+    return normalize_cik(cik), normalize_accession(accession), filename
+
+
+def _compressor(codec, level=None):
+    level = DEFAULT_LEVELS[codec] if level is None else level
+    if codec == GZIP:
+        return zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("The 'zstandard' package is required for zstd-compressed archives.")
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"Unknown codec: {codec!r}")
+
+
+def _decompressor(codec):
+    if codec == GZIP:
+        return zlib.decompressobj(GZIP_WBITS)
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("The 'zstandard' package is required to read zstd-compressed blobs.")
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Unknown codec: {codec!r}")
+
+
+def _file_chunks(path, chunk_size=READ_SIZE):
+    with open(path, 'rb') as f:
+        yield from iter(lambda: f.read(chunk_size), b'')
+
+
+class BlobReader(io.RawIOBase):
+    """Readable stream over one compressed blob in a pack file, decompressed as it is read."""
+
+    def __init__(self, pack_path, offset, length, codec):
+        super().__init__()
+        self._file = open(pack_path, 'rb')
+        self._file.seek(offset)
+        self._remaining = length
+        self._decompressor = _decompressor(codec)
+        self._buffer = b''
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while self._position == len(self._buffer):
+            if not self._remaining:
+                return 0
+            data = self._file.read(min(READ_SIZE, self._remaining))
+            if not data:
+                raise OSError("Pack file is truncated.")
+            self._remaining -= len(data)
+            self._buffer, self._position = self._decompressor.decompress(data), 0
+        n = min(len(b), len(self._buffer) - self._position)
+        b[:n] = self._buffer[self._position:self._position + n]
+        self._position += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+class FilingArchive:
+    """Content-addressed store of filing documents, indexed by (CIK, accession, filename)."""
+
+    def __init__(self, archive_dir=DEFAULT_ARCHIVE_DIR, codec=DEFAULT_CODEC, level=None):
+        self.archive_dir = archive_dir
+        self.codec = codec
+        self.level = level
+        os.makedirs(os.path.join(archive_dir, 'packs'), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(archive_dir, INDEX_NAME), timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs (sha256 TEXT PRIMARY KEY, pack INTEGER, offset INTEGER, "
+            "length INTEGER, size INTEGER, codec TEXT)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (cik TEXT, accession TEXT, filename TEXT, sha256 TEXT, "
+            "added_at REAL, PRIMARY KEY (cik, accession, filename))")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _pack_path(self, pack):
+        return os.path.join(self.archive_dir, 'packs', f"pack-{pack:05d}.bin")
+
+    @staticmethod
+    def _key(cik, accession, filename):
+        return normalize_cik(cik), normalize_accession(accession), filename
+
+    def _add(self, key, sha256, chunks):
+        """Indexes `key` to blob `sha256`, appending the compressed `chunks` unless the blob is already stored."""
+        with self._conn:
+            # Taking the write lock first keeps concurrent writers from interleaving appends to a pack.
+            self._conn.execute("BEGIN IMMEDIATE")
+            stored = self._conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha256,)).fetchone() is not None
+            if not stored:
+                pack = self._conn.execute("SELECT MAX(pack) FROM blobs").fetchone()[0] or 0
+                path = self._pack_path(pack)
+                if os.path.exists(path) and os.path.getsize(path) >= PACK_SIZE:
+                    pack += 1
+                    path = self._pack_path(pack)
+                compressor = _compressor(self.codec, self.level)
+                size = 0
+                with open(path, 'ab') as f:
+                    offset = f.tell()
+                    for chunk in chunks():
+                        size += len(chunk)
+                        f.write(compressor.compress(chunk))
+                    f.write(compressor.flush())
+                    f.flush()
+                    os.fsync(f.fileno())
+                    length = f.tell() - offset
+                self._conn.execute("INSERT INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                                   (sha256, pack, offset, length, size, self.codec))
+            self._conn.execute("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)", (*key, sha256, time.time()))
+        return not stored
+
+    def add_bytes(self, cik, accession, filename, content):
+        """Archives a document body; returns True if it was new content, False if an identical blob existed."""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        sha256 = hashlib.sha256(content).hexdigest()
+        return self._add(self._key(cik, accession, filename), sha256, lambda: [content])
+
+    def add_file(self, cik, accession, filename, path):
+        """Archives the file at `path` (read in chunks, hashed before it is compressed); see add_bytes."""
+        digest = hashlib.sha256()
+        for chunk in _file_chunks(path):
+            digest.update(chunk)
+        return self._add(self._key(cik, accession, filename), digest.hexdigest(), lambda: _file_chunks(path))
+
+    def _blob(self, cik, accession, filename):
+        row = self._conn.execute(
+            "SELECT b.pack, b.offset, b.length, b.codec FROM documents d JOIN blobs b ON b.sha256 = d.sha256 "
+            "WHERE d.cik = ? AND d.accession = ? AND d.filename = ?",
+            self._key(cik, accession, filename)).fetchone()
+        if row is None:
+            raise KeyError((cik, accession, filename))
+        return row
+
+    def __contains__(self, key):
+        cik, accession, filename = key
+        return self._conn.execute(
+            "SELECT 1 FROM documents WHERE cik = ? AND accession = ? AND filename = ?",
+            self._key(cik, accession, filename)).fetchone() is not None
+
+    def open(self, cik, accession, filename, encoding=None):
+        """
+        Opens one archived document for streaming reads: a binary file object,
+        or a text one if `encoding` is given. Raises KeyError if it is not archived.
+        """
+        pack, offset, length, codec = self._blob(cik, accession, filename)
+        stream = io.BufferedReader(BlobReader(self._pack_path(pack), offset, length, codec), READ_SIZE)
+        if encoding is not None:
+            return io.TextIOWrapper(stream, encoding=encoding, errors='replace')
+        return stream
+
+    def read_bytes(self, cik, accession, filename):
+        with self.open(cik, accession, filename) as f:
+            return f.read()
+
+    def read_text(self, cik, accession, filename, encoding='utf-8'):
+        with self.open(cik, accession, filename, encoding=encoding) as f:
+            return f.read()
+
+    def documents(self, cik=None, accession=None):
+        """(cik, accession, filename, size) of the archived documents, optionally for one company or filing."""
+        query = ("SELECT d.cik, d.accession, d.filename, b.size FROM documents d JOIN blobs b ON b.sha256 = d.sha256"
+                 " WHERE 1 = 1")
+        params = []
+        if cik is not None:
+            query += " AND d.cik = ?"
+            params.append(normalize_cik(cik))
+        if accession is not None:
+            query += " AND d.accession = ?"
+            params.append(normalize_accession(accession))
+        return self._conn.execute(query + " ORDER BY d.cik, d.accession, d.filename", params).fetchall()
+
+    def verify(self):
+        """Decompresses and re-hashes every blob; returns the SHA-256 of those that no longer match."""
+        bad = []
+        for sha256, pack, offset, length, codec in self._conn.execute(
+                "SELECT sha256, pack, offset, length, codec FROM blobs ORDER BY pack, offset").fetchall():
+            digest = hashlib.sha256()
+            try:
+                with BlobReader(self._pack_path(pack), offset, length, codec) as reader:
+                    for chunk in iter(lambda: reader.read(READ_SIZE), b''):
+                        digest.update(chunk)
+            except Exception as e:
+                print(f"Blob {sha256} could not be read: {e}")
+            if digest.hexdigest() != sha256:
+                bad.append(sha256)
+        return bad
+
+    def stats(self):
+        documents, raw_bytes = self._conn.execute(
+            "SELECT COUNT(*), SUM(b.size) FROM documents d JOIN blobs b ON b.sha256 = d.sha256").fetchone()
+        blobs, unique_bytes, stored_bytes = self._conn.execute(
+            "SELECT COUNT(*), SUM(size), SUM(length) FROM blobs").fetchone()
+        return {'documents': documents, 'blobs': blobs, 'raw_bytes': raw_bytes or 0,
+                'unique_bytes': unique_bytes or 0, 'stored_bytes': stored_bytes or 0}
+
+
+def import_downloads(archive, manifest_path=None):
+    """
+    Archives every complete document recorded in the download manifest whose
+    URL identifies its filing. Returns (documents archived, new blobs).
+    """
+    from scraper.download_manifest import DEFAULT_MANIFEST_PATH, DownloadManifest
+
+    archived = new = 0
+    with DownloadManifest(manifest_path or DEFAULT_MANIFEST_PATH) as manifest:
+        for url, path in manifest.complete_documents():
+            key = parse_archive_url(url)
+            if key is None or not os.path.exists(path):
+                continue
+            new += archive.add_file(*key, path)
+            archived += 1
+    return archived, new
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the compressed local filing archive.")
+    parser.add_argument('command', choices=['import-downloads', 'add', 'ls', 'cat', 'stats', 'verify'])
+    parser.add_argument('args', nargs='*', help="add: CIK ACCESSION FILE ...; cat: CIK ACCESSION FILENAME")
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument('--manifest', default=None, help="Download manifest for import-downloads.")
+    parser.add_argument('--cik', default=None)
+    parser.add_argument('--accession', default=None)
+    args = parser.parse_args()
+
+    with FilingArchive(args.archive) as archive:
+        if args.command == 'import-downloads':
+            archived, new = import_downloads(archive, args.manifest)
+            print(f"Archived {archived} documents ({new} new blobs).")
+        elif args.command == 'add':
+            if len(args.args) < 3:
+                parser.error("add takes CIK ACCESSION FILE ...")
+            cik, accession, *paths = args.args
+            new = sum(archive.add_file(cik, accession, os.path.basename(path), path) for path in paths)
+            print(f"Archived {len(paths)} documents ({new} new blobs).")
+        elif args.command == 'ls':
+            for cik, accession, filename, size in archive.documents(args.cik, args.accession):
+                print(f"{cik}  {accession}  {size:10d}  {filename}")
+        elif args.command == 'cat':
+            if len(args.args) != 3:
+                parser.error("cat takes CIK ACCESSION FILENAME")
+            with archive.open(*args.args) as f:
+                shutil.copyfileobj(f, sys.stdout.buffer)
+        elif args.command == 'verify':
+            bad = archive.verify()
+            print(f"{len(bad)} blobs failed verification.")
+            for sha256 in bad:
+                print("  ", sha256)
+
+        if args.command in ('import-downloads', 'add', 'stats', 'verify'):
+            stats = archive.stats()
+            print(f"{stats['documents']} documents, {stats['blobs']} unique blobs; "
+                  f"{stats['raw_bytes'] / 1e6:.1f} MB raw, {stats['unique_bytes'] / 1e6:.1f} MB unique, "
+                  f"{stats['stored_bytes'] / 1e6:.1f} MB stored")
+
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    main()
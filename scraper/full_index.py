@@ -0,0 +1,205 @@
+# scraper/full_index.py
+"""
+Bulk filing enumeration from EDGAR's quarterly full-index files.
+
+Every quarter's master.idx lists all filings made in that quarter as
+'CIK|Company Name|Form Type|Date Filed|Filename' rows. Downloading one file
+per quarter and scanning it locally finds every 10-Q/10-K of every company,
+where the Submissions API would need one request per company.
+
+Files are stored under cache/full_index/<year>/QTR<n>/master.idx. A closed
+quarter never changes, so a copy stored after it closed is never fetched
+again; any other copy (the current quarter, or one stored before its quarter
+closed) is refreshed with a conditional GET when it is older than `max_age`.
+Files are parsed line by line, so only the matching rows are kept in memory.
+
+master.idx names a filing's full submission edgar/data/<cik>/<accession>.txt,
+outside its accession folder; txt_url and index_url point into the folder
+(/Archives/edgar/data/<cik>/<accession without dashes>/), as the Submissions
+API paths do, so documents named in the submission resolve next to it.
+
+Usage:
+    python -m scraper.full_index fetch --start-year 2021 [--end-year 2024]
+    python -m scraper.full_index list --start-year 2021 [--forms 10-Q 10-K] [--cik 320193 ...] [--output filings.csv]
+"""
+import argparse
+import asyncio
+import csv
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+from email.utils import formatdate
+
+FULL_INDEX_URL = "https://www.sec.gov/Archives/edgar/full-index/{year}/QTR{quarter}/master.idx"
+ARCHIVES_URL = "https://www.sec.gov/Archives/"
+DEFAULT_FULL_INDEX_DIR = os.path.join('cache', 'full_index')
+DEFAULT_FORMS = ('10-Q', '10-Q/A', '10-K', '10-K/A')
+DEFAULT_MAX_AGE = 24 * 3600
+
+# Late filings and corrections can still appear in a quarter's index for a few days after it ends.
+QUARTER_SETTLE_DAYS = 7
+# master.idx is ASCII in practice; company names occasionally carry Latin-1 bytes.
+INDEX_ENCODING = 'latin-1'
+
+FILING_COLUMNS = ['cik', 'company', 'form', 'date_filed', 'accession', 'txt_url', 'index_url']
+
+
+class FullIndexFiling(namedtuple('FullIndexFiling', ['cik', 'company', 'form', 'date_filed', 'filename'])):
+    """One master.idx row; `cik` is the 10-digit padded CIK and `filename` the path under /Archives/."""
+
+    __slots__ = ()
+
+    @property
+    def accession(self):
+        return self.filename.rsplit('/', 1)[-1][:-len('.txt')]
+
+    @property
+    def folder_url(self):
+        return f"{ARCHIVES_URL}edgar/data/{int(self.cik)}/{self.accession.replace('-', '')}/"
+
+    @property
+    def txt_url(self):
+        return f"{self.folder_url}{self.accession}.txt"
+
+    @property
+    def index_url(self):
+        return f"{self.folder_url}{self.accession}-index.html"
+
+    def as_dict(self):
+        return {column: getattr(self, column) for column in FILING_COLUMNS}
+
+
+def quarters(start_year, end_year=None, today=None):
+    """(year, quarter) pairs from Q1 of `start_year` through the last quarter of `end_year` that has begun."""
+    today = today or date.today()
+    end_year = min(end_year or today.year, today.year)
+    current = (today.year, (today.month - 1) // 3 + 1)
+    return [(year, quarter) for year in range(start_year, end_year + 1) for quarter in range(1, 5)
+            if (year, quarter) <= current]
+
+
+def quarter_settle_date(year, quarter):
+    """The day from which a quarter's index no longer changes: QUARTER_SETTLE_DAYS after the quarter ends."""
+    next_start = date(year + quarter // 4, (quarter % 4) * 3 + 1, 1)
+    return next_start + timedelta(days=QUARTER_SETTLE_DAYS)
+
+
+def index_path(year, quarter, index_dir=DEFAULT_FULL_INDEX_DIR):
+    return os.path.join(index_dir, str(year), f"QTR{quarter}", 'master.idx')
+
+
+async def fetch_quarter(client, year, quarter, index_dir=DEFAULT_FULL_INDEX_DIR, max_age=DEFAULT_MAX_AGE):
+    """
+    Makes sure the master.idx of one quarter is stored locally and returns its
+    path. Returns whether it was downloaded as well: (path, downloaded).
+    """
+    path = index_path(year, quarter, index_dir)
+    headers = None
+    if os.path.exists(path):
+        modified = os.path.getmtime(path)
+        # Only a copy fetched (or confirmed unchanged) after the quarter settled is final;
+        # one fetched while the quarter was still open may lack late filings.
+        settled = time.mktime(quarter_settle_date(year, quarter).timetuple())
+        if modified >= settled or time.time() - modified < max_age:
+            return path, False
+        headers = {'If-Modified-Since': formatdate(modified, usegmt=True)}
+
+    # The file is stored here, so it bypasses the response cache instead of being kept twice.
+    response = await client.get(FULL_INDEX_URL.format(year=year, quarter=quarter), headers=headers, use_cache=False)
+    if response.status == 304:
+        os.utime(path)
+        return path, False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(response.content)
+    os.replace(tmp_path, path)
+    return path, True
+
+
+async def fetch_quarters(client, start_year, end_year=None, index_dir=DEFAULT_FULL_INDEX_DIR, max_age=DEFAULT_MAX_AGE):
+    """Fetches the master.idx of every quarter in range concurrently; returns their paths in quarter order."""
+    results = await asyncio.gather(*(
+        fetch_quarter(client, year, quarter, index_dir, max_age) for year, quarter in quarters(start_year, end_year)
+    ))
+    downloaded = sum(1 for _, was_downloaded in results if was_downloaded)
+    print(f"Full index: {len(results)} quarters, {downloaded} downloaded, {len(results) - downloaded} from {index_dir}")
+    return [path for path, _ in results]
+
+
+def iter_master_index(path, forms=DEFAULT_FORMS, ciks=None, start_date=None, end_date=None):
+    """
+    Streams the rows of one master.idx, yielding FullIndexFiling for those whose
+    form is in `forms` (None for all), CIK in `ciks` (padded or not; None for all)
+    and filing date within [start_date, end_date] ('YYYY-MM-DD' strings).
+    """
+    forms = set(forms) if forms else None
+    ciks = {str(int(cik)) for cik in ciks} if ciks else None
+    with open(path, 'r', encoding=INDEX_ENCODING) as f:
+        for line in f:
+            if line.startswith('-----'):
+                break
+        for line in f:
+            parts = line.rstrip('\n').split('|')
+            if len(parts) != 5:
+                continue
+            cik, company, form, date_filed, filename = parts
+            if forms is not None and form not in forms:
+                continue
+            if ciks is not None and cik not in ciks:
+                continue
+            if (start_date and date_filed < start_date) or (end_date and date_filed > end_date):
+                continue
+            yield FullIndexFiling(cik.zfill(10), company, form, date_filed, filename)
+
+
+async def enumerate_filings(client, start_year, end_year=None, forms=DEFAULT_FORMS, ciks=None,
+                            start_date=None, end_date=None, index_dir=DEFAULT_FULL_INDEX_DIR):
+    """
+    Every filing of `forms` (optionally restricted to `ciks` and a date range)
+    filed from `start_year` through `end_year`, oldest quarter first, with one
+    request per quarter at most.
+    """
+    paths = await fetch_quarters(client, start_year, end_year, index_dir)
+    return [filing for path in paths for filing in iter_master_index(path, forms, ciks, start_date, end_date)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download EDGAR full-index files and list filings from them.")
+    parser.add_argument('command', choices=['fetch', 'list'])
+    parser.add_argument('--start-year', type=int, required=True)
+    parser.add_argument('--end-year', type=int, default=None)
+    parser.add_argument('--forms', nargs='*', default=list(DEFAULT_FORMS))
+    parser.add_argument('--cik', nargs='*', default=None)
+    parser.add_argument('--index-dir', default=DEFAULT_FULL_INDEX_DIR)
+    parser.add_argument('--output', default=None, help="CSV file for 'list' (default: stdout).")
+    args = parser.parse_args()
+
+    from scraper.sec_client import SECClient
+
+    async def run():
+        async with SECClient("LinguisticAlphaFullIndex your.email@example.com") as client:
+            if args.command == 'fetch':
+                await fetch_quarters(client, args.start_year, args.end_year, args.index_dir)
+                return []
+            return await enumerate_filings(client, args.start_year, args.end_year, args.forms, args.cik,
+                                           index_dir=args.index_dir)
+
+    filings = asyncio.run(run())
+    if args.command == 'list':
+        out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+        writer = csv.DictWriter(out, fieldnames=FILING_COLUMNS)
+        writer.writeheader()
+        writer.writerows(filing.as_dict() for filing in filings)
+        if args.output:
+            out.close()
+            print(f"Wrote {len(filings)} filings to {args.output}")
+
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    main()
@@ -1,46 +1,55 @@
-import requests
-import time
+import asyncio
 import json
 import os
+import sys
+from datetime import date
+
+# --- Robust Path Setup ---
+# The project root goes first so that 'scraper' resolves to this package, not to this script.
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if sys.path[0] != project_root:
+    sys.path.insert(0, project_root)
+
+from scraper.cik_index import load_cik_index
+from scraper.full_index import enumerate_filings
+from scraper.sec_client import SECClient
 
 # --- Configuration and Constants ---
 # The SEC requires a proper User-Agent header for API and web requests.
 # REPLACE 'your.email@example.com' with your actual email address.
-HEADERS = {"User-Agent": "Mass10QURLCollector your.email@example.com"} 
+USER_AGENT = "Mass10QURLCollector your.email@example.com"
+REQUESTS_PER_SEC = 8 # SEC allows up to 10 requests/second
+CONCURRENCY = 8
 BASE_SEC_URL = "https://www.sec.gov"
 SUBMISSIONS_API_BASE = "https://data.sec.gov/submissions/CIK"
-COMPANY_CIK_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
 MAX_CIKS_TO_PROCESS = 50 
 TARGET_FORMS = ['10-Q', '10-Q/A'] # Only collect these forms
+# Enumerate filings from EDGAR's quarterly full-index files (one request per quarter, cached locally)
+# instead of one Submissions API request per company.
+USE_FULL_INDEX = True
+YEARS_BACK = 4 # Full-index mode only; the Submissions API returns each company's recent filings
 
 # --- Function 1: Get CIKs (Padded) ---
-def get_top_ciks(max_count):
+async def get_top_ciks(client, max_count):
     """Fetches the list of all CIKs from the SEC and returns the top N."""
     print(f"1. Fetching all company CIKs and Tickers from the SEC...")
-    time.sleep(0.1) 
     
     try:
-        response = requests.get(COMPANY_CIK_TICKERS_URL, headers=HEADERS)
-        response.raise_for_status()
-        all_data = response.json()
-    except requests.exceptions.RequestException as e:
+        index = await load_cik_index(client)
+    except (RuntimeError, ValueError) as e:
         print(f"Failed to fetch company tickers: {e}")
         return {}
 
     ciks = {}
-    for i in range(max_count):
-        key = str(i)
-        if key in all_data:
-            entry = all_data[key]
-            # CIKs are PADDED and stored as 10-digit strings
-            cik_padded = str(entry['cik_str']).zfill(10)
-            ciks[cik_padded] = entry['ticker']
+    # CIKs are PADDED and stored as 10-digit strings
+    for cik_padded, ticker in index.top(max_count):
+        ciks[cik_padded] = ticker
     
     print(f"Successfully collected the top {len(ciks)} CIKs.")
     return ciks
 
 # --- Function 2: Fetch Submissions and Extract ONLY 10-Q URLs ---
-def get_10q_urls_from_submissions(cik_padded, ticker):
+async def get_10q_urls_from_submissions(client, cik_padded, ticker):
     """
     Requests the Submissions API and extracts metadata ONLY for 10-Q reports 
     to construct raw .txt URLs.
@@ -49,12 +58,10 @@ def get_10q_urls_from_submissions(cik_padded, ticker):
     url = f"{SUBMISSIONS_API_BASE}{cik_padded}.json"
     
     print(f"   Processing {ticker} (CIK: {cik_padded})...")
-    time.sleep(0.5) # CRITICAL: Respect SEC rate limits
 
     try:
-        response = requests.get(url, headers=HEADERS)
-        response.raise_for_status()
-        data = response.json()
+        # The client enforces the SEC rate limit across all concurrent requests
+        data = await client.get_json(url)
     except Exception as e:
         print(f"      Failed to fetch submissions for {ticker}. Error: {e}")
         return []
@@ -94,23 +101,50 @@ def get_10q_urls_from_submissions(cik_padded, ticker):
     print(f"      Found {len(filing_list)} 10-Q reports.")
     return filing_list
 
+# --- Function 2b: Extract 10-Q URLs for all CIKs from the full index ---
+async def get_10q_urls_from_full_index(client, ciks_to_process, years_back=YEARS_BACK):
+    """Finds the 10-Q reports of every CIK in one local pass over the quarterly full-index files."""
+    filings = await enumerate_filings(
+        client, date.today().year - years_back, forms=TARGET_FORMS, ciks=list(ciks_to_process)
+    )
+    filing_list = [{
+        "ticker": ciks_to_process[filing.cik],
+        "cik": filing.cik,
+        "accession_number": filing.accession,
+        "date": filing.date_filed,
+        "form": filing.form,
+        "url": filing.txt_url
+    } for filing in filings]
+    print(f"      Found {len(filing_list)} 10-Q reports for {len(ciks_to_process)} companies.")
+    return filing_list
+
 # --- Function 3: Main Execution and Saving ---
+async def collect_10q_urls(max_count):
+    async with SECClient(USER_AGENT, rate=REQUESTS_PER_SEC, concurrency=CONCURRENCY) as client:
+        # Step 1: Get the list of CIKs
+        ciks_to_process = await get_top_ciks(client, max_count)
+
+        if not ciks_to_process:
+            return None
+
+        print("\n2. Starting bulk 10-Q URL collection...")
+
+        if USE_FULL_INDEX:
+            return await get_10q_urls_from_full_index(client, ciks_to_process)
+
+        # Step 2: Collect ONLY 10-Q filing URLs, fetching the submissions concurrently
+        results = await asyncio.gather(*(
+            get_10q_urls_from_submissions(client, cik, ticker) for cik, ticker in ciks_to_process.items()
+        ))
+    return [filing for filings in results for filing in filings]
+
 def main():
     
-    # Step 1: Get the list of CIKs
-    ciks_to_process = get_top_ciks(MAX_CIKS_TO_PROCESS)
+    all_urls = asyncio.run(collect_10q_urls(MAX_CIKS_TO_PROCESS))
     
-    if not ciks_to_process:
+    if all_urls is None:
         return
 
-    all_urls = []
-    print("\n2. Starting bulk 10-Q URL collection...")
-    
-    # Step 2: Iterate and collect ONLY 10-Q filing URLs
-    for cik, ticker in ciks_to_process.items():
-        filings = get_10q_urls_from_submissions(cik, ticker) 
-        all_urls.extend(filings)
-
     # Step 3: Save the URLs to a text file
     filename = "top_50_cik_10q_raw_text_urls.txt"
     try:
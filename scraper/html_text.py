@@ -0,0 +1,250 @@
+# scraper/html_text.py
+"""
+Streaming HTML / Inline XBRL to text extraction.
+
+StreamingTextExtractor is an event-based parser (html.parser.HTMLParser)
+that is fed the document in chunks. It only keeps the stack of open tag names
+and the text found since the last chunk: tables, scripts, styles and every
+ix: element are skipped as their tags stream past instead of being built into
+a tree and decomposed, so memory stays bounded by the chunk size rather than
+the size of the filing.
+
+The output matches what scrape_edgar_htm used to produce with BeautifulSoup:
+the strings inside <body>, stripped and joined with single spaces, with a
+paragraph break inserted before every "Item N." heading. Tag nesting follows
+BeautifulSoup's html.parser rules (an end tag closes everything opened after
+its start tag; stray end tags are ignored). lxml's HTML parser is faster but
+restructures documents differently (e.g. the SGML <DOCUMENT> wrapper of files
+taken from a full submission), which changes which text falls inside <body>.
+
+Bytes are decoded as BeautifulSoup would: with the charset of a byte order
+mark, else the one passed in (e.g. from the HTTP Content-Type), else one
+declared by <meta charset> or <?xml encoding?> in the first chunk, else
+UTF-8. UTF-8 that turns out to be invalid (typically an undeclared
+windows-1252 document) is decoded as windows-1252 from there on.
+
+Example:
+    with open("aapl-20250628.htm", "rb") as f:
+        text = html_to_text(iter(lambda: f.read(65536), b""))
+"""
+import codecs
+import re
+from html.parser import HTMLParser
+
+SKIP_TAGS = frozenset({'table', 'script', 'style'})
+SKIP_PREFIXES = ('ix:',)
+
+# Elements BeautifulSoup treats as empty (never pushed on the open-tag stack).
+VOID_TAGS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem', 'meta',
+    'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex',
+    'nextid', 'spacer',
+})
+
+# Declared charsets, looked for in the first chunk of a document.
+DECLARED_CHARSET = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([\w.:-]+)'
+                              rb'|<\?xml[^>]*?encoding\s*=\s*["\']([\w.:-]+)', re.IGNORECASE)
+CONTENT_TYPE_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+BYTE_ORDER_MARKS = [(codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16')]
+# Labels that HTML parsers read as windows-1252, which maps the 0x80-0x9F bytes to characters.
+WINDOWS_1252_ALIASES = frozenset({'ascii', 'iso8859-1', 'cp1252'})
+FALLBACK_ENCODING = 'cp1252'
+
+WHITESPACE = re.compile(r'\s+')
+ITEM_HEADING = re.compile(r'(?i)(Item\s+\d+\w*\.)')
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Text is emitted once this much is pending; the last few words are held back for the next segment.
+FLUSH_CHARS = 64 * 1024
+
+
+class StreamingTextExtractor(HTMLParser):
+    """
+    Incremental parser that collects the visible body text of an HTML/iXBRL document.
+
+    Call feed() with str chunks and take the stripped strings completed so far
+    with pop_strings(); `found_body` tells whether a <body> tag was seen.
+    As in BeautifulSoup, a string is the text between two markup events, so
+    text that spans feed() chunks is joined before it is stripped.
+    """
+
+    def __init__(self, skip_tags=SKIP_TAGS, skip_prefixes=SKIP_PREFIXES):
+        super().__init__(convert_charrefs=True)
+        self.skip_tags = skip_tags
+        self.skip_prefixes = skip_prefixes
+        self.found_body = False
+        self._open = []
+        self._body_depth = None
+        self._skip_depth = None
+        self._text = []
+        self._strings = []
+
+    def _end_string(self):
+        if self._text:
+            text = ''.join(self._text).strip()
+            self._text = []
+            if text:
+                self._strings.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self._end_string()
+        if tag in VOID_TAGS:
+            return
+        if self._skip_depth is None and (tag in self.skip_tags or tag.startswith(self.skip_prefixes)):
+            self._skip_depth = len(self._open)
+        if tag == 'body' and self._body_depth is None and not self.found_body:
+            self._body_depth = len(self._open)
+            self.found_body = True
+        self._open.append(tag)
+
+    def handle_endtag(self, tag):
+        self._end_string()
+        open_tags = self._open
+        for depth in range(len(open_tags) - 1, -1, -1):
+            if open_tags[depth] == tag:
+                del open_tags[depth:]
+                if self._skip_depth is not None and depth <= self._skip_depth:
+                    self._skip_depth = None
+                if self._body_depth is not None and depth <= self._body_depth:
+                    self._body_depth = None
+                return
+
+    def handle_data(self, data):
+        if self._body_depth is not None and self._skip_depth is None:
+            self._text.append(data)
+
+    def handle_comment(self, data):
+        self._end_string()
+
+    def handle_decl(self, decl):
+        self._end_string()
+
+    def handle_pi(self, data):
+        self._end_string()
+
+    def unknown_decl(self, data):
+        self._end_string()
+
+    def close(self):
+        super().close()
+        self._end_string()
+
+    def pop_strings(self):
+        strings, self._strings = self._strings, []
+        return strings
+
+
+def normalize_encoding(name):
+    """Python codec name for a charset label, or None if it is unknown."""
+    try:
+        name = codecs.lookup(name).name
+    except (LookupError, TypeError):
+        return None
+    return FALLBACK_ENCODING if name in WINDOWS_1252_ALIASES else name
+
+
+def charset_from_content_type(content_type):
+    """The charset parameter of a Content-Type header, or None."""
+    match = CONTENT_TYPE_CHARSET.search(content_type or '')
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def sniff_encoding(head, encoding=None):
+    """Encoding of a document starting with the bytes `head`, given an optional externally declared one."""
+    for mark, name in BYTE_ORDER_MARKS:
+        if head.startswith(mark):
+            return name
+    if encoding:
+        return normalize_encoding(encoding)
+    match = DECLARED_CHARSET.search(head)
+    if match:
+        return normalize_encoding((match.group(1) or match.group(2)).decode('ascii'))
+    return None
+
+
+class Utf8Decoder:
+    """Incremental UTF-8 decoder that switches to windows-1252 at the first invalid byte sequence."""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._fallback = None
+        self._started = False
+
+    def decode(self, data, final=False):
+        if self._fallback is not None:
+            return self._fallback.decode(data, final)
+        pending = self._decoder.getstate()[0]
+        try:
+            text = self._decoder.decode(data, final)
+        except UnicodeDecodeError as error:
+            # Everything before the invalid sequence was valid UTF-8.
+            data = pending + data
+            self._fallback = codecs.getincrementaldecoder(FALLBACK_ENCODING)(errors='replace')
+            text = data[:error.start].decode('utf-8') + self._fallback.decode(data[error.start:], final)
+        if not self._started and text:
+            self._started = True
+            if text[0] == '\ufeff':
+                text = text[1:]
+        return text
+
+
+def _decoded(chunks, encoding):
+    """Decodes an iterable of bytes (or str) chunks incrementally, sniffing the charset from the first chunk."""
+    decoder = None
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                encoding = sniff_encoding(chunk, encoding) or 'utf-8'
+                if encoding == 'utf-8':
+                    decoder = Utf8Decoder()
+                else:
+                    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+            chunk = decoder.decode(chunk)
+        if chunk:
+            yield chunk
+    if decoder is not None:
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+
+def _mark_items(text):
+    return ITEM_HEADING.sub(r'\n\n\1', text)
+
+
+def iter_html_text(chunks, encoding=None, extractor=None):
+    """
+    Yields the cleaned body text of the document in `chunks` (an iterable of
+    bytes or str) segment by segment; ''.join() of the segments is the full text.
+    `encoding` is the charset declared outside the document (e.g. by HTTP), if
+    any; otherwise it is sniffed. Pass an extractor to check `found_body` afterwards.
+    """
+    extractor = extractor or StreamingTextExtractor()
+    pending = ''
+    for chunk in _decoded(chunks, encoding):
+        extractor.feed(chunk)
+        for string in extractor.pop_strings():
+            string = WHITESPACE.sub(' ', string)
+            pending = pending + ' ' + string if pending else string
+        if len(pending) > FLUSH_CHARS:
+            cut = pending.rfind(' ', 0, len(pending) - 64)
+            # An "Item N." heading could only be split at the space after "Item"; cut before that word instead.
+            while cut > 0 and pending[cut - 4:cut].lower() == 'item':
+                cut = pending.rfind(' ', 0, cut)
+            if cut > 0:
+                # The separating space stays at the start of the held-back text.
+                yield _mark_items(pending[:cut])
+                pending = pending[cut:]
+    extractor.close()
+    for string in extractor.pop_strings():
+        string = WHITESPACE.sub(' ', string)
+        pending = pending + ' ' + string if pending else string
+    if pending:
+        yield _mark_items(pending)
+
+
+def html_to_text(chunks, encoding=None):
+    """Cleaned body text of a document given as bytes, str or an iterable of chunks."""
+    if isinstance(chunks, (bytes, str)):
+        chunks = [chunks[i:i + DEFAULT_CHUNK_SIZE] for i in range(0, len(chunks), DEFAULT_CHUNK_SIZE)]
+    return ''.join(iter_html_text(chunks, encoding))
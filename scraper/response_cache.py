@@ -0,0 +1,268 @@
+# scraper/response_cache.py
+"""
+Persistent on-disk cache of SEC HTTP responses, keyed by URL.
+
+Each response body is stored in its own file (<cache>/<xx>/<sha256>.body)
+next to a small JSON record of its URL, content type, ETag, Last-Modified and
+fetch time. How long an entry is served without contacting the SEC depends on
+the kind of resource (RESOURCE_TTLS):
+
+- filing documents under /Archives/edgar/data/<cik>/<accession>/ never change,
+  so they are cached indefinitely;
+- filing index pages are effectively immutable and kept for 30 days;
+- submissions JSON changes whenever the company files, so it expires hourly;
+- company_tickers.json is refreshed daily.
+
+Once an entry expires it is revalidated with a conditional GET
+(If-None-Match / If-Modified-Since); a 304 answer refreshes the entry without
+downloading the body again. SECClient uses the shared cache returned by
+get_response_cache unless it is given cache=False.
+
+The cache lives in cache/http by default; LINGUISTIC_ALPHA_HTTP_CACHE selects
+another directory, or disables caching when set to 'off'.
+
+Usage:
+    python -m scraper.response_cache stats [--cache DIR]
+    python -m scraper.response_cache prune [--cache DIR]
+    python -m scraper.response_cache clear [--cache DIR]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from collections import Counter
+
+DEFAULT_HTTP_CACHE_DIR = os.path.join('cache', 'http')
+HTTP_CACHE_DIR_ENV = 'LINGUISTIC_ALPHA_HTTP_CACHE'
+DISABLED_VALUES = ('off', 'none', '0', 'false')
+
+DAY = 24 * 3600
+
+# (resource class, URL pattern, TTL in seconds; None = never expires). First match wins.
+RESOURCE_TTLS = [
+    ('ticker_map', re.compile(r'/files/company_tickers[^/]*\.json$'), DAY),
+    ('submissions', re.compile(r'data\.sec\.gov/submissions/'), 3600),
+    ('filing_index', re.compile(r'/Archives/edgar/data/\d+/\d+/[^/]*-index(-headers)?\.html?$'), 30 * DAY),
+    ('filing_document', re.compile(r'/Archives/edgar/data/\d+/\d{18}/[^/]+$'), None),
+    ('default', re.compile(''), 0),
+]
+
+# Response headers kept with each entry.
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def resource_class(url):
+    """Returns (class name, TTL seconds or None) for `url`."""
+    for name, pattern, ttl in RESOURCE_TTLS:
+        if pattern.search(url):
+            return name, ttl
+    return 'default', 0
+
+
+class CacheEntry:
+    """A cached response: body bytes plus the stored headers and fetch time."""
+
+    __slots__ = ('url', 'headers', 'content', 'fetched_at')
+
+    def __init__(self, url, headers, content, fetched_at):
+        self.url = url
+        self.headers = headers
+        self.content = content
+        self.fetched_at = fetched_at
+
+    def is_fresh(self, now=None):
+        _, ttl = resource_class(self.url)
+        if ttl is None:
+            return True
+        return (now or time.time()) - self.fetched_at < ttl
+
+    def conditional_headers(self):
+        """Validators for a conditional GET; empty if the server sent none."""
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+
+class ResponseCache:
+    """
+    URL-keyed response cache with per-resource TTLs and run statistics.
+
+    Counters (since this object was created):
+        hits: served from disk without a request.
+        revalidated: expired entries confirmed unchanged by a 304.
+        misses: full downloads (no entry, or the entry had changed).
+        bytes_saved: body bytes not downloaded thanks to hits and 304s.
+        bytes_downloaded: body bytes downloaded and stored.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_HTTP_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        directory = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(directory, key + '.json'), os.path.join(directory, key + '.body')
+
+    def get(self, url):
+        """Returns the CacheEntry for `url`, fresh or not, or None."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or len(content) != meta.get('size'):
+            return None
+        return CacheEntry(url, meta.get('headers', {}), content, meta.get('fetched_at', 0))
+
+    def _write_meta(self, meta_path, url, headers, size, fetched_at):
+        meta = {'url': url, 'headers': headers, 'size': size, 'fetched_at': fetched_at}
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def store(self, url, headers, content):
+        """Writes a 200 response for `url` (atomically) and returns its CacheEntry."""
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        kept = {name: headers[name] for name in STORED_HEADERS if headers.get(name)}
+        fetched_at = time.time()
+        tmp_path = body_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, body_path)
+        self._write_meta(meta_path, url, kept, len(content), fetched_at)
+        self.misses += 1
+        self.bytes_downloaded += len(content)
+        return CacheEntry(url, kept, content, fetched_at)
+
+    def record_hit(self, entry):
+        self.hits += 1
+        self.bytes_saved += len(entry.content)
+
+    def refresh(self, entry, headers=None):
+        """Marks an expired entry as revalidated by a 304, updating any validators the server resent."""
+        for name in STORED_HEADERS:
+            if headers and headers.get(name):
+                entry.headers[name] = headers[name]
+        entry.fetched_at = time.time()
+        meta_path, _ = self._paths(entry.url)
+        self._write_meta(meta_path, entry.url, entry.headers, len(entry.content), entry.fetched_at)
+        self.revalidated += 1
+        self.bytes_saved += len(entry.content)
+
+    def report(self):
+        return (f"HTTP cache: {self.hits} hits, {self.revalidated} revalidated (304), {self.misses} downloaded; "
+                f"{self.bytes_saved / 1e6:.1f} MB saved, {self.bytes_downloaded / 1e6:.1f} MB downloaded")
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for directory in sorted(os.listdir(self.cache_dir)):
+            path = os.path.join(self.cache_dir, directory)
+            if not os.path.isdir(path):
+                continue
+            for name in os.listdir(path):
+                if name.endswith('.json'):
+                    meta_path = os.path.join(path, name)
+                    try:
+                        with open(meta_path, 'r', encoding='utf-8') as f:
+                            yield meta_path, json.load(f)
+                    except (OSError, ValueError):
+                        continue
+
+    def stats(self):
+        """Returns {resource class: {'entries', 'bytes', 'expired'}} for everything on disk."""
+        summary = {}
+        now = time.time()
+        for _, meta in self._entries():
+            name, ttl = resource_class(meta['url'])
+            info = summary.setdefault(name, Counter())
+            info['entries'] += 1
+            info['bytes'] += meta.get('size', 0)
+            info['expired'] += ttl is not None and now - meta.get('fetched_at', 0) >= ttl
+        return {name: dict(info) for name, info in sorted(summary.items())}
+
+    def prune(self):
+        """Deletes expired entries that have no validators (they would be downloaded again anyway)."""
+        removed = 0
+        now = time.time()
+        for meta_path, meta in list(self._entries()):
+            _, ttl = resource_class(meta['url'])
+            headers = meta.get('headers', {})
+            if ttl is None or now - meta.get('fetched_at', 0) < ttl or headers.get('ETag') or headers.get('Last-Modified'):
+                continue
+            for path in (meta_path, meta_path[:-len('.json')] + '.body'):
+                if os.path.exists(path):
+                    os.remove(path)
+            removed += 1
+        return removed
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+
+
+_RESPONSE_CACHE = None
+_CONFIGURED = False
+
+
+def configure_response_cache(cache_dir=None):
+    """
+    Replaces the shared response cache used by get_response_cache. `cache_dir`
+    defaults to LINGUISTIC_ALPHA_HTTP_CACHE, then to cache/http; a value of
+    'off' disables caching.
+    """
+    global _RESPONSE_CACHE, _CONFIGURED
+    if cache_dir is None:
+        cache_dir = os.environ.get(HTTP_CACHE_DIR_ENV, DEFAULT_HTTP_CACHE_DIR)
+    _RESPONSE_CACHE = None if cache_dir.lower() in DISABLED_VALUES else ResponseCache(cache_dir)
+    _CONFIGURED = True
+    return _RESPONSE_CACHE
+
+
+def get_response_cache():
+    """Returns the shared response cache (None if disabled), creating it from the environment on first use."""
+    if not _CONFIGURED:
+        configure_response_cache()
+    return _RESPONSE_CACHE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clean the SEC HTTP response cache.")
+    parser.add_argument('command', choices=['stats', 'prune', 'clear'])
+    parser.add_argument('--cache', default=None)
+    args = parser.parse_args()
+
+    cache = configure_response_cache(args.cache)
+    if cache is None:
+        sys.exit("The HTTP cache is disabled.")
+    if args.command == 'prune':
+        print(f"Removed {cache.prune()} expired entries.")
+    elif args.command == 'clear':
+        cache.clear()
+        print(f"Removed {cache.cache_dir}.")
+    for name, info in cache.stats().items():
+        print(f"{name:16s} {info['entries']:6d} entries  {info['bytes'] / 1e6:9.1f} MB  {info['expired']} expired")
+
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    main()
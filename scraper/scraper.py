@@ -6,62 +6,45 @@ Usage:
     python sec_quarterly_scraper.py AAPL
 """
 
+import asyncio
 import os
 import re
-import time
-import requests
+import sys
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from datetime import datetime, timedelta
 
+# --- Robust Path Setup ---
+# The project root goes first so that 'scraper' resolves to this package, not to this script.
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if sys.path[0] != project_root:
+    sys.path.insert(0, project_root)
+
+from scraper.cik_index import load_cik_index
+from scraper.download_manifest import DownloadManifest
+from scraper.sec_client import SECClient
+
 # --------------------------------------------------------------------
 # USER SETTINGS
 # --------------------------------------------------------------------
 USER_AGENT = "QuarterlyScraper/1.0 (your.email@example.com)"  # <-- change this
-REQUESTS_PER_SEC = 2
+REQUESTS_PER_SEC = 8  # SEC allows up to 10 requests/second
+CONCURRENCY = 8
 YEARS_BACK = 4
 FILING_TYPE = "10-Q"
 
-session = requests.Session()
-session.headers.update({
-    "User-Agent": USER_AGENT,
-    "Accept-Encoding": "gzip, deflate",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-})
-
 # --------------------------------------------------------------------
 # Utilities
 # --------------------------------------------------------------------
-def _safe_get(url, params=None, max_retries=3, backoff=1.0):
-    for attempt in range(max_retries):
-        try:
-            r = session.get(url, params=params, timeout=30)
-            r.raise_for_status()
-            time.sleep(1.0 / REQUESTS_PER_SEC)
-            return r
-        except Exception as e:
-            wait = backoff * (2 ** attempt)
-            print(f"Error {e} on {url}. Retrying in {wait:.1f}s...")
-            time.sleep(wait)
-    raise RuntimeError(f"Failed to fetch {url}")
-
-def get_cik_for_ticker(ticker):
-    """Use SEC's official ticker → CIK JSON mapping"""
-    ticker = ticker.upper().strip()
-    url = "https://www.sec.gov/files/company_tickers.json"
-    r = _safe_get(url)
-    data = r.json()
-    for entry in data.values():
-        if entry["ticker"].upper() == ticker:
-            cik_str = str(entry["cik_str"]).zfill(10)  # SEC expects 10 digits
-            return cik_str
-    return None
-
-def list_recent_10q_filings(cik, count=40, years_back=4):
+async def get_cik_for_ticker(client, ticker):
+    """Use the local index of SEC's official ticker → CIK mapping"""
+    index = await load_cik_index(client)
+    return index.cik(ticker)  # SEC expects 10 digits
+
+async def list_recent_10q_filings(client, cik, count=40, years_back=4):
     """List 10-Q filings in the last N years"""
     base_url = "https://data.sec.gov/submissions/CIK" + cik + ".json"
-    r = _safe_get(base_url)
-    data = r.json()
+    data = await client.get_json(base_url)
 
     cutoff_date = datetime.now() - timedelta(days=years_back * 365)
     filings = []
@@ -75,19 +58,33 @@ def list_recent_10q_filings(cik, count=40, years_back=4):
             if date_obj >= cutoff_date:
                 accession_nodash = accession.replace("-", "")
                 link = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{accession_nodash}/{accession}-index.html"
-                filings.append({"filing_date": date, "link": link})
+                filings.append({"filing_date": date, "accession": accession_nodash, "link": link})
     return filings
 
-def download_filing_documents(filing_detail_url, out_dir="downloads"):
-    """Download .htm, .xml, .xsd, .zip files from the filing"""
+async def download_filing_documents(client, filing_detail_url, out_dir="downloads", manifest=None):
+    """
+    Download .htm, .xml, .xsd, .zip files from the filing.
+    Documents already recorded in the download manifest are not fetched again,
+    and a filing whose documents are all saved is skipped without its index page.
+    """
+    if manifest is None:
+        with DownloadManifest() as manifest:
+            return await download_filing_documents(client, filing_detail_url, out_dir, manifest)
+    saved = manifest.filing_documents(filing_detail_url, out_dir)
+    if saved is not None:
+        for _ in saved:
+            manifest.record_skip()
+        print(f"Already complete: {out_dir}")
+        return saved
     os.makedirs(out_dir, exist_ok=True)
-    r = _safe_get(filing_detail_url)
+    r = await client.get(filing_detail_url)
     soup = BeautifulSoup(r.text, "lxml")
     table = soup.find("table", class_="tableFile") or soup.find("table", class_="tableFile2")
     saved = []
     if not table:
         return saved
 
+    documents = []
     for row in table.find_all("tr")[1:]:
         cols = row.find_all("td")
         if not cols:
@@ -100,38 +97,64 @@ def download_filing_documents(filing_detail_url, out_dir="downloads"):
         full_url = urljoin("https://www.sec.gov", href)
         if any(filename.lower().endswith(ext) for ext in (".htm", ".html", ".xhtml", ".xml", ".zip", ".xsd")):
             safe_name = re.sub(r"[^\w\-_\. ]", "_", filename)
-            outpath = os.path.join(out_dir, safe_name)
-            try:
-                rr = _safe_get(full_url)
-                with open(outpath, "wb") as f:
-                    f.write(rr.content)
-                print(f"Saved {outpath}")
-                saved.append(outpath)
-            except Exception as e:
-                print(f"Failed {filename}: {e}")
+            documents.append((filename, full_url, os.path.join(out_dir, safe_name)))
+
+    missing = []
+    for document in documents:
+        # A document saved by an earlier run under another folder is linked here rather than fetched again.
+        if manifest.relocate(document[1], document[2]):
+            manifest.record_skip()
+        else:
+            missing.append(document)
+
+    # Documents of a filing are fetched concurrently; the client enforces the rate limit.
+    # They are stored here, so they bypass the response cache instead of being kept twice.
+    responses = await asyncio.gather(*(client.get(full_url, use_cache=False) for _, full_url, _ in missing),
+                                     return_exceptions=True)
+    failed = False
+    for (filename, full_url, outpath), rr in zip(missing, responses):
+        if isinstance(rr, Exception):
+            print(f"Failed {filename}: {rr}")
+            manifest.record_failure(full_url, outpath, rr, filing_url=filing_detail_url)
+            failed = True
+            continue
+        manifest.save(full_url, outpath, rr.content, filing_url=filing_detail_url)
+        print(f"Saved {outpath}")
+
+    saved = sorted(outpath for _, full_url, outpath in documents if manifest.is_complete(full_url, outpath))
+    if not failed:
+        manifest.complete_filing(filing_detail_url, out_dir, len(documents))
     return saved
 
-def download_company_quarterly_filings(ticker, max_filings=10):
+async def _download_company_quarterly_filings(client, ticker, max_filings=10):
     print(f"Resolving CIK for {ticker}...")
-    cik = get_cik_for_ticker(ticker)
+    cik = await get_cik_for_ticker(client, ticker)
     if not cik:
         print(f"❌ Could not find CIK for ticker {ticker}. Check ticker symbol.")
         return []
     print(f"✅ Found CIK: {cik}")
 
-    filings = list_recent_10q_filings(cik, count=max_filings, years_back=YEARS_BACK)
+    filings = await list_recent_10q_filings(client, cik, count=max_filings, years_back=YEARS_BACK)
     if not filings:
         print("No 10-Q filings in the last 4 years.")
         return []
 
-    all_saved = []
-    for i, f in enumerate(filings, 1):
-        print(f"[{i}] {f['filing_date']} -> {f['link']}")
-        folder = os.path.join("downloads", ticker, f"filing_{i}")
-        os.makedirs(folder, exist_ok=True)
-        saved = download_filing_documents(f["link"], folder)
-        all_saved.extend(saved)
-    return all_saved
+    with DownloadManifest() as manifest:
+        async def download(i, f):
+            print(f"[{i}] {f['filing_date']} -> {f['link']}")
+            # Folders are named by accession number, so a filing keeps its folder as new ones are published.
+            folder = os.path.join("downloads", ticker, f["accession"])
+            return await download_filing_documents(client, f["link"], folder, manifest)
+
+        results = await asyncio.gather(*(download(i, f) for i, f in enumerate(filings, 1)))
+        print(manifest.report())
+    return [path for saved in results for path in saved]
+
+def download_company_quarterly_filings(ticker, max_filings=10):
+    async def run():
+        async with SECClient(USER_AGENT, rate=REQUESTS_PER_SEC, concurrency=CONCURRENCY) as client:
+            return await _download_company_quarterly_filings(client, ticker, max_filings)
+    return asyncio.run(run())
 
 if __name__ == "__main__":
     ticker = input("Enter ticker symbol (e.g., AAPL): ").strip().upper()
@@ -0,0 +1,280 @@
+# scraper/sec_client.py
+"""
+Shared asyncio HTTP client for SEC EDGAR.
+
+- A token bucket spaces requests precisely at `rate` per second (SEC allows
+  10/s per client), instead of sleeping a fixed interval after each request.
+- A semaphore bounds the number of requests in flight.
+- One aiohttp session with a keep-alive connection pool is reused for every
+  request, so TLS handshakes are paid once per host rather than per file.
+- Transient failures (connection errors, timeouts, 429 and 5xx) are retried
+  with exponential backoff, honoring Retry-After; 403 fails immediately,
+  since it means the User-Agent was rejected.
+
+- get(until=..., max_bytes=...) reads only the start of a document: it asks
+  for a byte range and stops streaming once a pattern has matched, dropping
+  the connection instead of downloading the rest.
+
+- Responses go through the persistent ResponseCache (scraper/response_cache.py):
+  fresh entries are served from disk without using a rate-limit token, and
+  expired ones are revalidated with conditional GETs.
+
+Set LINGUISTIC_ALPHA_SEC_HOST (e.g. http://127.0.0.1:8080) to send every
+www.sec.gov / data.sec.gov request to a local stand-in server instead.
+
+Example:
+    async with SECClient(USER_AGENT) as client:
+        response = await client.get("https://www.sec.gov/files/company_tickers.json")
+        tickers = response.json()
+"""
+import asyncio
+import json
+import os
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+import aiohttp
+
+from scraper.response_cache import get_response_cache
+
+# SEC's published fair-access limit; the default stays a little below it.
+SEC_MAX_REQUESTS_PER_SEC = 10
+DEFAULT_REQUESTS_PER_SEC = 8
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 30
+
+SEC_HOSTS = ('www.sec.gov', 'sec.gov', 'data.sec.gov', 'efts.sec.gov')
+SEC_HOST_OVERRIDE_ENV = 'LINGUISTIC_ALPHA_SEC_HOST'
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+STREAM_CHUNK_SIZE = 16 * 1024
+
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+
+class SECRequestError(RuntimeError):
+    """A request that failed after all retries (or with a non-retryable status)."""
+
+    def __init__(self, message, status=None, url=None):
+        super().__init__(message)
+        self.status = status
+        self.url = url
+
+
+class SECForbiddenError(SECRequestError):
+    """403 from the SEC: the User-Agent was rejected or the client is being throttled."""
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, holding at most `capacity`.
+    Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate, capacity=1.0, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class SECResponse:
+    """A read response: status, headers and body bytes (only a prefix of the body for partial reads)."""
+
+    __slots__ = ('url', 'status', 'headers', 'content')
+
+    def __init__(self, url, status, headers, content):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        charset = 'utf-8'
+        content_type = self.headers.get('Content-Type', '')
+        if 'charset=' in content_type:
+            charset = content_type.split('charset=')[-1].split(';')[0].strip() or charset
+        return self.content.decode(charset, errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+async def _read_until(response, pattern, max_bytes=None):
+    """
+    Reads the body of `response` until the bytes regex `pattern` has a match
+    that is followed by more data (so the match cannot grow with the next
+    chunk), `max_bytes` were read, or the body ends. Closes the connection if
+    it stops before the end of the body.
+    """
+    buffer = bytearray()
+    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+        start = max(len(buffer) - STREAM_CHUNK_SIZE, 0)
+        buffer += chunk
+        match = pattern.search(buffer, start) if pattern is not None else None
+        if (match and match.end() < len(buffer)) or (max_bytes is not None and len(buffer) >= max_bytes):
+            response.close()
+            break
+    return bytes(buffer if max_bytes is None else buffer[:max_bytes])
+
+
+def _override_host(url, base):
+    """Points an SEC URL at `base` (scheme://host:port), keeping its path and query."""
+    parts = urlsplit(url)
+    if parts.hostname not in SEC_HOSTS:
+        return url
+    target = urlsplit(base)
+    return urlunsplit((target.scheme, target.netloc, parts.path, parts.query, parts.fragment))
+
+
+class SECClient:
+    """
+    Rate-limited, pooled async HTTP client for SEC requests. Use as an async context manager.
+
+    Args:
+        user_agent (str): Required by the SEC; should include a contact email.
+        rate (float): Requests per second across all concurrent tasks.
+        concurrency (int): Maximum requests in flight (also the connection pool size).
+        max_retries (int): Attempts per request before SECRequestError is raised.
+        backoff (float): Base of the exponential backoff between retries, in seconds.
+        host_override (str): Base URL that replaces the SEC hosts (defaults to $LINGUISTIC_ALPHA_SEC_HOST).
+        cache (ResponseCache): Response cache; defaults to the shared one, False disables caching.
+    """
+
+    def __init__(self, user_agent, rate=DEFAULT_REQUESTS_PER_SEC, concurrency=DEFAULT_CONCURRENCY,
+                 max_retries=4, backoff=1.0, timeout=DEFAULT_TIMEOUT, host_override=None, headers=None, cache=None):
+        self.user_agent = user_agent
+        self.rate = rate
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.host_override = host_override or os.environ.get(SEC_HOST_OVERRIDE_ENV)
+        self.headers = {**DEFAULT_HEADERS, **(headers or {}), "User-Agent": user_agent}
+        self.cache = (get_response_cache() if cache is None else cache) or None
+        self.requests = 0
+        self.retries = 0
+        self._session = None
+        self._bucket = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self._bucket = TokenBucket(self.rate)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            if self.cache is not None and (self.cache.hits or self.cache.revalidated or self.cache.misses):
+                print(self.cache.report())
+
+    def _retry_delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt)
+
+    async def get(self, url, params=None, headers=None, use_cache=True, until=None, max_bytes=None):
+        """
+        GETs `url` and returns an SECResponse, retrying transient failures.
+        use_cache=False bypasses the response cache (e.g. for files the caller stores itself).
+
+        To read only the start of a document, pass `max_bytes` (sent as a Range
+        request, so the status is 206 if the server honors it) and/or `until`, a
+        compiled bytes regex: the body is streamed and the connection dropped
+        once it matches. The content is then a prefix, and is never cached.
+        """
+        if self._session is None:
+            raise RuntimeError("SECClient must be used inside 'async with'.")
+        request_url = _override_host(url, self.host_override) if self.host_override else url
+        partial = until is not None or max_bytes is not None
+        if max_bytes is not None:
+            # Uncompressed, so the range is in bytes of the document itself.
+            headers = {**(headers or {}), 'Range': f"bytes=0-{max_bytes - 1}", 'Accept-Encoding': 'identity'}
+        cache = self.cache if use_cache and not params and not partial else None
+        cached = None
+        if cache is not None:
+            cached = cache.get(url)
+            if cached is not None and cached.is_fresh():
+                cache.record_hit(cached)
+                return SECResponse(url, 200, cached.headers, cached.content)
+            if cached is not None:
+                headers = {**cached.conditional_headers(), **(headers or {})}
+        last_error = None
+        async with self._semaphore:
+            for attempt in range(self.max_retries):
+                await self._bucket.acquire()
+                self.requests += 1
+                try:
+                    async with self._session.get(request_url, params=params, headers=headers) as r:
+                        if partial and r.status < 300:
+                            content = await _read_until(r, until, max_bytes)
+                        else:
+                            content = await r.read()
+                        if r.status == 304 and cached is not None:
+                            cache.refresh(cached, r.headers)
+                            return SECResponse(url, 200, cached.headers, cached.content)
+                        if r.status == 403:
+                            raise SECForbiddenError(
+                                f"403 Forbidden from {url}: check the User-Agent and wait before retrying.",
+                                status=403, url=url)
+                        if r.status in RETRY_STATUSES:
+                            last_error = SECRequestError(f"HTTP {r.status}", status=r.status, url=url)
+                            delay = self._retry_delay(attempt, r.headers.get('Retry-After'))
+                        elif r.status >= 400:
+                            raise SECRequestError(f"HTTP {r.status} from {url}", status=r.status, url=url)
+                        else:
+                            if cache is not None and r.status == 200:
+                                cache.store(url, r.headers, content)
+                            return SECResponse(url, r.status, r.headers, content)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    last_error = e
+                    delay = self._retry_delay(attempt)
+                if attempt + 1 < self.max_retries:
+                    self.retries += 1
+                    print(f"Request to {url} failed ({last_error!r}). Retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
+        raise SECRequestError(f"Failed to fetch {url} after {self.max_retries} attempts: {last_error}",
+                              status=getattr(last_error, 'status', None), url=url)
+
+    async def get_json(self, url, params=None):
+        return (await self.get(url, params=params)).json()
+
+    async def get_text(self, url, params=None):
+        return (await self.get(url, params=params)).text
+
+    async def get_many(self, urls, return_exceptions=True):
+        """Fetches `urls` concurrently (within the rate limit); results are in input order."""
+        return await asyncio.gather(*(self.get(url) for url in urls), return_exceptions=return_exceptions)
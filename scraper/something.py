@@ -1,39 +1,59 @@
-import requests
-import time
+import asyncio
 import re
 import os
+import sys
 import csv
 import pandas as pd
 
+# --- Robust Path Setup ---
+# The project root goes first so that 'scraper' resolves to this package, not to this script.
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if sys.path[0] != project_root:
+    sys.path.insert(0, project_root)
+
+from scraper.sec_client import SECClient
+
 # --- Configuration and Constants ---
 INPUT_FILENAME = "top_50_cik_10q_raw_text_urls.txt" 
 OUTPUT_FILENAME = "final_html_urls.txt" # Output in comma-separated TXT format
-HEADERS = {"User-Agent": "FinalURLExtractor your.email@example.com"} 
+USER_AGENT = "FinalURLExtractor your.email@example.com"
+REQUESTS_PER_SEC = 8 # SEC allows up to 10 requests/second
+CONCURRENCY = 8
 MAX_FILES_TO_PROCESS = 10 # <-- LIMIT SET TO 10 FILES
 
 # Regex pattern to find the value inside the <FILENAME> tag
-FILENAME_PATTERN = re.compile(r'<FILENAME>\s*(\S+)', re.IGNORECASE)
+FILENAME_PATTERN = re.compile(rb'<FILENAME>\s*(\S+)', re.IGNORECASE)
+# The first <FILENAME> follows the SEC header, a few KB into the file; only this much is requested at first.
+HEADER_FETCH_BYTES = 16 * 1024
 
 # --- Function 1: Download and Extract Filename ---
-def extract_filename_tag_value(url):
-    """Downloads the raw filing text and extracts the primary filename."""
-    time.sleep(0.5) 
-
+async def extract_filename_tag_value(client, url):
+    """
+    Reads the start of the raw filing text and extracts the primary filename.
+    Only the first HEADER_FETCH_BYTES are requested, and the connection is dropped
+    as soon as the tag is read; an unusually long header is streamed until the tag.
+    """
     try:
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        raw_text = response.text
+        response = await client.get(url, until=FILENAME_PATTERN, max_bytes=HEADER_FETCH_BYTES)
+        match = FILENAME_PATTERN.search(response.content)
+        # A match running up to the end of a cut-off read may be a truncated filename.
+        if len(response.content) >= HEADER_FETCH_BYTES and (match is None or match.end() >= len(response.content)):
+            response = await client.get(url, until=FILENAME_PATTERN)
+            match = FILENAME_PATTERN.search(response.content)
     except Exception as e:
         return {"Status": "Download Failed", "Extracted_Value": str(e)}
 
-    match = FILENAME_PATTERN.search(raw_text)
-
     if match:
-        extracted_value = match.group(1).strip()
+        extracted_value = match.group(1).decode('latin-1').strip()
         return {"Status": "Success", "Extracted_Value": extracted_value}
     else:
         return {"Status": "Warning", "Extracted_Value": "Tag not found"}
 
+async def extract_filename_tag_values(urls):
+    """Runs extract_filename_tag_value for all `urls` concurrently; results are in input order."""
+    async with SECClient(USER_AGENT, rate=REQUESTS_PER_SEC, concurrency=CONCURRENCY) as client:
+        return await asyncio.gather(*(extract_filename_tag_value(client, url) for url in urls))
+
 # --- Function 2: Main Execution ---
 def main():
     
@@ -44,50 +64,52 @@ def main():
     print(f"1. Reading URLs from {INPUT_FILENAME} and building final links (Limit: {MAX_FILES_TO_PROCESS})...")
     
     all_filing_records = []
-    files_processed = 0
     
     try:
         with open(INPUT_FILENAME, 'r', encoding='utf-8') as f:
             reader = csv.reader(f)
             header = next(reader) # Read and store the original header
             
+            rows = []
             for row in reader:
-                if files_processed >= MAX_FILES_TO_PROCESS:
+                if len(rows) >= MAX_FILES_TO_PROCESS:
                     print(f"\n🛑 Reached limit of {MAX_FILES_TO_PROCESS} files. Stopping processing.")
                     break
                     
                 if len(row) < 6: continue
-                
-                ticker, cik, form_type, filing_date, acc_num, raw_txt_url = row
-                
-                # A. Extract the filename
-                result = extract_filename_tag_value(raw_txt_url)
-                extracted_filename = result["Extracted_Value"]
-                
-                # B. Extract the Base Path (directory)
-                base_path = raw_txt_url.rsplit('/', 1)[0] + '/'
-                
-                final_output_url = None
-                
-                if result["Status"] == "Success":
-                    # C. Construct the Final HTML URL
-                    final_output_url = os.path.join(base_path, extracted_filename).replace('\\', '/')
-                else:
-                    # If download or extraction failed, use the error message as the URL field value
-                    final_output_url = f"[ERROR: {extracted_filename}]" 
-
-                # D. Store the record
-                all_filing_records.append([
-                    ticker,
-                    cik,
-                    form_type,
-                    filing_date,
-                    acc_num,
-                    final_output_url # The new URL
-                ])
-                
-                print(f"   -> Processed file {files_processed + 1}/{MAX_FILES_TO_PROCESS}: {ticker} ({result['Status']})")
-                files_processed += 1 # Increment the counter
+                rows.append(row)
+
+        # A. Download the raw filings concurrently and extract the filenames
+        results = asyncio.run(extract_filename_tag_values([row[5] for row in rows]))
+
+        for files_processed, (row, result) in enumerate(zip(rows, results)):
+            ticker, cik, form_type, filing_date, acc_num, raw_txt_url = row
+            
+            extracted_filename = result["Extracted_Value"]
+            
+            # B. Extract the Base Path (directory)
+            base_path = raw_txt_url.rsplit('/', 1)[0] + '/'
+            
+            final_output_url = None
+            
+            if result["Status"] == "Success":
+                # C. Construct the Final HTML URL
+                final_output_url = os.path.join(base_path, extracted_filename).replace('\\', '/')
+            else:
+                # If download or extraction failed, use the error message as the URL field value
+                final_output_url = f"[ERROR: {extracted_filename}]" 
+
+            # D. Store the record
+            all_filing_records.append([
+                ticker,
+                cik,
+                form_type,
+                filing_date,
+                acc_num,
+                final_output_url # The new URL
+            ])
+            
+            print(f"   -> Processed file {files_processed + 1}/{MAX_FILES_TO_PROCESS}: {ticker} ({result['Status']})")
 
     except Exception as e:
         print(f"\n❌ A critical error occurred during processing: {e}")
@@ -1,14 +1,17 @@
 # utils/calculations.py
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 
+from utils.price_cache import get_price_cache
+
 def calculate_historical_pnl(ticker, investment_amount, lookback_months=6):
     """Calculates the P&L for a stock based on a historical investment."""
     end_date = datetime.now()
     start_date = end_date - timedelta(days=lookback_months * 30)
 
-    stock_data = yf.download(ticker, start=start_date, end=end_date, auto_adjust=True, progress=False)
+    # Dividend/split-adjusted closes, as with yf.download(auto_adjust=True).
+    stock_data = get_price_cache().get_prices(ticker, start_date, end_date, columns=['Adj Close'])
+    stock_data = stock_data.rename(columns={'Adj Close': 'Close'}).dropna()
 
     if stock_data.empty:
         return {"error": f"Could not download data for {ticker}."}
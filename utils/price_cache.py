@@ -0,0 +1,312 @@
+# utils/price_cache.py
+"""
+Shared on-disk cache of daily OHLCV prices.
+
+Each ticker is stored as one Parquet file (<cache>/AAPL.parquet) read with
+memory mapping, and a small manifest records the date range that has already
+been fetched for it. A request only downloads the parts of its range that are
+not covered yet, so overlapping lookups from the pipeline, the P&L calculator
+and the dashboard share one copy of the history.
+
+Offline mode (offline=True or LINGUISTIC_ALPHA_PRICES_OFFLINE=1) never touches
+the network: requests are served from whatever the cache already holds, which
+can be pre-seeded with `PriceCache.seed` or a `StaticPriceProvider`.
+
+Usage:
+    python -m utils.price_cache stats [--cache DIR]
+    python -m utils.price_cache fetch AAPL MSFT --start 2020-01-01 [--end 2024-12-31] [--cache DIR]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import warnings
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_PRICE_CACHE_DIR = os.path.join('cache', 'prices')
+MANIFEST_NAME = '_coverage.json'
+
+PRICE_CACHE_DIR_ENV = 'LINGUISTIC_ALPHA_PRICE_CACHE'
+PRICE_OFFLINE_ENV = 'LINGUISTIC_ALPHA_PRICES_OFFLINE'
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+
+def _normalize_frame(df):
+    """Coerces provider output to a float64 OHLCV frame indexed by a naive 'Date' index."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='Date'), dtype='float64')
+    df = df.copy()
+    # yfinance returns (field, ticker) columns even for a single ticker.
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    if 'Adj Close' not in df.columns and 'Close' in df.columns:
+        df['Adj Close'] = df['Close']
+    df = df.reindex(columns=PRICE_COLUMNS).astype('float64')
+    index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize().rename('Date')
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+
+class PriceFetchError(RuntimeError):
+    """The provider could not answer (network error, rate limit); the range has to be fetched again."""
+
+
+class YFinanceProvider:
+    """
+    Fetches unadjusted OHLCV plus 'Adj Close' from Yahoo Finance. A range Yahoo
+    has no prices for (weekends, holidays, before the listing) comes back empty;
+    any other failure raises PriceFetchError.
+    """
+
+    def fetch(self, ticker, start, end):
+        import yfinance as yf
+        from yfinance.exceptions import YFPricesMissingError
+        try:
+            with warnings.catch_warnings():
+                # Newer yfinance deprecates raise_errors in favour of a global setting.
+                warnings.simplefilter('ignore', DeprecationWarning)
+                data = yf.Ticker(ticker).history(start=start, end=end, auto_adjust=False, actions=False,
+                                                 raise_errors=True)
+        except YFPricesMissingError:
+            return _normalize_frame(None)
+        except Exception as e:
+            raise PriceFetchError(f"{ticker} {start}..{end}: {e}") from e
+        return _normalize_frame(data)
+
+
+class StaticPriceProvider:
+    """
+    Serves prices from in-memory frames ({ticker: DataFrame}) or a directory of
+    <TICKER>.csv files with a Date column. Used for tests and air-gapped runs.
+    """
+
+    def __init__(self, frames=None, csv_dir=None):
+        self.frames = {ticker: _normalize_frame(df) for ticker, df in (frames or {}).items()}
+        self.csv_dir = csv_dir
+
+    def fetch(self, ticker, start, end):
+        if ticker not in self.frames and self.csv_dir:
+            path = os.path.join(self.csv_dir, f"{ticker}.csv")
+            if os.path.exists(path):
+                self.frames[ticker] = _normalize_frame(pd.read_csv(path, index_col='Date', parse_dates=True))
+        df = self.frames.get(ticker)
+        if df is None:
+            return _normalize_frame(None)
+        return df.loc[(df.index >= start) & (df.index < end)]
+
+
+class PriceCache:
+    """
+    Per-ticker Parquet store of daily prices that fetches only missing date ranges.
+
+    Ranges follow yfinance semantics: `start` is inclusive and `end` exclusive.
+    Coverage for each ticker is kept as one contiguous [start, end) interval;
+    a request outside it fetches just the gap on either side. A gap the provider
+    answers is marked as covered even if it holds no trading days, unless it
+    reaches today; a gap whose fetch raised PriceFetchError is not, and days
+    from today on never are, since their prices may still change.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_PRICE_CACHE_DIR, provider=None, offline=False):
+        self.cache_dir = cache_dir
+        self.provider = provider or YFinanceProvider()
+        self.offline = offline
+        self.fetches = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._coverage = self._load_manifest()
+
+    def _path(self, ticker):
+        return os.path.join(self.cache_dir, f"{ticker}.parquet")
+
+    def _load_manifest(self):
+        path = os.path.join(self.cache_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        path = os.path.join(self.cache_dir, MANIFEST_NAME)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._coverage, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def _read(self, ticker):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return _normalize_frame(None)
+        df = pq.read_table(path, memory_map=True).to_pandas()
+        return df.set_index('Date')[PRICE_COLUMNS]
+
+    def _write(self, ticker, df):
+        table = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+        tmp_path = os.path.join(self.cache_dir, f".{ticker}.parquet.tmp")
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, self._path(ticker))
+
+    def _store(self, ticker, new_rows, start=None, end=None):
+        """Merges fetched rows into the ticker's file and, if given, sets its coverage to [start, end)."""
+        cached = self._read(ticker)
+        if not new_rows.empty:
+            merged = pd.concat([cached, new_rows]) if not cached.empty else new_rows
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            self._write(ticker, merged)
+        if start is not None:
+            self._coverage[ticker] = [start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')]
+            self._save_manifest()
+
+    def missing_ranges(self, ticker, start, end):
+        """Returns the [start, end) ranges of the request that are not cached yet."""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        covered = self._coverage.get(ticker)
+        if covered is None:
+            return [(start, end)] if start < end else []
+        covered_start, covered_end = pd.Timestamp(covered[0]), pd.Timestamp(covered[1])
+        ranges = []
+        if start < covered_start:
+            ranges.append((start, covered_start))
+        if end > covered_end:
+            # Fetch from the end of coverage (not the request start) so coverage stays contiguous.
+            ranges.append((covered_end, end))
+        return ranges
+
+    def ensure(self, ticker, start, end):
+        """Fetches whatever part of [start, end) is missing for `ticker`. Returns the number of fetches."""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        ranges = self.missing_ranges(ticker, start, end)
+        if not ranges or self.offline:
+            self.hits += 1
+            return 0
+
+        with self._lock:
+            frames = []
+            for range_start, range_end in ranges:
+                try:
+                    frames.append(self.provider.fetch(ticker, range_start, range_end))
+                except PriceFetchError as e:
+                    print(f"Price fetch failed, will retry: {e}")
+                    frames.append(None)
+            self.fetches += len(frames)
+
+            # A failed fetch leaves its range uncovered so it is retried. An empty answer is final
+            # for a closed range (no trading days, or before the listing), but not for one that
+            # reaches today, whose prices may not be published yet.
+            today = pd.Timestamp.today().normalize()
+            covered = self._coverage.get(ticker)
+            new_start, new_end = (pd.Timestamp(covered[0]), pd.Timestamp(covered[1])) if covered else (None, None)
+            for (range_start, range_end), frame in zip(ranges, frames):
+                if frame is None or (frame.empty and range_end >= today):
+                    continue
+                new_start = range_start if new_start is None else min(new_start, range_start)
+                new_end = range_end if new_end is None else max(new_end, range_end)
+            if new_end is not None:
+                new_end = min(new_end, today)
+            frames = [frame for frame in frames if frame is not None] or [_normalize_frame(None)]
+            rows = pd.concat(frames) if len(frames) > 1 else frames[0]
+            if new_start is not None and new_end > new_start:
+                self._store(ticker, rows, new_start, new_end)
+            else:
+                # Every fetch failed, or only today's (still changing) prices came back; keep coverage as it was.
+                self._store(ticker, rows)
+        return len(frames)
+
+    def seed(self, ticker, df, start=None, end=None):
+        """Pre-seeds the cache with a price frame and marks [start, end) (default: its date span) as covered."""
+        df = _normalize_frame(df)
+        if df.empty:
+            return
+        start = pd.Timestamp(start).normalize() if start is not None else df.index.min()
+        end = pd.Timestamp(end).normalize() if end is not None else df.index.max() + pd.Timedelta(days=1)
+        covered = self._coverage.get(ticker)
+        if covered:
+            start = min(start, pd.Timestamp(covered[0]))
+            end = max(end, pd.Timestamp(covered[1]))
+        self._store(ticker, df, start, end)
+
+    def get_prices(self, ticker, start, end, columns=None):
+        """Returns the daily OHLCV frame for `ticker` in [start, end), fetching any missing range first."""
+        self.ensure(ticker, start, end)
+        df = self._read(ticker)
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        df = df.loc[(df.index >= start) & (df.index < end)]
+        if columns is not None:
+            df = df[list(columns)]
+        return df
+
+    def get_panel(self, tickers, start, end, field='Adj Close'):
+        """Returns one price field as a wide frame (Date x ticker), like yf.download(tickers)[field]."""
+        series = {ticker: self.get_prices(ticker, start, end)[field] for ticker in tickers}
+        if not series:
+            return pd.DataFrame(index=pd.DatetimeIndex([], name='Date'))
+        return pd.DataFrame(series).sort_index().rename_axis('Date')
+
+    def stats(self):
+        """Returns {ticker: {'start', 'end', 'rows'}} for every cached ticker."""
+        summary = {}
+        for ticker, (start, end) in sorted(self._coverage.items()):
+            path = self._path(ticker)
+            rows = pq.read_metadata(path).num_rows if os.path.exists(path) else 0
+            summary[ticker] = {'start': start, 'end': end, 'rows': rows}
+        return summary
+
+
+_PRICE_CACHE = None
+
+
+def configure_price_cache(cache_dir=None, provider=None, offline=None):
+    """
+    Replaces the shared price cache used by get_price_cache. `cache_dir` and
+    `offline` default to the LINGUISTIC_ALPHA_PRICE_CACHE / LINGUISTIC_ALPHA_PRICES_OFFLINE
+    environment variables, then to cache/prices and online.
+    """
+    global _PRICE_CACHE
+    if cache_dir is None:
+        cache_dir = os.environ.get(PRICE_CACHE_DIR_ENV, DEFAULT_PRICE_CACHE_DIR)
+    if offline is None:
+        offline = os.environ.get(PRICE_OFFLINE_ENV, '') not in ('', '0', 'false')
+    _PRICE_CACHE = PriceCache(cache_dir, provider=provider, offline=offline)
+    return _PRICE_CACHE
+
+
+def get_price_cache():
+    """Returns the shared price cache, creating it from the environment on first use."""
+    if _PRICE_CACHE is None:
+        configure_price_cache()
+    return _PRICE_CACHE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or pre-fill the local price cache.")
+    parser.add_argument('command', choices=['stats', 'fetch'])
+    parser.add_argument('tickers', nargs='*')
+    parser.add_argument('--cache', default=None)
+    parser.add_argument('--start', default=None)
+    parser.add_argument('--end', default=pd.Timestamp.today().strftime('%Y-%m-%d'))
+    args = parser.parse_args()
+
+    cache = configure_price_cache(args.cache)
+    if args.command == 'fetch':
+        if not args.tickers or not args.start:
+            parser.error("fetch needs at least one ticker and --start")
+        for ticker in args.tickers:
+            fetched = cache.ensure(ticker, args.start, args.end)
+            print(f"{ticker}: {fetched} range(s) fetched")
+    for ticker, info in cache.stats().items():
+        print(f"{ticker:6s} {info['start']} .. {info['end']}  {info['rows']} rows")
+
+
+if __name__ == '__main__':
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    main()